@@ -0,0 +1,73 @@
+from django.utils.translation import gettext_lazy as _
+from rest_framework_simplejwt.authentication import JWTAuthentication
+from rest_framework_simplejwt.exceptions import AuthenticationFailed, InvalidToken
+from rest_framework_simplejwt.settings import api_settings
+
+from accounts.principal_cache import principal_cache
+from tenants.scoping import set_current_tenant_id
+
+
+class CachedJWTAuthentication(JWTAuthentication):
+    """
+    JWT authentication that resolves the principal from an in-process cache.
+
+    Tokens issued by TenantRefreshToken carry a ``gen`` claim matching
+    ``User.token_generation``. A cache hit with the same generation costs no
+    queries; a miss loads the user and tenant in a single query. Tokens whose
+    generation no longer matches the stored user are rejected, so bumping the
+    generation revokes every outstanding token for that user. Cache entries
+    are also checked against the shared revocation counters (see
+    accounts.principal_cache), so changes made in other worker processes
+    are seen at once.
+
+    The user's tenant becomes the tenant context of the request (see
+    tenants.scoping).
+    """
+
+    def authenticate(self, request):
+        result = super().authenticate(request)
+        if result is not None:
+            set_current_tenant_id(result[0].tenant_id)
+        return result
+
+    def get_user(self, validated_token):
+        try:
+            user_id = validated_token[api_settings.USER_ID_CLAIM]
+        except KeyError as e:
+            raise InvalidToken(
+                _("Token contained no recognizable user identification")
+            ) from e
+
+        generation = validated_token.get('gen')
+        stamps = None
+        if generation is not None:
+            # Read before loading the user, so that a revocation racing with
+            # the load makes the stored entry stale
+            stamps = principal_cache.stamps(user_id, validated_token.get('tenant_id'))
+            user = principal_cache.get(user_id, generation, stamps)
+            if user is not None:
+                return user
+
+        try:
+            user = self.user_model.objects.select_related('tenant').get(
+                **{api_settings.USER_ID_FIELD: user_id}
+            )
+        except self.user_model.DoesNotExist as e:
+            raise AuthenticationFailed(_("User not found"), code="user_not_found") from e
+
+        if api_settings.CHECK_USER_IS_ACTIVE and not user.is_active:
+            raise AuthenticationFailed(_("User is inactive"), code="user_inactive")
+
+        if user.tenant_id is not None and user.tenant.deleted_at is not None:
+            raise AuthenticationFailed(_("Tenant has been deleted"), code="tenant_deleted")
+
+        # Tokens issued before generations were embedded are still honoured
+        # until they expire, but are not cached.
+        if generation is None:
+            return user
+
+        if user.token_generation != generation:
+            raise AuthenticationFailed(_("Token has been revoked"), code="token_revoked")
+
+        principal_cache.set(user, stamps)
+        return user
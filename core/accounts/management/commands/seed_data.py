@@ -17,6 +17,8 @@ from tenants.models import Tenant
 from accounts.models import User
 from projects.models import Project
 from tasks.models import Task
+from projects.counters import rebuild_task_counts
+from tenants.usage import rebuild_usage
 
 
 class Command(BaseCommand):
@@ -228,6 +230,10 @@ class Command(BaseCommand):
             else:
                 self.stdout.write('  Tasks already exist')
 
+            # 7. Sync denormalized usage and task counters with the seeded rows
+            rebuild_usage([demo_tenant.id])
+            rebuild_task_counts(Project.objects.filter(tenant=demo_tenant).values_list('id', flat=True))
+
         self.stdout.write('')
         self.stdout.write(self.style.SUCCESS('=' * 50))
         self.stdout.write(self.style.SUCCESS('Database seeded successfully!'))
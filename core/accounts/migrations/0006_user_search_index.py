@@ -0,0 +1,14 @@
+from django.db import migrations
+
+from core.search import search_operations
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("accounts", "0005_user_token_generation"),
+    ]
+
+    operations = search_operations(
+        "accounts_user", (("full_name", "A"), ("email", "A"))
+    )
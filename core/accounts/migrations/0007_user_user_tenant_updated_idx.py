@@ -0,0 +1,21 @@
+# Generated by Django 5.2.18 on 2026-10-18 07:35
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("accounts", "0006_user_search_index"),
+        ("auth", "0012_alter_user_first_name_max_length"),
+        ("tenants", "0004_tenantusage_version"),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name="user",
+            index=models.Index(
+                fields=["tenant", "updated_at", "id"], name="user_tenant_updated_idx"
+            ),
+        ),
+    ]
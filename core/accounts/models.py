@@ -2,9 +2,10 @@ import uuid
 from django.db import models
 from django.contrib.auth.models import AbstractBaseUser, PermissionsMixin
 from django.contrib.auth.models import BaseUserManager
+from tenants.scoping import TenantScopedManager
 
 
-class UserManager(BaseUserManager):
+class UserManager(TenantScopedManager, BaseUserManager):
     def create_user(self, email, password=None, **extra_fields):
         if not email:
             raise ValueError("Email is required")
@@ -42,10 +43,15 @@ class User(AbstractBaseUser, PermissionsMixin):
     role = models.CharField(max_length=20, choices=ROLE_CHOICES)
     is_active = models.BooleanField(default=True)
     is_staff = models.BooleanField(default=False)
+    # Bumped whenever role or active status changes; embedded in JWTs so
+    # that outstanding tokens for the old principal stop authenticating.
+    token_generation = models.PositiveIntegerField(default=0)
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
 
-    objects = UserManager() 
+    objects = UserManager()
+    # Not scoped to the current tenant (see tenants.scoping)
+    all_objects = models.Manager()
 
     # REQUIRED BY DJANGO - use email as the username field
     USERNAME_FIELD = 'email'
@@ -53,6 +59,10 @@ class User(AbstractBaseUser, PermissionsMixin):
 
     class Meta:
         unique_together = ('tenant', 'email')
+        indexes = [
+            # Delta sync
+            models.Index(fields=['tenant', 'updated_at', 'id'], name='user_tenant_updated_idx'),
+        ]
 
     def __str__(self):
         return self.email
@@ -0,0 +1,132 @@
+import copy
+import threading
+import time
+from collections import OrderedDict
+
+from django.conf import settings
+from django.utils.functional import cached_property
+
+
+class PrincipalCache:
+    """
+    Bounded, thread-safe LRU cache of authenticated users keyed by user id.
+
+    Entries hold the User together with its Tenant so that views reading
+    ``request.user.tenant`` do not issue a second query. Each lookup returns
+    a private copy, so a view mutating ``request.user`` never leaks into
+    other requests. Entries expire after ``ttl`` seconds.
+
+    The cache is private to the process. So that a role change, deactivation
+    or tenant change made in another worker is honoured at once, invalidating
+    a user or tenant also increments a revocation counter in the Django cache
+    ``shared_alias``. Callers read the counters of a principal (``stamps``)
+    before loading it and pass them to ``get`` and ``set``; an entry stored
+    under other counters is stale. Without a shared alias, or with a cache
+    private to each process, other workers notice changes after ``ttl``.
+    """
+
+    def __init__(self, max_entries=1024, ttl=60, shared_alias=None):
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self.shared_alias = shared_alias
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    @cached_property
+    def shared(self):
+        if not self.shared_alias:
+            return None
+        from django.core.cache import caches
+
+        return caches[self.shared_alias]
+
+    @staticmethod
+    def _user_key(user_id):
+        return f'principal:user:{user_id}'
+
+    @staticmethod
+    def _tenant_key(tenant_id):
+        return f'principal:tenant:{tenant_id}'
+
+    def stamps(self, user_id, tenant_id=None):
+        """Current revocation counters of a user and their tenant."""
+        if self.shared is None:
+            return None
+        keys = [self._user_key(user_id)]
+        if tenant_id is not None:
+            keys.append(self._tenant_key(tenant_id))
+        found = self.shared.get_many(keys)
+        return tuple(found.get(key, 0) for key in keys)
+
+    def get(self, user_id, generation, stamps=None):
+        key = str(user_id)
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            user, expires_at, entry_stamps = entry
+            if (
+                expires_at < time.monotonic()
+                or user.token_generation != generation
+                or entry_stamps != stamps
+            ):
+                del self._entries[key]
+                return None
+            self._entries.move_to_end(key)
+        return self._detach(user)
+
+    def set(self, user, stamps=None):
+        key = str(user.id)
+        entry = (self._detach(user), time.monotonic() + self.ttl, stamps)
+        with self._lock:
+            self._entries[key] = entry
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def invalidate_user(self, user_id):
+        with self._lock:
+            self._entries.pop(str(user_id), None)
+        self._revoke(self._user_key(user_id))
+
+    def invalidate_tenant(self, tenant_id):
+        tenant_id = str(tenant_id)
+        with self._lock:
+            stale = [
+                key for key, (user, _, _) in self._entries.items()
+                if str(user.tenant_id) == tenant_id
+            ]
+            for key in stale:
+                del self._entries[key]
+        self._revoke(self._tenant_key(tenant_id))
+
+    def _revoke(self, key):
+        if self.shared is None:
+            return
+        if not self.shared.add(key, 1, timeout=None):
+            try:
+                self.shared.incr(key)
+            except ValueError:
+                # Evicted in between; any new value makes old entries stale
+                self.shared.set(key, 1, timeout=None)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def __len__(self):
+        return len(self._entries)
+
+    @staticmethod
+    def _detach(user):
+        clone = copy.copy(user)
+        if user.tenant_id is not None:
+            clone.tenant = copy.copy(user.tenant)
+        return clone
+
+
+principal_cache = PrincipalCache(
+    max_entries=getattr(settings, 'PRINCIPAL_CACHE_MAX_ENTRIES', 1024),
+    ttl=getattr(settings, 'PRINCIPAL_CACHE_TTL', 60),
+    shared_alias=getattr(settings, 'PRINCIPAL_CACHE_ALIAS', None),
+)
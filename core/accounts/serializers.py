@@ -3,6 +3,8 @@ from tenants.models import Tenant
 from accounts.models import User
 
 from rest_framework import serializers
+from rest_framework.validators import UniqueValidator
+from core.projections import Field, Projection
 from accounts.models import User
 
 
@@ -12,6 +14,10 @@ class CreateUserSerializer(serializers.ModelSerializer):
     class Meta:
         model = User
         fields = ('id', 'email', 'password', 'full_name', 'role')
+        # Emails are unique across tenants, not only the current one
+        extra_kwargs = {
+            'email': {'validators': [UniqueValidator(queryset=User.all_objects.all())]},
+        }
 
     def create(self, validated_data):
         password = validated_data.pop('password')
@@ -27,6 +33,18 @@ class UserListSerializer(serializers.ModelSerializer):
         fields = ('id', 'email', 'full_name', 'role', 'is_active', 'created_at')
 
 
+# UserListSerializer as a projection for list endpoints (core.projections)
+user_list_projection = Projection(
+    User,
+    id=Field(),
+    email=Field(),
+    full_name=Field(),
+    role=Field(),
+    is_active=Field(),
+    created_at=Field(),
+)
+
+
 class UpdateUserSerializer(serializers.ModelSerializer):
     class Meta:
         model = User
@@ -5,7 +5,9 @@ from django.test import TestCase
 from django.urls import reverse
 from rest_framework.test import APITestCase, APIClient
 from rest_framework import status
+from rest_framework_simplejwt.tokens import AccessToken
 from accounts.models import User
+from accounts.principal_cache import PrincipalCache, principal_cache
 from tenants.models import Tenant
 
 
@@ -163,3 +165,115 @@ class ProtectedEndpointTests(APITestCase):
         response = self.client.get('/api/auth/me')
         self.assertEqual(response.status_code, status.HTTP_200_OK)
         self.assertEqual(response.data['data']['email'], 'user@demo.com')
+
+
+class CachedPrincipalTests(APITestCase):
+    """Test cases for token claims and the cached JWT principal"""
+
+    def setUp(self):
+        principal_cache.clear()
+        self.client = APIClient()
+        self.tenant = Tenant.objects.create(
+            name="Demo Company",
+            subdomain="demo",
+            status="active"
+        )
+        self.admin = User.objects.create_user(
+            email="admin@demo.com",
+            password="Admin@123",
+            full_name="Demo Admin",
+            tenant=self.tenant,
+            role="tenant_admin"
+        )
+        self.user = User.objects.create_user(
+            email="user@demo.com",
+            password="User@123",
+            full_name="Demo User",
+            tenant=self.tenant,
+            role="user"
+        )
+
+    def login(self, email, password):
+        response = self.client.post('/api/auth/login', {
+            'email': email,
+            'password': password,
+            'tenantSubdomain': 'demo'
+        }, format='json')
+        return response.data['data']['token']
+
+    def test_token_carries_principal_claims(self):
+        """Test access token embeds role, tenant and generation"""
+        token = AccessToken(self.login('user@demo.com', 'User@123'))
+        self.assertEqual(token['role'], 'user')
+        self.assertEqual(token['tenant_id'], str(self.tenant.id))
+        self.assertEqual(token['gen'], 0)
+
+    def test_cached_principal_needs_no_queries(self):
+        """Test repeated requests resolve user and tenant from the cache"""
+        token = self.login('user@demo.com', 'User@123')
+        self.client.credentials(HTTP_AUTHORIZATION=f'Bearer {token}')
+        self.client.get('/api/auth/me')
+
+        with self.assertNumQueries(0):
+            response = self.client.get('/api/auth/me')
+        self.assertEqual(response.data['data']['tenantId'], str(self.tenant.id))
+
+    def test_role_change_revokes_token(self):
+        """Test changing a user's role invalidates tokens issued before"""
+        user_token = self.login('user@demo.com', 'User@123')
+        self.client.credentials(HTTP_AUTHORIZATION=f'Bearer {user_token}')
+        self.assertEqual(self.client.get('/api/auth/me').status_code, status.HTTP_200_OK)
+
+        admin_token = self.login('admin@demo.com', 'Admin@123')
+        self.client.credentials(HTTP_AUTHORIZATION=f'Bearer {admin_token}')
+        response = self.client.put(f'/api/users/{self.user.id}', {
+            'role': 'tenant_admin'
+        }, format='json')
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+
+        self.client.credentials(HTTP_AUTHORIZATION=f'Bearer {user_token}')
+        response = self.client.get('/api/auth/me')
+        self.assertEqual(response.status_code, status.HTTP_401_UNAUTHORIZED)
+
+    def test_revocation_in_other_process_is_seen_at_once(self):
+        """Test a principal cached here is dropped when another worker revokes it"""
+        token = self.login('user@demo.com', 'User@123')
+        self.client.credentials(HTTP_AUTHORIZATION=f'Bearer {token}')
+        self.client.get('/api/auth/me')
+        self.assertEqual(len(principal_cache), 1)
+
+        # Another worker deactivates the user; only the shared cache is common
+        other_worker = PrincipalCache(shared_alias='default')
+        User.objects.filter(id=self.user.id).update(is_active=False, token_generation=1)
+        other_worker.invalidate_user(self.user.id)
+
+        response = self.client.get('/api/auth/me')
+        self.assertEqual(response.status_code, status.HTTP_401_UNAUTHORIZED)
+
+    def test_tenant_update_invalidates_cached_tenant(self):
+        """Test tenant changes are visible to cached principals"""
+        token = self.login('admin@demo.com', 'Admin@123')
+        self.client.credentials(HTTP_AUTHORIZATION=f'Bearer {token}')
+        self.client.get('/api/auth/me')
+        self.assertEqual(len(principal_cache), 1)
+
+        response = self.client.put(f'/api/tenants/{self.tenant.id}', {
+            'name': 'Renamed Company'
+        }, format='json')
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(len(principal_cache), 0)
+
+    def test_search_tenant_users(self):
+        """Test user search matches name and e-mail word prefixes"""
+        token = self.login('admin@demo.com', 'Admin@123')
+        self.client.credentials(HTTP_AUTHORIZATION=f'Bearer {token}')
+        url = f'/api/tenants/{self.tenant.id}/users'
+
+        response = self.client.get(url, {'q': 'admin'})
+        self.assertEqual([u['email'] for u in response.data['data']], ['admin@demo.com'])
+
+        response = self.client.get(url, {'q': 'demo'})
+        self.assertEqual(len(response.data['data']), 2)
+
+        response = self.client.get(url, {'q': 'nobody'})
+        self.assertEqual(response.data['data'], [])
@@ -0,0 +1,19 @@
+from rest_framework_simplejwt.tokens import RefreshToken
+
+
+class TenantRefreshToken(RefreshToken):
+    """
+    Refresh token carrying the caller's role, tenant and token generation.
+
+    The claims are copied onto the derived access token, which lets
+    CachedJWTAuthentication resolve the principal without touching the
+    database and reject tokens issued before a role/status change.
+    """
+
+    @classmethod
+    def for_user(cls, user):
+        token = super().for_user(user)
+        token['role'] = user.role
+        token['tenant_id'] = str(user.tenant_id) if user.tenant_id else None
+        token['gen'] = user.token_generation
+        return token
@@ -2,13 +2,23 @@ from rest_framework.decorators import api_view, permission_classes
 from rest_framework.permissions import AllowAny
 from rest_framework.response import Response
 from django.db import transaction
-from rest_framework_simplejwt.tokens import RefreshToken
+from accounts.tokens import TenantRefreshToken
+from accounts.principal_cache import principal_cache
 from django.contrib.auth.hashers import check_password
-from tenants.models import Tenant
+from tenants.models import Tenant, TenantUsage
+from tenants.quota import QuotaExceeded, reserve_quota
+from tenants.usage import adjust_usage, task_totals
+from tenants.versions import bump_version, conditional_get, tenant_version
+from tenants.response_cache import cached_response
+from sync.utils import record_deletions
+from realtime.events import publish_event
+from django.utils import timezone
 from accounts.models import User
 from accounts.serializers import TenantRegisterSerializer, LoginSerializer,UserListSerializer,CreateUserSerializer,UpdateUserSerializer
+from accounts.serializers import user_list_projection
 from accounts.permissions import IsTenantAdmin
-from django.db.models import Q
+from core.pagination import CursorPaginator
+from core.search import apply_search, search_query
 from rest_framework.permissions import IsAuthenticated
 from rest_framework.decorators import api_view, permission_classes
 from django.shortcuts import get_object_or_404
@@ -19,6 +29,11 @@ from rest_framework.decorators import (
 )
 from rest_framework.permissions import AllowAny
 
+user_paginator = CursorPaginator(['-created_at', '-id'], default_limit=100, max_limit=500)
+user_search_paginator = CursorPaginator(
+    ['-search_rank', '-created_at', '-id'], default_limit=100, max_limit=500
+)
+
 @api_view(['GET'])
 @permission_classes([IsAuthenticated])
 def me(request):
@@ -43,7 +58,7 @@ def update_or_delete_user(request, user_id):
     target_user = get_object_or_404(User, id=user_id)
 
     # Tenant isolation
-    if user.tenant != target_user.tenant:
+    if user.tenant_id != target_user.tenant_id:
         return Response({"message": "Forbidden"}, status=403)
 
     # ================= UPDATE =================
@@ -51,6 +66,8 @@ def update_or_delete_user(request, user_id):
         if user != target_user and user.role != 'tenant_admin':
             return Response({"message": "Not authorized"}, status=403)
 
+        previous_role, previous_is_active = target_user.role, target_user.is_active
+
         if 'full_name' in request.data:
             target_user.full_name = request.data['full_name']
 
@@ -60,7 +77,17 @@ def update_or_delete_user(request, user_id):
             if 'is_active' in request.data:
                 target_user.is_active = request.data['is_active']
 
-        target_user.save()
+        # Role or status changes revoke tokens issued for the old principal
+        if (target_user.role, target_user.is_active) != (previous_role, previous_is_active):
+            target_user.token_generation += 1
+
+        with transaction.atomic():
+            target_user.save()
+            if target_user.tenant_id:
+                # Names show up on tasks and projects of every project
+                bump_version(target_user.tenant_id, all_projects=True)
+                publish_event(target_user.tenant_id, 'user.updated', UserListSerializer(target_user).data)
+        principal_cache.invalidate_user(target_user.id)
 
         return Response({
             "success": True,
@@ -84,7 +111,40 @@ def update_or_delete_user(request, user_id):
                 status=403
             )
 
-        target_user.delete()
+        # Projects cascade with their creator; account for them and their tasks
+        from projects.models import Project
+        from tasks.models import Task
+
+        with transaction.atomic():
+            owned_projects = Project.objects.filter(created_by=target_user)
+            deleted_projects = owned_projects.count()
+            deleted_tasks = task_totals(Task.objects.filter(project__in=owned_projects))
+            if target_user.tenant_id:
+                tenant_id = target_user.tenant_id
+                record_deletions(
+                    tenant_id,
+                    'task',
+                    Task.objects.filter(project__in=owned_projects).values_list('id', flat=True)
+                )
+                record_deletions(tenant_id, 'project', owned_projects.values_list('id', flat=True))
+                record_deletions(tenant_id, 'user', [target_user.id])
+                # Unassign explicitly (instead of through SET_NULL) so the
+                # change reaches delta sync through updated_at
+                Task.objects.filter(assigned_to=target_user).exclude(
+                    project__in=owned_projects
+                ).update(assigned_to=None, updated_at=timezone.now())
+            target_user.delete()
+            if target_user.tenant_id:
+                adjust_usage(
+                    target_user.tenant_id,
+                    users=-1,
+                    projects=-deleted_projects,
+                    tasks=-deleted_tasks['tasks'],
+                    open_tasks=-deleted_tasks['open_tasks']
+                )
+                bump_version(target_user.tenant_id, all_projects=True)
+                publish_event(target_user.tenant_id, 'user.deleted', {'id': user_id})
+        principal_cache.invalidate_user(user_id)
 
         return Response({
             "success": True,
@@ -95,6 +155,8 @@ def update_or_delete_user(request, user_id):
 
 @api_view(['GET', 'POST'])
 @permission_classes([IsAuthenticated])
+@conditional_get(tenant_version)
+@cached_response(tenant_version)
 def tenant_users(request, tenant_id):
     """
     GET: List all users in tenant
@@ -118,25 +180,25 @@ def tenant_users(request, tenant_id):
         
         qs = User.objects.filter(tenant=tenant)
 
-        # Search by email or full name
-        search = request.GET.get('search')
-        if search:
-            qs = qs.filter(
-                Q(email__icontains=search) |
-                Q(full_name__icontains=search)
-            )
-
         # Filter by role
         role = request.GET.get('role')
         if role:
             qs = qs.filter(role=role)
 
-        qs = qs.order_by('-created_at')
+        # Search by email or full name
+        paginator = user_paginator
+        search = search_query(request)
+        if search:
+            qs = apply_search(qs, search)
+            paginator = user_search_paginator
+
+        page = paginator.paginate(request, user_list_projection.values(qs, *paginator.fields))
 
         return Response({
             "success": True,
-            "data": UserListSerializer(qs, many=True).data,
-            "total": qs.count()
+            "data": user_list_projection.project(page.items),
+            "total": page.total,
+            "pagination": page.metadata()
         })
 
     # POST - Add User
@@ -150,10 +212,6 @@ def tenant_users(request, tenant_id):
         except Tenant.DoesNotExist:
             return Response({"message": "Tenant not found"}, status=404)
 
-        # User limit check
-        if User.objects.filter(tenant=tenant).count() >= tenant.max_users:
-            return Response({"message": "User limit reached"}, status=403)
-
         # Email uniqueness check
         if User.objects.filter(email=request.data.get('email'), tenant=tenant).exists():
             return Response(
@@ -164,7 +222,15 @@ def tenant_users(request, tenant_id):
         serializer = CreateUserSerializer(data=request.data)
         serializer.is_valid(raise_exception=True)
 
-        new_user = serializer.save(tenant=tenant)
+        # User limit: reserve a slot atomically with the insert
+        try:
+            with transaction.atomic():
+                reserve_quota(tenant.id, 'users')
+                new_user = serializer.save(tenant=tenant)
+                bump_version(tenant.id)
+                publish_event(tenant.id, 'user.created', UserListSerializer(new_user).data)
+        except QuotaExceeded:
+            return Response({"message": "User limit reached"}, status=403)
 
         return Response({
             "success": True,
@@ -187,10 +253,6 @@ def add_user_to_tenant(request, tenant_id):
 
     tenant = user.tenant
 
-    # ✅ USER LIMIT CHECK
-    if User.objects.filter(tenant=tenant).count() >= tenant.max_users:
-        return Response({"message": "User limit reached"}, status=403)
-
     # ✅ EMAIL UNIQUENESS CHECK (IMPORTANT FIX)
     if User.objects.filter(email=request.data.get('email'), tenant=tenant).exists():
         return Response(
@@ -201,7 +263,15 @@ def add_user_to_tenant(request, tenant_id):
     serializer = CreateUserSerializer(data=request.data)
     serializer.is_valid(raise_exception=True)
 
-    new_user = serializer.save(tenant=tenant)
+    # ✅ USER LIMIT: reserve a slot atomically with the insert
+    try:
+        with transaction.atomic():
+            reserve_quota(tenant.id, 'users')
+            new_user = serializer.save(tenant=tenant)
+            bump_version(tenant.id)
+            publish_event(tenant.id, 'user.created', UserListSerializer(new_user).data)
+    except QuotaExceeded:
+        return Response({"message": "User limit reached"}, status=403)
 
     return Response({
         "success": True,
@@ -212,6 +282,8 @@ def add_user_to_tenant(request, tenant_id):
 
 @api_view(['GET'])
 @permission_classes([IsAuthenticated])
+@conditional_get(tenant_version)
+@cached_response(tenant_version)
 def list_tenant_users(request, tenant_id):
     current_user = request.user
     is_super_admin = current_user.role == 'super_admin'
@@ -229,25 +301,25 @@ def list_tenant_users(request, tenant_id):
 
     qs = User.objects.filter(tenant=tenant)
 
-    # 🔍 Search by email or full name
-    search = request.GET.get('search')
-    if search:
-        qs = qs.filter(
-            Q(email__icontains=search) |
-            Q(full_name__icontains=search)
-        )
-
     # 🎭 Filter by role
     role = request.GET.get('role')
     if role:
         qs = qs.filter(role=role)
 
-    qs = qs.order_by('-created_at')
+    # 🔍 Search by email or full name
+    paginator = user_paginator
+    search = search_query(request)
+    if search:
+        qs = apply_search(qs, search)
+        paginator = user_search_paginator
+
+    page = paginator.paginate(request, user_list_projection.values(qs, *paginator.fields))
 
     return Response({
         "success": True,
-        "data": UserListSerializer(qs, many=True).data,
-        "total": qs.count()
+        "data": user_list_projection.project(page.items),
+        "total": page.total,
+        "pagination": page.metadata()
     })
 
 
@@ -277,6 +349,7 @@ def register_tenant(request):
             role='tenant_admin',
             tenant=tenant
         )
+        TenantUsage.objects.create(tenant=tenant, users=1)
 
     return Response({
         "success": True,
@@ -313,7 +386,7 @@ def login(request):
         ).first()
         
         if user and user.check_password(password):
-            refresh = RefreshToken.for_user(user)
+            refresh = TenantRefreshToken.for_user(user)
             return Response({
                 "success": True,
                 "data": {
@@ -355,7 +428,7 @@ def login(request):
             status=401
         )
 
-    refresh = RefreshToken.for_user(user)
+    refresh = TenantRefreshToken.for_user(user)
 
     return Response({
         "success": True,
@@ -0,0 +1,73 @@
+"""
+Django management command to maintain monthly audit log partitions.
+
+- Creates partitions for the current month and the next --ahead months.
+- Drops months that are past the retention window of every plan.
+- Compacts months that are past the window of some plans by deleting the
+  rows of tenants on those plans.
+
+Retention is configured per subscription plan in
+settings.AUDIT_LOG_RETENTION_MONTHS. Meant to run daily (e.g. from cron).
+"""
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from django.utils import timezone
+from audit_logs.partitions import (
+    add_months,
+    expired_plans,
+    get_partitions,
+    month_start,
+    partition_name,
+    retention_months,
+)
+
+
+class Command(BaseCommand):
+    help = 'Create upcoming audit log partitions and apply retention'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--ahead',
+            type=int,
+            default=getattr(settings, 'AUDIT_LOG_PARTITIONS_AHEAD', 3),
+            help='Number of future months to create partitions for',
+        )
+        parser.add_argument(
+            '--dry-run',
+            action='store_true',
+            help='Only print what would be done',
+        )
+
+    def handle(self, *args, **options):
+        partitions = get_partitions()
+        dry_run = options['dry_run']
+        current = month_start(timezone.now())
+        existing = partitions.list_months()
+
+        for offset in range(options['ahead'] + 1):
+            month = add_months(current, offset)
+            if month in existing:
+                continue
+            self.stdout.write(f'  create {partition_name(month)}')
+            if not dry_run:
+                partitions.create(month)
+
+        all_plans = sorted(retention_months())
+        for month in sorted(set(existing) | set(partitions.default_months())):
+            if month >= current:
+                continue
+            plans = expired_plans(month)
+            if not plans:
+                continue
+            if plans == all_plans:
+                self.stdout.write(f'  drop {partition_name(month)}')
+                if not dry_run:
+                    partitions.drop(month)
+            else:
+                self.stdout.write(f'  compact {partition_name(month)} (plans: {", ".join(plans)})')
+                if not dry_run:
+                    deleted = partitions.compact(month, plans)
+                    self.stdout.write(f'    removed {deleted} entries')
+
+        self.stdout.write(self.style.SUCCESS('✓ Audit log partitions up to date'))
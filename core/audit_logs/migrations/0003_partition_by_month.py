@@ -0,0 +1,130 @@
+# Generated by Django 5.2.18 on 2026-10-18 07:19
+
+import datetime
+
+from django.conf import settings
+from django.db import migrations, models
+
+TABLE = "audit_logs_auditlog"
+LEGACY = "audit_logs_auditlog_unpartitioned"
+PARTITIONS_AHEAD = 3
+
+
+def add_months(month, count):
+    index = month.year * 12 + month.month - 1 + count
+    return datetime.date(index // 12, index % 12 + 1, 1)
+
+
+def partition_by_month(apps, schema_editor):
+    """
+    Rebuild the audit log table as a PostgreSQL table range partitioned by
+    created_at, with monthly partitions and a DEFAULT partition. Indexes and
+    foreign keys are recreated under their original names. Other databases
+    keep the plain table (see audit_logs.partitions).
+    """
+    if schema_editor.connection.vendor != "postgresql":
+        return
+
+    with schema_editor.connection.cursor() as cursor:
+        cursor.execute(
+            "SELECT pg_get_indexdef(indexrelid) FROM pg_index "
+            "WHERE indrelid = %s::regclass AND NOT indisprimary",
+            [TABLE],
+        )
+        index_definitions = [row[0] for row in cursor.fetchall()]
+        cursor.execute(
+            "SELECT conname, contype, pg_get_constraintdef(oid) FROM pg_constraint "
+            "WHERE conrelid = %s::regclass AND contype IN ('p', 'f')",
+            [TABLE],
+        )
+        constraints = cursor.fetchall()
+        primary_key = next(name for name, kind, _ in constraints if kind == "p")
+        foreign_keys = [(name, definition) for name, kind, definition in constraints if kind == "f"]
+        cursor.execute(f"SELECT min(created_at) FROM {TABLE}")
+        first = cursor.fetchone()[0]
+
+        cursor.execute(f"ALTER TABLE {TABLE} RENAME TO {LEGACY}")
+        cursor.execute(f"ALTER TABLE {LEGACY} RENAME CONSTRAINT {primary_key} TO {LEGACY}_pkey")
+        cursor.execute(
+            f"CREATE TABLE {TABLE} (LIKE {LEGACY} INCLUDING DEFAULTS) "
+            f"PARTITION BY RANGE (created_at)"
+        )
+        # The partition key must be part of the primary key
+        cursor.execute(f"ALTER TABLE {TABLE} ADD CONSTRAINT {primary_key} PRIMARY KEY (id, created_at)")
+        cursor.execute(f"CREATE TABLE {TABLE}_default PARTITION OF {TABLE} DEFAULT")
+
+        today = datetime.date.today()
+        month = datetime.date((first or today).year, (first or today).month, 1)
+        last = add_months(datetime.date(today.year, today.month, 1), PARTITIONS_AHEAD)
+        while month <= last:
+            cursor.execute(
+                f"CREATE TABLE {TABLE}_p{month:%Y%m} PARTITION OF {TABLE} "
+                f"FOR VALUES FROM (%s) TO (%s)",
+                [month.isoformat(), add_months(month, 1).isoformat()],
+            )
+            month = add_months(month, 1)
+
+        cursor.execute(f"INSERT INTO {TABLE} SELECT * FROM {LEGACY}")
+        cursor.execute(f"DROP TABLE {LEGACY}")
+        for definition in index_definitions:
+            cursor.execute(definition)
+        for name, definition in foreign_keys:
+            cursor.execute(f"ALTER TABLE {TABLE} ADD CONSTRAINT {name} {definition}")
+
+
+def unpartition(apps, schema_editor):
+    """
+    Rebuild the plain audit log table with its ``id`` primary key, copying
+    the rows of every partition (sub-partitioned or not).
+    """
+    if schema_editor.connection.vendor != "postgresql":
+        return
+
+    plain = f"{TABLE}_plain"
+    with schema_editor.connection.cursor() as cursor:
+        cursor.execute(
+            "SELECT pg_get_indexdef(indexrelid) FROM pg_index "
+            "WHERE indrelid = %s::regclass AND NOT indisprimary",
+            [TABLE],
+        )
+        # Indexes of a partitioned table are defined ON ONLY the parent
+        index_definitions = [row[0].replace(" ON ONLY ", " ON ", 1) for row in cursor.fetchall()]
+        cursor.execute(
+            "SELECT conname, pg_get_constraintdef(oid) FROM pg_constraint "
+            "WHERE conrelid = %s::regclass AND contype = 'f'",
+            [TABLE],
+        )
+        foreign_keys = cursor.fetchall()
+
+        cursor.execute(f"CREATE TABLE {plain} (LIKE {TABLE} INCLUDING DEFAULTS)")
+        cursor.execute(f"INSERT INTO {plain} SELECT * FROM {TABLE}")
+        cursor.execute(f"DROP TABLE {TABLE}")
+        cursor.execute(f"ALTER TABLE {plain} RENAME TO {TABLE}")
+        cursor.execute(f"ALTER TABLE {TABLE} ADD CONSTRAINT {TABLE}_pkey PRIMARY KEY (id)")
+        for definition in index_definitions:
+            cursor.execute(definition)
+        for name, definition in foreign_keys:
+            cursor.execute(f"ALTER TABLE {TABLE} ADD CONSTRAINT {name} {definition}")
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("audit_logs", "0002_auditlog_ip_address"),
+        ("tenants", "0003_tenantusage"),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.RunPython(partition_by_month, unpartition),
+        migrations.AddIndex(
+            model_name="auditlog",
+            index=models.Index(
+                fields=["tenant", "-created_at"], name="auditlog_tenant_created_idx"
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="auditlog",
+            index=models.Index(fields=["-created_at"], name="auditlog_created_idx"),
+        ),
+    ]
@@ -0,0 +1,12 @@
+from django.db import migrations
+
+from core.partitioning import tenant_partitioning_operations
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("audit_logs", "0003_partition_by_month"),
+    ]
+
+    operations = tenant_partitioning_operations("audit_logs_auditlog")
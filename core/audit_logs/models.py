@@ -1,5 +1,6 @@
 import uuid
 from django.db import models
+from tenants.scoping import TenantScopedManager
 
 class AuditLog(models.Model):
     id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
@@ -10,3 +11,14 @@ class AuditLog(models.Model):
     entity_id = models.CharField(max_length=255)
     ip_address = models.GenericIPAddressField(null=True, blank=True)
     created_at = models.DateTimeField(auto_now_add=True)
+
+    objects = TenantScopedManager()
+    all_objects = models.Manager()
+
+    class Meta:
+        # On PostgreSQL the table is range partitioned by created_at (see
+        # audit_logs.partitions); indexes are created on every partition.
+        indexes = [
+            models.Index(fields=['tenant', '-created_at'], name='auditlog_tenant_created_idx'),
+            models.Index(fields=['-created_at'], name='auditlog_created_idx'),
+        ]
@@ -0,0 +1,205 @@
+"""
+Monthly partition management for the audit log table.
+
+On PostgreSQL ``audit_logs_auditlog`` is range partitioned by ``created_at``
+(see migration 0003) with one partition per calendar month, named
+``audit_logs_auditlog_pYYYYMM``, plus a DEFAULT partition that catches rows
+outside every month range. Date-range queries are pruned to the matching
+partitions, and expiring a month is a DETACH + DROP rather than a DELETE.
+With ``TENANT_HASH_PARTITIONS`` each month is further hash partitioned by
+tenant (see core.partitioning), and new months are created the same way.
+
+SQLite has no partitioning. For local development the same interface is
+emulated on the plain table: months are derived from the stored rows, and
+dropping or compacting a month deletes its rows by ``created_at`` range.
+"""
+
+import datetime
+
+from django.conf import settings
+from django.db import connection, transaction
+from django.utils import timezone
+
+from core.partitioning import create_hash_partitions, hash_modulus
+
+TABLE = 'audit_logs_auditlog'
+DEFAULT_PARTITION = f'{TABLE}_default'
+
+DEFAULT_RETENTION_MONTHS = {'free': 3, 'pro': 12, 'enterprise': 36}
+
+
+def month_start(value):
+    return datetime.date(value.year, value.month, 1)
+
+
+def add_months(month, count):
+    index = month.year * 12 + month.month - 1 + count
+    return datetime.date(index // 12, index % 12 + 1, 1)
+
+
+def partition_name(month):
+    return f'{TABLE}_p{month:%Y%m}'
+
+
+def month_bounds(month):
+    """Aware datetimes [start, end) covering a calendar month."""
+    start = datetime.datetime.combine(month, datetime.time.min, tzinfo=datetime.timezone.utc)
+    end = datetime.datetime.combine(add_months(month, 1), datetime.time.min, tzinfo=datetime.timezone.utc)
+    return start, end
+
+
+def retention_months():
+    return getattr(settings, 'AUDIT_LOG_RETENTION_MONTHS', DEFAULT_RETENTION_MONTHS)
+
+
+def expired_plans(month, today=None):
+    """
+    Subscription plans whose retention window no longer covers ``month``.
+
+    A month expires for a plan once it ends before the first day of the
+    month that lies ``retention`` months before the current one.
+    """
+    current = month_start(today or timezone.now())
+    end = add_months(month, 1)
+    return sorted(
+        plan for plan, months in retention_months().items()
+        if end <= add_months(current, -months)
+    )
+
+
+class PostgresPartitions:
+    """Native declarative partitions on PostgreSQL."""
+
+    def list_months(self):
+        with connection.cursor() as cursor:
+            cursor.execute(
+                """
+                SELECT child.relname
+                FROM pg_inherits
+                JOIN pg_class parent ON parent.oid = pg_inherits.inhparent
+                JOIN pg_class child ON child.oid = pg_inherits.inhrelid
+                WHERE parent.relname = %s
+                """,
+                [TABLE],
+            )
+            names = [row[0] for row in cursor.fetchall()]
+        prefix = f'{TABLE}_p'
+        return sorted(
+            datetime.date(int(name[-6:-2]), int(name[-2:]), 1)
+            for name in names
+            if name.startswith(prefix) and name[len(prefix):].isdigit()
+        )
+
+    def default_months(self):
+        """
+        Months of the rows in the DEFAULT partition, e.g. rows older than the
+        first month partition. Retention applies to them as well.
+        """
+        quote = connection.ops.quote_name
+        with connection.cursor() as cursor:
+            cursor.execute(
+                f"SELECT DISTINCT date_trunc('month', created_at AT TIME ZONE 'UTC')::date "
+                f"FROM {quote(DEFAULT_PARTITION)}"
+            )
+            return sorted(row[0] for row in cursor.fetchall())
+
+    def create(self, month):
+        """
+        Create the partition for ``month`` unless it exists.
+
+        Rows for that month that already landed in the DEFAULT partition are
+        moved into the new table before it is attached, since PostgreSQL
+        refuses to attach a range the default partition still holds.
+        """
+        if month in self.list_months():
+            return
+        start, end = month_bounds(month)
+        quote = connection.ops.quote_name
+        name, parent, default = quote(partition_name(month)), quote(TABLE), quote(DEFAULT_PARTITION)
+        with transaction.atomic(), connection.cursor() as cursor:
+            # Sub-partition by tenant like the existing months (core.partitioning)
+            tenant_partitions = hash_modulus(cursor, DEFAULT_PARTITION)
+            cursor.execute(
+                f'CREATE TABLE {name} (LIKE {parent} INCLUDING DEFAULTS INCLUDING CONSTRAINTS)'
+                + (' PARTITION BY HASH (tenant_id)' if tenant_partitions else '')
+            )
+            create_hash_partitions(cursor, name, tenant_partitions)
+            cursor.execute(
+                f'WITH moved AS (DELETE FROM {default} WHERE created_at >= %s AND created_at < %s RETURNING *) '
+                f'INSERT INTO {name} SELECT * FROM moved',
+                [start, end],
+            )
+            cursor.execute(
+                f'ALTER TABLE {parent} ATTACH PARTITION {name} FOR VALUES FROM (%s) TO (%s)',
+                [start, end],
+            )
+
+    def _month_rows(self, month):
+        """Table and condition selecting the rows of ``month``."""
+        quote = connection.ops.quote_name
+        if month in self.list_months():
+            return quote(partition_name(month)), 'TRUE', []
+        # A month without a partition of its own lives in the DEFAULT one
+        return quote(DEFAULT_PARTITION), 'created_at >= %s AND created_at < %s', list(month_bounds(month))
+
+    def drop(self, month):
+        quote = connection.ops.quote_name
+        table, condition, params = self._month_rows(month)
+        with transaction.atomic(), connection.cursor() as cursor:
+            if table == quote(DEFAULT_PARTITION):
+                cursor.execute(f'DELETE FROM {table} WHERE {condition}', params)
+                return
+            cursor.execute(f'ALTER TABLE {quote(TABLE)} DETACH PARTITION {table}')
+            cursor.execute(f'DROP TABLE {table}')
+
+    def compact(self, month, plans):
+        table, condition, params = self._month_rows(month)
+        with connection.cursor() as cursor:
+            cursor.execute(
+                f'DELETE FROM {table} WHERE {condition} AND tenant_id IN '
+                f'(SELECT id FROM tenants_tenant WHERE subscription_plan = ANY(%s))',
+                params + [list(plans)],
+            )
+            deleted = cursor.rowcount
+            # Management commands run in autocommit; VACUUM cannot run in a
+            # transaction (e.g. the test suite's)
+            if deleted and not connection.in_atomic_block:
+                cursor.execute(f'VACUUM (ANALYZE) {table}')
+        return deleted
+
+
+class SQLitePartitions:
+    """Emulated partitions: month buckets over the plain table."""
+
+    def list_months(self):
+        from .models import AuditLog
+        return [month_start(month) for month in AuditLog.objects.dates('created_at', 'month')]
+
+    def default_months(self):
+        # list_months() already covers every stored row
+        return []
+
+    def create(self, month):
+        # Rows of every month live in the same table
+        return None
+
+    def drop(self, month):
+        from .models import AuditLog
+        start, end = month_bounds(month)
+        AuditLog.objects.filter(created_at__gte=start, created_at__lt=end).delete()
+
+    def compact(self, month, plans):
+        from .models import AuditLog
+        start, end = month_bounds(month)
+        deleted, _ = AuditLog.objects.filter(
+            created_at__gte=start,
+            created_at__lt=end,
+            tenant__subscription_plan__in=plans,
+        ).delete()
+        return deleted
+
+
+def get_partitions():
+    if connection.vendor == 'postgresql':
+        return PostgresPartitions()
+    return SQLitePartitions()
@@ -1,5 +1,6 @@
 from rest_framework import serializers
 from .models import AuditLog
+from core.projections import Field, Projection
 
 
 class AuditLogSerializer(serializers.ModelSerializer):
@@ -23,3 +24,20 @@ class AuditLogSerializer(serializers.ModelSerializer):
             'created_at'
         ]
         read_only_fields = fields
+
+
+# AuditLogSerializer as a projection for list endpoints (core.projections)
+audit_log_projection = Projection(
+    AuditLog,
+    id=Field(),
+    tenant=Field(),
+    tenant_name=Field('tenant__name'),
+    user=Field(),
+    user_email=Field('user__email'),
+    user_name=Field('user__full_name'),
+    action=Field(),
+    entity_type=Field(),
+    entity_id=Field(),
+    ip_address=Field(),
+    created_at=Field(),
+)
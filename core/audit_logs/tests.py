@@ -1,3 +1,300 @@
-from django.test import TestCase
+"""Tests for audit_logs app."""
+import uuid
+from datetime import date, timedelta
+from io import StringIO
+from unittest import skipUnless
+from django.core.management import call_command
+from django.db import connection
+from django.db.migrations.executor import MigrationExecutor
+from django.test import TestCase, TransactionTestCase
+from django.utils import timezone
+from rest_framework.test import APITestCase, APIClient
+from rest_framework import status
+from accounts.models import User
+from tenants.models import Tenant
+from audit_logs.models import AuditLog
+from audit_logs.serializers import AuditLogSerializer, audit_log_projection
+from audit_logs.partitions import add_months, expired_plans, month_start
+from audit_logs.writer import AuditLogWriter
 
-# Create your tests here.
+
+class AuditLogPaginationTests(APITestCase):
+    """Test cases for cursor pagination of audit logs"""
+
+    def setUp(self):
+        self.client = APIClient()
+        self.tenant = Tenant.objects.create(name="Demo Company", subdomain="demo")
+        self.admin = User.objects.create_user(
+            email="admin@demo.com",
+            password="Admin@123",
+            full_name="Demo Admin",
+            tenant=self.tenant,
+            role="tenant_admin"
+        )
+        self.client.force_authenticate(self.admin)
+        now = timezone.now()
+        logs = AuditLog.objects.bulk_create([
+            AuditLog(
+                tenant=self.tenant,
+                user=self.admin,
+                action='UPDATE_TENANT',
+                entity_type='tenant',
+                entity_id=str(self.tenant.id)
+            )
+            for _ in range(7)
+        ])
+        # Two entries share a timestamp to exercise the id tie-breaker
+        for i, log in enumerate(logs):
+            AuditLog.objects.filter(id=log.id).update(created_at=now - timedelta(minutes=min(i, 5)))
+
+    def test_cursor_walks_all_logs_once(self):
+        """Test following nextCursor returns every log exactly once, newest first"""
+        seen = []
+        cursor = None
+        while True:
+            params = {'limit': 3}
+            if cursor:
+                params['cursor'] = cursor
+            response = self.client.get('/api/audit-logs/', params)
+            self.assertEqual(response.status_code, status.HTTP_200_OK)
+            data = response.data['data']
+            seen.extend(data['logs'])
+            cursor = data['pagination']['nextCursor']
+            if not cursor:
+                break
+
+        self.assertEqual(len(seen), 7)
+        self.assertEqual(len({log['id'] for log in seen}), 7)
+        timestamps = [log['created_at'] for log in seen]
+        self.assertEqual(timestamps, sorted(timestamps, reverse=True))
+
+    def test_total_is_opt_in(self):
+        """Test totals are only counted when requested"""
+        response = self.client.get('/api/audit-logs/', {'limit': 2})
+        self.assertIsNone(response.data['data']['total'])
+        response = self.client.get('/api/audit-logs/', {'limit': 2, 'includeTotal': 'exact'})
+        self.assertEqual(response.data['data']['total'], 7)
+
+    def test_tampered_cursor_is_rejected(self):
+        """Test an invalid cursor returns 400"""
+        response = self.client.get('/api/audit-logs/', {'cursor': 'not-a-cursor'})
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+
+class AuditLogWriterTests(TestCase):
+    """Test cases for the buffered audit log writer"""
+
+    def setUp(self):
+        self.tenant = Tenant.objects.create(name="Demo Company", subdomain="demo")
+        # A long interval keeps the flusher thread idle; tests flush explicitly
+        self.writer = AuditLogWriter(batch_size=1000, flush_interval=3600, max_queue=3)
+
+    def tearDown(self):
+        self.writer.close()
+
+    def entry(self):
+        return AuditLog(
+            tenant=self.tenant,
+            action='UPDATE_TENANT',
+            entity_type='tenant',
+            entity_id=str(self.tenant.id)
+        )
+
+    def test_entries_are_batched_until_flush(self):
+        """Test queued entries are written together on flush"""
+        for _ in range(3):
+            self.writer.enqueue(self.entry())
+        self.assertEqual(AuditLog.objects.count(), 0)
+
+        with self.assertNumQueries(3):  # savepoint, INSERT, release
+            self.assertEqual(self.writer.flush(), 3)
+        self.assertEqual(AuditLog.objects.count(), 3)
+        self.assertEqual(self.writer.stats()['written'], 3)
+
+    def test_full_queue_drops_entries(self):
+        """Test entries beyond max_queue are dropped and counted"""
+        for _ in range(4):
+            self.writer.enqueue(self.entry())
+        self.assertEqual(self.writer.stats()['dropped'], 1)
+        self.assertEqual(self.writer.flush(), 3)
+
+    def test_failed_batches_are_counted(self):
+        """Test an entry that cannot be inserted is counted as failed"""
+        self.writer.enqueue(self.entry())
+        bad = self.entry()
+        bad.action = None  # NOT NULL
+        self.writer.enqueue(bad)
+        with self.assertLogs('audit_logs.writer', 'ERROR'):
+            self.assertEqual(self.writer.flush(), 1)
+        self.assertEqual(self.writer.stats()['failed'], 1)
+        self.assertEqual(AuditLog.objects.count(), 1)
+
+    def test_bad_entry_does_not_drop_its_batch(self):
+        """Test the valid entries of a failing batch are still written"""
+        writer = AuditLogWriter(batch_size=1000, flush_interval=3600)
+        self.addCleanup(writer.close)
+        bad = self.entry()
+        bad.entity_type = None  # NOT NULL
+        for entry in (self.entry(), bad, self.entry()):
+            writer.enqueue(entry)
+
+        with self.assertLogs('audit_logs.writer', 'WARNING') as logs:
+            self.assertEqual(writer.flush(), 2)
+        self.assertEqual(writer.stats()['written'], 2)
+        self.assertEqual(writer.stats()['failed'], 1)
+        self.assertEqual([record.levelname for record in logs.records], ['WARNING', 'ERROR'])
+        self.assertEqual(AuditLog.objects.count(), 2)
+
+
+class AuditLogRetentionTests(TestCase):
+    """Test cases for monthly partition retention"""
+
+    def setUp(self):
+        self.free = Tenant.objects.create(name="Free", subdomain="free", subscription_plan='free')
+        self.pro = Tenant.objects.create(name="Pro", subdomain="pro", subscription_plan='pro')
+
+    def log(self, tenant, months_ago):
+        log = AuditLog.objects.create(
+            tenant=tenant,
+            action='UPDATE_TENANT',
+            entity_type='tenant',
+            entity_id=str(tenant.id)
+        )
+        created_at = timezone.now().replace(day=15) - timedelta(days=31 * months_ago)
+        AuditLog.objects.filter(id=log.id).update(created_at=created_at)
+        return log
+
+    def test_expired_plans(self):
+        """Test a month expires per plan once it leaves the retention window"""
+        today = date(2026, 10, 18)
+        self.assertEqual(expired_plans(date(2026, 7, 1), today), [])
+        self.assertEqual(expired_plans(date(2026, 6, 1), today), ['free'])
+        self.assertEqual(expired_plans(date(2023, 9, 1), today), ['enterprise', 'free', 'pro'])
+
+    def test_retention_compacts_and_drops_months(self):
+        """Test old months are compacted per plan and dropped past every window"""
+        recent = self.log(self.free, 1)
+        free_expired = self.log(self.free, 6)
+        pro_kept = self.log(self.pro, 6)
+        ancient = self.log(self.pro, 40)
+
+        call_command('manage_audit_partitions', stdout=StringIO())
+
+        remaining = set(AuditLog.objects.values_list('id', flat=True))
+        self.assertEqual(remaining, {recent.id, pro_kept.id})
+        self.assertNotIn(free_expired.id, remaining)
+        self.assertNotIn(ancient.id, remaining)
+
+    def test_month_arithmetic(self):
+        """Test month helpers wrap across years"""
+        self.assertEqual(add_months(date(2026, 11, 1), 3), date(2027, 2, 1))
+        self.assertEqual(add_months(date(2026, 1, 1), -1), date(2025, 12, 1))
+        self.assertEqual(month_start(date(2026, 10, 18)), date(2026, 10, 1))
+
+
+def migrate(targets=None):
+    """Migrate the test database to ``targets`` (default: the latest migrations)."""
+    executor = MigrationExecutor(connection)
+    executor.migrate(targets or executor.loader.graph.leaf_nodes())
+
+
+def table_layout(table):
+    """relkind, primary key and the names of the indexes and foreign keys of ``table``."""
+    with connection.cursor() as cursor:
+        cursor.execute('SELECT relkind FROM pg_class WHERE oid = %s::regclass', [table])
+        relkind = cursor.fetchone()[0]
+        cursor.execute(
+            "SELECT pg_get_constraintdef(oid) FROM pg_constraint WHERE conrelid = %s::regclass AND contype = 'p'",
+            [table],
+        )
+        primary_key = cursor.fetchone()
+        cursor.execute(
+            'SELECT indexrelid::regclass::text FROM pg_index WHERE indrelid = %s::regclass AND NOT indisprimary',
+            [table],
+        )
+        indexes = {row[0] for row in cursor.fetchall()}
+        cursor.execute(
+            "SELECT conname FROM pg_constraint WHERE conrelid = %s::regclass AND contype = 'f'",
+            [table],
+        )
+        foreign_keys = {row[0] for row in cursor.fetchall()}
+    return relkind, primary_key and primary_key[0], indexes, foreign_keys
+
+
+@skipUnless(connection.vendor == 'postgresql', 'Partitioning needs PostgreSQL')
+class AuditLogPartitionMigrationTests(TransactionTestCase):
+    """Test the monthly partitioning migration forwards and backwards with rows"""
+
+    def setUp(self):
+        self.tenant = Tenant.objects.create(name="Demo Company", subdomain="demo")
+        self.user = User.objects.create_user(
+            email="user@demo.com", password="User@1234", full_name="Demo User", tenant=self.tenant
+        )
+
+    def tearDown(self):
+        migrate()
+
+    def insert_logs(self, created_ats):
+        ids = [uuid.uuid4() for _ in created_ats]
+        with connection.cursor() as cursor:
+            for log_id, created_at in zip(ids, created_ats):
+                cursor.execute(
+                    'INSERT INTO audit_logs_auditlog '
+                    '(id, tenant_id, user_id, action, entity_type, entity_id, created_at) '
+                    'VALUES (%s, %s, %s, %s, %s, %s, %s)',
+                    [log_id, self.tenant.id, self.user.id, 'UPDATE_TENANT', 'tenant', str(self.tenant.id), created_at],
+                )
+        return set(ids)
+
+    def partition_of(self, log_id):
+        with connection.cursor() as cursor:
+            cursor.execute('SELECT tableoid::regclass::text FROM audit_logs_auditlog WHERE id = %s', [log_id])
+            return cursor.fetchone()[0]
+
+    def test_migrates_forwards_and_backwards_with_rows(self):
+        """Test 0003 keeps every row, index and foreign key in both directions"""
+        migrate([('audit_logs', '0002_auditlog_ip_address')])
+        plain = table_layout('audit_logs_auditlog')
+        self.assertEqual(plain[:2], ('r', 'PRIMARY KEY (id)'))
+        self.assertEqual(len(plain[3]), 2)
+
+        now = timezone.now()
+        old, current, future = now - timedelta(days=400), now, now + timedelta(days=31 * 8)
+        ids = self.insert_logs([old, current, future])
+        old_id, = self.insert_logs([old])
+        ids.add(old_id)
+
+        migrate([('audit_logs', '0003_partition_by_month')])
+        relkind, primary_key, indexes, foreign_keys = table_layout('audit_logs_auditlog')
+        self.assertEqual((relkind, primary_key), ('p', 'PRIMARY KEY (id, created_at)'))
+        self.assertEqual(foreign_keys, plain[3])
+        self.assertTrue(plain[2] < indexes)
+        self.assertEqual(set(AuditLog.all_objects.values_list('id', flat=True)), ids)
+        # Months from the oldest row on get partitions; later rows go to DEFAULT
+        self.assertEqual(self.partition_of(old_id), f'audit_logs_auditlog_p{old:%Y%m}')
+        self.assertEqual(
+            {self.partition_of(log_id) for log_id in ids - {old_id}} - {f'audit_logs_auditlog_p{old:%Y%m}'},
+            {f'audit_logs_auditlog_p{current:%Y%m}', 'audit_logs_auditlog_default'},
+        )
+
+        migrate([('audit_logs', '0002_auditlog_ip_address')])
+        self.assertEqual(table_layout('audit_logs_auditlog'), plain)
+        self.assertEqual(set(AuditLog.all_objects.values_list('id', flat=True)), ids)
+
+
+class AuditLogProjectionTests(TestCase):
+    """Test cases for the projection used by the audit log list"""
+
+    def test_projection_matches_serializer(self):
+        """Test the values() projection renders exactly like AuditLogSerializer"""
+        tenant = Tenant.objects.create(name="Demo Company", subdomain="demo")
+        user = User.objects.create_user(
+            email="user@demo.com", password="User@1234", full_name="Demo User", tenant=tenant
+        )
+        AuditLog.objects.create(tenant=tenant, user=user, action='CREATE_TASK', entity_type='task', entity_id='1', ip_address='10.0.0.1')
+        AuditLog.objects.create(action='LOGIN_FAILED', entity_type='user', entity_id='2')
+
+        logs = AuditLog.objects.order_by('action')
+        projected = audit_log_projection.project(audit_log_projection.values(logs))
+        self.assertEqual(projected, AuditLogSerializer(logs, many=True).data)
+        self.assertIsNone(projected[1]['tenant_name'])
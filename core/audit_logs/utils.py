@@ -1,4 +1,7 @@
+from django.db import transaction
+
 from .models import AuditLog
+from .writer import audit_writer
 
 
 def get_client_ip(request):
@@ -14,6 +17,11 @@ def get_client_ip(request):
 def log_action(request, action, entity_type, entity_id, tenant=None, user=None):
     """
     Create an audit log entry.
+
+    The entry is handed to the buffered audit_writer once the current
+    transaction commits (immediately outside a transaction), so a rolled
+    back request leaves no log behind and the request does not wait for the
+    INSERT. In sync mode (AUDIT_LOG_WRITER['SYNC']) it is inserted right away.
     
     Args:
         request: The HTTP request object (for IP address)
@@ -24,7 +32,7 @@ def log_action(request, action, entity_type, entity_id, tenant=None, user=None):
         user: The user (optional, will use request user if not provided)
     
     Returns:
-        AuditLog instance
+        AuditLog instance (unsaved until the writer flushes it)
     """
     if user is None and hasattr(request, 'user') and request.user.is_authenticated:
         user = request.user
@@ -34,7 +42,7 @@ def log_action(request, action, entity_type, entity_id, tenant=None, user=None):
     
     ip_address = get_client_ip(request) if request else None
     
-    audit_log = AuditLog.objects.create(
+    audit_log = AuditLog(
         tenant=tenant,
         user=user,
         action=action,
@@ -43,6 +51,11 @@ def log_action(request, action, entity_type, entity_id, tenant=None, user=None):
         ip_address=ip_address
     )
     
+    if audit_writer.sync:
+        audit_writer.enqueue(audit_log)
+    else:
+        transaction.on_commit(lambda: audit_writer.enqueue(audit_log))
+    
     return audit_log
 
 
@@ -60,6 +73,8 @@ class AuditActions:
     CREATE_TENANT = 'CREATE_TENANT'
     UPDATE_TENANT = 'UPDATE_TENANT'
     DELETE_TENANT = 'DELETE_TENANT'
+    EXPORT_TENANT_DATA = 'EXPORT_TENANT_DATA'
+    IMPORT_TENANT_DATA = 'IMPORT_TENANT_DATA'
     
     # Project actions
     CREATE_PROJECT = 'CREATE_PROJECT'
@@ -2,8 +2,11 @@ from rest_framework.decorators import api_view, permission_classes
 from rest_framework.permissions import IsAuthenticated
 from rest_framework.response import Response
 from rest_framework import status
+from core.pagination import CursorPaginator
 from .models import AuditLog
-from .serializers import AuditLogSerializer
+from .serializers import AuditLogSerializer, audit_log_projection
+
+audit_log_paginator = CursorPaginator(['-created_at', '-id'], default_limit=50, max_limit=100)
 
 
 @api_view(['GET'])
@@ -12,7 +15,8 @@ def list_audit_logs(request):
     """
     List audit logs for the current tenant.
     Super admins can see all logs, tenant admins see their tenant's logs.
-    Supports filtering by action, entity_type, and date range.
+    Supports filtering by action, entity_type, and date range, with cursor
+    pagination over (created_at, id).
     """
     user = request.user
     
@@ -20,7 +24,7 @@ def list_audit_logs(request):
     if user.role == 'super_admin':
         queryset = AuditLog.objects.all()
     else:
-        queryset = AuditLog.objects.filter(tenant=user.tenant)
+        queryset = AuditLog.objects.filter(tenant_id=user.tenant_id)
     
     # Filter by action
     action = request.query_params.get('action')
@@ -45,26 +49,18 @@ def list_audit_logs(request):
     if end_date:
         queryset = queryset.filter(created_at__lte=end_date)
     
-    # Pagination
-    page = int(request.query_params.get('page', 1))
-    limit = min(int(request.query_params.get('limit', 50)), 100)
-    offset = (page - 1) * limit
-    
-    total = queryset.count()
-    logs = queryset.order_by('-created_at')[offset:offset + limit]
-    
-    serializer = AuditLogSerializer(logs, many=True)
+    # Keyset pagination (?cursor=&limit=&includeTotal=)
+    page = audit_log_paginator.paginate(
+        request,
+        audit_log_projection.values(queryset, *audit_log_paginator.fields)
+    )
     
     return Response({
         'success': True,
         'data': {
-            'logs': serializer.data,
-            'total': total,
-            'pagination': {
-                'currentPage': page,
-                'totalPages': (total + limit - 1) // limit,
-                'limit': limit
-            }
+            'logs': audit_log_projection.project(page.items),
+            'total': page.total,
+            'pagination': page.metadata()
         }
     })
 
@@ -79,7 +75,7 @@ def get_audit_log(request, log_id):
         if user.role == 'super_admin':
             log = AuditLog.objects.get(id=log_id)
         else:
-            log = AuditLog.objects.get(id=log_id, tenant=user.tenant)
+            log = AuditLog.objects.get(id=log_id, tenant_id=user.tenant_id)
     except AuditLog.DoesNotExist:
         return Response({
             'success': False,
@@ -0,0 +1,166 @@
+import atexit
+import logging
+import os
+import threading
+from collections import deque
+
+from django.conf import settings
+from django.db import close_old_connections, transaction
+
+from .models import AuditLog
+
+logger = logging.getLogger(__name__)
+
+DEFAULTS = {
+    'SYNC': False,
+    'BATCH_SIZE': 100,
+    'FLUSH_INTERVAL': 1.0,
+    'MAX_QUEUE': 10000,
+}
+
+
+class AuditLogWriter:
+    """
+    Per-process buffer that writes audit log entries in batches.
+
+    Request threads only append to an in-memory queue; a background thread
+    writes the queue with ``bulk_create`` every ``flush_interval`` seconds or
+    as soon as ``batch_size`` entries are waiting. Entries beyond
+    ``max_queue`` are dropped rather than blocking requests. A batch that
+    fails is written again one entry at a time, so only the entries that
+    fail on their own are counted as failed and logged. Pending entries are
+    flushed when the worker process exits.
+
+    In sync mode every entry is inserted immediately, in the caller's
+    transaction, which is what the test suite uses.
+    """
+
+    def __init__(self, sync=False, batch_size=100, flush_interval=1.0, max_queue=10000):
+        self.sync = sync
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.max_queue = max_queue
+        self.written = 0
+        self.dropped = 0
+        self.failed = 0
+        self._reset()
+
+    @classmethod
+    def from_settings(cls):
+        options = {**DEFAULTS, **getattr(settings, 'AUDIT_LOG_WRITER', {})}
+        return cls(
+            sync=options['SYNC'],
+            batch_size=options['BATCH_SIZE'],
+            flush_interval=options['FLUSH_INTERVAL'],
+            max_queue=options['MAX_QUEUE'],
+        )
+
+    def _reset(self):
+        # Called at start-up and in forked children, which inherit the
+        # parent's queue but not its flusher thread.
+        self._pid = os.getpid()
+        self._queue = deque()
+        self._lock = threading.Lock()
+        self._wakeup = threading.Event()
+        self._stopping = False
+        self._thread = None
+
+    def enqueue(self, entry):
+        if self.sync:
+            AuditLog.objects.bulk_create([entry])
+            self.written += 1
+            return
+
+        if self._pid != os.getpid():
+            self._reset()
+        with self._lock:
+            if len(self._queue) >= self.max_queue:
+                self.dropped += 1
+                return
+            self._queue.append(entry)
+            pending = len(self._queue)
+            if self._thread is None:
+                self._start()
+        if pending >= self.batch_size:
+            self._wakeup.set()
+
+    def flush(self):
+        """Write every queued entry now. Returns the number written."""
+        written = 0
+        while True:
+            with self._lock:
+                batch = [
+                    self._queue.popleft()
+                    for _ in range(min(self.batch_size, len(self._queue)))
+                ]
+            if not batch:
+                return written
+            written += self._write(batch)
+
+    def close(self):
+        """Stop the flusher thread and drain the queue."""
+        self._stopping = True
+        self._wakeup.set()
+        if self._thread is not None:
+            self._thread.join(timeout=max(self.flush_interval * 2, 5))
+        self.flush()
+
+    def stats(self):
+        return {
+            'queued': len(self._queue),
+            'written': self.written,
+            'dropped': self.dropped,
+            'failed': self.failed,
+        }
+
+    def _start(self):
+        self._thread = threading.Thread(
+            target=self._run,
+            name='audit-log-writer',
+            daemon=True
+        )
+        self._thread.start()
+
+    def _run(self):
+        while not self._stopping:
+            self._wakeup.wait(self.flush_interval)
+            self._wakeup.clear()
+            close_old_connections()
+            self.flush()
+
+    def _write(self, batch):
+        try:
+            with transaction.atomic():
+                AuditLog.objects.bulk_create(batch)
+        except Exception:
+            logger.warning(
+                "Failed to write a batch of %d audit log entries, retrying one by one",
+                len(batch),
+                exc_info=True
+            )
+            return self._write_each(batch)
+        self.written += len(batch)
+        return len(batch)
+
+    def _write_each(self, batch):
+        # One bad entry (e.g. its user was deleted before the flush) must not
+        # cost the rest of the batch
+        written = 0
+        for entry in batch:
+            try:
+                with transaction.atomic():
+                    AuditLog.objects.bulk_create([entry])
+            except Exception:
+                self.failed += 1
+                logger.exception(
+                    "Failed to write audit log entry %s %s %s",
+                    entry.action, entry.entity_type, entry.entity_id
+                )
+            else:
+                written += 1
+        self.written += written
+        return written
+
+
+audit_writer = AuditLogWriter.from_settings()
+atexit.register(audit_writer.close)
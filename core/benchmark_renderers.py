@@ -0,0 +1,110 @@
+"""
+Micro-benchmark of DRF's JSONRenderer/JSONParser against core.renderers.
+
+Serializes in-memory tasks and audit logs (no database needed) with
+TaskListSerializer and AuditLogSerializer, then times rendering and parsing
+the payload with both implementations:
+
+    python benchmark_renderers.py --rows 1000 --repeat 50
+"""
+
+import argparse
+import io
+import os
+import timeit
+import uuid
+from datetime import date, timedelta
+
+os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'core.settings')
+os.environ.setdefault('SECRET_KEY', 'benchmark')
+import django
+django.setup()
+
+from django.utils import timezone
+from rest_framework.parsers import JSONParser
+from rest_framework.renderers import JSONRenderer
+from accounts.models import User
+from audit_logs.models import AuditLog
+from audit_logs.serializers import AuditLogSerializer
+from core import renderers
+from core.renderers import FastJSONParser, FastJSONRenderer
+from tasks.models import Task
+from tasks.serializers import TaskListSerializer
+from tenants.models import Tenant
+
+
+def build_payloads(rows):
+    tenant = Tenant(id=uuid.uuid4(), name='Benchmark Company', subdomain='benchmark')
+    users = [
+        User(id=uuid.uuid4(), email=f'user{i}@benchmark.com', full_name=f'User {i}', tenant=tenant)
+        for i in range(20)
+    ]
+    now = timezone.now()
+    tasks = [
+        Task(
+            id=uuid.uuid4(),
+            tenant=tenant,
+            title=f'Task {i}',
+            description='Lorem ipsum dolor sit amet, consectetur adipiscing elit. ' * 3,
+            status=('todo', 'in_progress', 'completed')[i % 3],
+            priority=('low', 'medium', 'high')[i % 3],
+            assigned_to=users[i % len(users)] if i % 4 else None,
+            due_date=date.today() + timedelta(days=i % 30),
+            created_at=now - timedelta(minutes=i),
+        )
+        for i in range(rows)
+    ]
+    logs = [
+        AuditLog(
+            id=uuid.uuid4(),
+            tenant=tenant,
+            user=users[i % len(users)],
+            action='UPDATE_TASK',
+            entity_type='task',
+            entity_id=str(tasks[i].id),
+            ip_address='10.0.0.1',
+            created_at=now - timedelta(seconds=i),
+        )
+        for i in range(rows)
+    ]
+    return {
+        'tasks': {'success': True, 'data': {'tasks': TaskListSerializer(tasks, many=True).data}},
+        'audit logs': {'success': True, 'data': {'logs': AuditLogSerializer(logs, many=True).data}},
+    }
+
+
+def best_of(func, repeat):
+    return min(timeit.repeat(func, number=1, repeat=repeat))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--rows', type=int, default=1000, help='Rows per payload')
+    parser.add_argument('--repeat', type=int, default=30, help='Timed runs (best is reported)')
+    options = parser.parse_args()
+
+    if renderers.orjson is None:
+        print('orjson is not installed: core.renderers falls back to the stdlib json module')
+
+    pairs = (
+        ('render', JSONRenderer(), FastJSONRenderer()),
+        ('parse', JSONParser(), FastJSONParser()),
+    )
+    print(f"{'payload':<12} {'step':<7} {'stdlib ms':>10} {'orjson ms':>10} {'speedup':>8}")
+    for name, data in build_payloads(options.rows).items():
+        body = JSONRenderer().render(data)
+        for step, stock, fast in pairs:
+            if step == 'render':
+                timings = [best_of(lambda r=r: r.render(data), options.repeat) for r in (stock, fast)]
+            else:
+                timings = [
+                    best_of(lambda p=p: p.parse(io.BytesIO(body)), options.repeat) for p in (stock, fast)
+                ]
+            print(
+                f'{name:<12} {step:<7} {timings[0] * 1000:>10.2f} {timings[1] * 1000:>10.2f} '
+                f'{timings[0] / timings[1]:>7.1f}x'
+            )
+
+
+if __name__ == '__main__':
+    main()
@@ -2,6 +2,8 @@
 ASGI config for core project.
 
 It exposes the ASGI callable as a module-level variable named ``application``.
+Realtime event streams (``/api/events`` and ``/ws/events``) are served by
+``realtime.asgi``; every other request goes to Django.
 
 For more information on this file, see
 https://docs.djangoproject.com/en/5.1/howto/deployment/asgi/
@@ -13,4 +15,8 @@ from django.core.asgi import get_asgi_application
 
 os.environ.setdefault("DJANGO_SETTINGS_MODULE", "core.settings")
 
-application = get_asgi_application()
+django_application = get_asgi_application()
+
+from realtime.asgi import RealtimeRouter  # noqa: E402  (needs configured settings)
+
+application = RealtimeRouter(django_application)
@@ -0,0 +1,163 @@
+"""
+Per-request SQL and timing instrumentation.
+
+``RequestInstrumentationMiddleware`` measures a sample of requests
+(``REQUEST_INSTRUMENTATION['SAMPLE_RATE']``): the number of SQL queries and
+the time spent in the database, in the view outside the database (business
+logic and serialization, which views do inline), in rendering the response
+and in total. With ``SERVER_TIMING`` (off by default: the figures tell any
+client how much SQL a request runs) sampled responses carry them in a
+``Server-Timing`` header, which browser developer tools display per request::
+
+    Server-Timing: db;dur=4.1;desc="7 queries", app;dur=2.3, render;dur=0.6, total;dur=7.4
+
+Queries are grouped by shape, their SQL with parameters as placeholders and
+``IN`` / ``VALUES`` lists collapsed. A shape executed at least
+``N_PLUS_ONE_THRESHOLD`` times in one request is logged as a suspected N+1
+(one JSON object per line on the ``core.instrumentation`` logger).
+
+Requests that are not sampled cost one random number.
+"""
+
+import json
+import logging
+import random
+import re
+import time
+from collections import Counter, defaultdict
+from contextlib import ExitStack
+
+from django.conf import settings
+from django.db import connections
+
+logger = logging.getLogger(__name__)
+
+DEFAULTS = {
+    'SAMPLE_RATE': 0.0,
+    'N_PLUS_ONE_THRESHOLD': 5,
+    'SERVER_TIMING': False,
+}
+
+_IN_LIST = re.compile(r'\bIN\s*\(\s*%s(?:\s*,\s*%s)*\s*\)', re.IGNORECASE)
+_VALUES_ROWS = re.compile(r'(\([^()]*\))(?:\s*,\s*\1)+')
+
+
+def instrumentation_settings():
+    return {**DEFAULTS, **getattr(settings, 'REQUEST_INSTRUMENTATION', {})}
+
+
+def query_shape(sql):
+    """``sql`` with parameter lists collapsed, so that N+1 queries compare equal."""
+    sql = _IN_LIST.sub('IN (%s, ...)', sql)
+    return _VALUES_ROWS.sub(r'\1, ...', sql)
+
+
+class RequestMetrics:
+    """Queries and timings of one request; also the execute wrapper recording them."""
+
+    def __init__(self):
+        self.started = time.perf_counter()
+        self.queries = 0
+        self.db_time = 0.0
+        self.shapes = Counter()
+        self.shape_time = defaultdict(float)
+        self.view = None
+        self.view_started = None
+        self.view_db_time = 0.0
+        self.view_time = None
+        self.render_started = None
+        self.render_time = None
+
+    def __call__(self, execute, sql, params, many, context):
+        start = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            elapsed = time.perf_counter() - start
+            shape = query_shape(sql)
+            self.queries += 1
+            self.db_time += elapsed
+            self.shapes[shape] += 1
+            self.shape_time[shape] += elapsed
+
+    def start_view(self):
+        self.view_started = time.perf_counter()
+        self.view_db_time = self.db_time
+
+    def end_view(self):
+        if self.view_started is not None and self.view_time is None:
+            self.view_time = time.perf_counter() - self.view_started
+            self.view_db_time = self.db_time - self.view_db_time
+
+    def start_render(self):
+        self.render_started = time.perf_counter()
+
+    def end_render(self):
+        self.render_time = time.perf_counter() - self.render_started
+
+    def server_timing(self, total):
+        metrics = [f'db;dur={self.db_time * 1000:.1f};desc="{self.queries} queries"']
+        if self.view_time is not None:
+            app = max(self.view_time - self.view_db_time, 0.0)
+            metrics.append(f'app;dur={app * 1000:.1f}')
+        if self.render_time is not None:
+            metrics.append(f'render;dur={self.render_time * 1000:.1f}')
+        metrics.append(f'total;dur={total * 1000:.1f}')
+        return ', '.join(metrics)
+
+    def repeated_shapes(self, threshold):
+        return [(shape, count) for shape, count in self.shapes.most_common() if count >= threshold]
+
+
+class RequestInstrumentationMiddleware:
+    """Measure a sample of requests; see the module docstring."""
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        options = instrumentation_settings()
+        rate = options['SAMPLE_RATE']
+        if rate <= 0 or (rate < 1 and random.random() >= rate):
+            return self.get_response(request)
+
+        metrics = request.instrumentation = RequestMetrics()
+        with ExitStack() as stack:
+            for connection in connections.all():
+                stack.enter_context(connection.execute_wrapper(metrics))
+            response = self.get_response(request)
+        metrics.end_view()
+        total = time.perf_counter() - metrics.started
+
+        if options['SERVER_TIMING']:
+            response['Server-Timing'] = metrics.server_timing(total)
+        self.log_repeated_queries(request, metrics, options['N_PLUS_ONE_THRESHOLD'])
+        return response
+
+    def process_view(self, request, view_func, view_args, view_kwargs):
+        metrics = getattr(request, 'instrumentation', None)
+        if metrics is not None:
+            metrics.view = f'{view_func.__module__}.{view_func.__name__}'
+            metrics.start_view()
+
+    def process_template_response(self, request, response):
+        # DRF responses are rendered after this hook
+        metrics = getattr(request, 'instrumentation', None)
+        if metrics is not None:
+            metrics.end_view()
+            metrics.start_render()
+            response.add_post_render_callback(lambda rendered: metrics.end_render())
+        return response
+
+    def log_repeated_queries(self, request, metrics, threshold):
+        for shape, count in metrics.repeated_shapes(threshold):
+            logger.warning(json.dumps({
+                'event': 'suspected_n_plus_one',
+                'method': request.method,
+                'path': request.path,
+                'view': metrics.view,
+                'count': count,
+                'durationMs': round(metrics.shape_time[shape] * 1000, 2),
+                'queries': metrics.queries,
+                'sql': shape,
+            }))
@@ -0,0 +1,230 @@
+"""
+Keyset (cursor) pagination shared by the list endpoints.
+
+Pages are selected with a WHERE clause over the ordering columns, e.g.
+``(created_at, id) < (<last created_at>, <last id>)``, instead of OFFSET, so
+the cost of fetching a page does not grow with its depth. Cursors are opaque,
+signed tokens holding the ordering values of the last row of the previous
+page; a tampered cursor or one issued for another ordering is rejected.
+
+Usage in a view::
+
+    paginator = CursorPaginator(['-created_at', '-id'], default_limit=50)
+    page = paginator.paginate(request, queryset)
+    ... page.items ..., page.metadata()
+
+Query parameters understood by ``paginate``:
+
+- ``cursor``: value of ``nextCursor`` from the previous page
+- ``limit``: page size (capped at ``max_limit``)
+- ``includeTotal``: ``exact`` (or ``true``) for a COUNT, ``estimate`` for the
+  planner's row estimate on PostgreSQL (falls back to COUNT elsewhere)
+"""
+
+import datetime
+import decimal
+import json
+import uuid
+
+from django.core import signing
+from django.core.exceptions import FieldDoesNotExist
+from django.db import connections
+from django.db.models import F, Q
+from rest_framework.exceptions import ValidationError
+
+
+def _encode_value(value):
+    if isinstance(value, (datetime.datetime, datetime.date, datetime.time)):
+        return value.isoformat()
+    if isinstance(value, (uuid.UUID, decimal.Decimal)):
+        return str(value)
+    return value
+
+
+def _nullable(model, name):
+    try:
+        return model._meta.get_field(name).null
+    except FieldDoesNotExist:
+        return True
+
+
+def estimate_count(queryset):
+    """
+    Approximate row count of a queryset.
+
+    Uses the planner estimate on PostgreSQL (no table scan); other backends
+    fall back to an exact COUNT.
+    """
+    connection = connections[queryset.db]
+    if connection.vendor != 'postgresql':
+        return queryset.count()
+    sql, params = queryset.order_by().query.sql_with_params()
+    with connection.cursor() as cursor:
+        cursor.execute('EXPLAIN (FORMAT JSON) ' + sql, params)
+        plan = cursor.fetchone()[0]
+    if isinstance(plan, str):
+        plan = json.loads(plan)
+    return int(plan[0]['Plan']['Plan Rows'])
+
+
+class CursorPage:
+    def __init__(self, items, limit, next_cursor=None, total=None):
+        self.items = items
+        self.limit = limit
+        self.next_cursor = next_cursor
+        self.total = total
+
+    @property
+    def has_more(self):
+        return self.next_cursor is not None
+
+    def __iter__(self):
+        return iter(self.items)
+
+    def __len__(self):
+        return len(self.items)
+
+    def metadata(self):
+        data = {
+            'limit': self.limit,
+            'nextCursor': self.next_cursor,
+            'hasMore': self.has_more,
+        }
+        if self.total is not None:
+            data['total'] = self.total
+        return data
+
+
+class CursorPaginator:
+    """
+    Paginate a queryset by a fixed ordering with signed keyset cursors.
+
+    ``ordering`` is a list of field names as accepted by ``order_by``. The
+    primary key is appended as a tie-breaker when it is not already part of
+    the ordering, so every position is unique. Nullable keys sort last in
+    both directions. Querysets may yield model instances or ``values()``
+    dicts, as long as the dicts contain the ordering fields.
+    """
+
+    def __init__(self, ordering, default_limit=50, max_limit=100):
+        ordering = list(ordering)
+        if 'id' not in [name.lstrip('-') for name in ordering]:
+            ordering.append('-id' if ordering and ordering[-1].startswith('-') else 'id')
+        self.keys = [(name.lstrip('-'), name.startswith('-')) for name in ordering]
+        self.default_limit = default_limit
+        self.max_limit = max_limit
+        self.salt = 'core.pagination:' + ','.join(ordering)
+
+    @property
+    def fields(self):
+        """Names of the ordering columns (to include in ``values()``)."""
+        return [name for name, _ in self.keys]
+
+    # ----- query parameters -----
+
+    def get_limit(self, request):
+        raw = request.query_params.get('limit')
+        if raw in (None, ''):
+            return self.default_limit
+        try:
+            limit = int(raw)
+        except ValueError:
+            raise ValidationError({'limit': 'Must be an integer.'})
+        return max(1, min(limit, self.max_limit))
+
+    def decode_cursor(self, cursor, model):
+        try:
+            values = signing.loads(cursor, salt=self.salt)
+        except signing.BadSignature:
+            raise ValidationError({'cursor': 'Invalid cursor.'})
+        return self.decode_position(values, model)
+
+    def decode_position(self, values, model):
+        """Inverse of ``position``: ordering values as the model's Python types."""
+        if not isinstance(values, list) or len(values) != len(self.keys):
+            raise ValidationError({'cursor': 'Invalid cursor.'})
+        decoded = []
+        for (name, _), value in zip(self.keys, values):
+            if value is not None:
+                try:
+                    field = model._meta.get_field(name)
+                except FieldDoesNotExist:
+                    field = None  # annotation; JSON value is used as is
+                if field is not None:
+                    value = field.to_python(value)
+            decoded.append(value)
+        return decoded
+
+    def position(self, row):
+        """JSON-serializable ordering values of ``row`` (unsigned)."""
+        values = []
+        for name, _ in self.keys:
+            if isinstance(row, dict):
+                value = row[name]
+            else:
+                value = getattr(row, name)
+            values.append(_encode_value(value))
+        return values
+
+    def encode_cursor(self, row):
+        return signing.dumps(self.position(row), salt=self.salt, compress=True)
+
+    # ----- query building -----
+
+    def ordering(self, model):
+        """The ordering as ``order_by`` arguments (also usable in windows)."""
+        ordering = []
+        for name, descending in self.keys:
+            if _nullable(model, name):
+                ordering.append(
+                    F(name).desc(nulls_last=True) if descending else F(name).asc(nulls_last=True)
+                )
+            else:
+                # Plain ordering keeps non-null keys index-friendly
+                ordering.append(f'-{name}' if descending else name)
+        return ordering
+
+    def order_by(self, queryset):
+        return queryset.order_by(*self.ordering(queryset.model))
+
+    def after(self, model, values):
+        """Q selecting rows strictly after the given key values."""
+        condition = Q(pk__in=[])
+        equal = Q()
+        for (name, descending), value in zip(self.keys, values):
+            if value is None:
+                # Nulls sort last: nothing comes after a null except ties
+                equal &= Q(**{f'{name}__isnull': True})
+                continue
+            lookup = 'lt' if descending else 'gt'
+            beyond = Q(**{f'{name}__{lookup}': value})
+            if _nullable(model, name):
+                beyond |= Q(**{f'{name}__isnull': True})
+            condition |= equal & beyond
+            equal &= Q(**{name: value})
+        return condition
+
+    # ----- entry point -----
+
+    def paginate(self, request, queryset):
+        limit = self.get_limit(request)
+
+        total = None
+        include_total = (request.query_params.get('includeTotal') or '').lower()
+        if include_total in ('exact', 'true', '1'):
+            total = queryset.count()
+        elif include_total == 'estimate':
+            total = estimate_count(queryset)
+
+        cursor = request.query_params.get('cursor')
+        if cursor:
+            queryset = queryset.filter(
+                self.after(queryset.model, self.decode_cursor(cursor, queryset.model))
+            )
+
+        rows = list(self.order_by(queryset)[:limit + 1])
+        next_cursor = None
+        if len(rows) > limit:
+            rows = rows[:limit]
+            next_cursor = self.encode_cursor(rows[-1])
+        return CursorPage(rows, limit, next_cursor=next_cursor, total=total)
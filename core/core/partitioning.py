@@ -0,0 +1,341 @@
+"""
+Optional hash partitioning of the tenant-scoped tables by ``tenant_id``.
+
+With ``TENANT_HASH_PARTITIONS`` set to N (> 0) on PostgreSQL, the migrations
+of ``tasks`` and ``audit_logs`` rebuild their tables as N hash partitions on
+``tenant_id``, named ``<table>_h0`` … ``<table>_h<N-1>``. A query filtered by
+one tenant is pruned to a single partition, so small tenants no longer scan
+the indexes of big ones, and VACUUM / ANALYZE work per partition.
+
+- ``tasks_task`` becomes ``PARTITION BY HASH (tenant_id)``. The partition key
+  must be part of the primary key, which becomes ``(id, tenant_id)``.
+- ``audit_logs_auditlog`` is already range partitioned by month (see
+  audit_logs.partitions); every month partition, including the DEFAULT one,
+  is sub-partitioned by tenant instead. ``tenant_id`` is nullable there (super
+  admin actions), so it cannot be part of a primary key: the primary key is
+  replaced by a plain index on ``id`` (ids are random UUIDs).
+
+Indexes, foreign keys and triggers (full-text search) are recreated under
+their original names. With the setting at 0, or on SQLite, the tables stay
+as they are; ``verify_tenant_partitions --convert`` partitions them later.
+Migrating back rebuilds the tables as they were before, whatever the setting.
+
+A foreign key from another table must reference a unique key that includes
+``tenant_id``, so a table referenced by foreign keys on ``id`` alone is not
+partitioned: NotSupportedError names the foreign keys before anything is
+changed.
+"""
+
+import json
+
+from django.conf import settings
+from django.db import NotSupportedError, connections, migrations
+
+PARTITIONED_TABLES = ('tasks_task', 'audit_logs_auditlog')
+
+
+def partition_count():
+    return getattr(settings, 'TENANT_HASH_PARTITIONS', 0)
+
+
+def hash_partition_name(table, remainder):
+    return f'{table}_h{remainder}'
+
+
+def create_hash_partitions(cursor, table, count):
+    for remainder in range(count):
+        cursor.execute(
+            f'CREATE TABLE {hash_partition_name(table, remainder)} PARTITION OF {table} '
+            f'FOR VALUES WITH (MODULUS {count}, REMAINDER {remainder})'
+        )
+
+
+def _relkind(cursor, table):
+    cursor.execute('SELECT relkind FROM pg_class WHERE oid = %s::regclass', [table])
+    return cursor.fetchone()[0]
+
+
+def _child_partitions(cursor, table):
+    """``(name, bound, relkind)`` of the direct partitions of ``table``."""
+    cursor.execute(
+        """
+        SELECT child.relname, pg_get_expr(child.relpartbound, child.oid), child.relkind
+        FROM pg_inherits
+        JOIN pg_class child ON child.oid = pg_inherits.inhrelid
+        WHERE pg_inherits.inhparent = %s::regclass
+        ORDER BY child.relname
+        """,
+        [table],
+    )
+    return cursor.fetchall()
+
+
+def hash_modulus(cursor, table):
+    """Number of tenant hash partitions of ``table`` (0 if not hash partitioned)."""
+    cursor.execute(
+        "SELECT partstrat FROM pg_partitioned_table WHERE partrelid = %s::regclass",
+        [table],
+    )
+    row = cursor.fetchone()
+    if row is None or row[0] != 'h':
+        return 0
+    return len(_child_partitions(cursor, table))
+
+
+def _check_not_referenced(cursor, table):
+    cursor.execute(
+        "SELECT conrelid::regclass::text, conname FROM pg_constraint "
+        "WHERE confrelid = %s::regclass AND contype = 'f' AND conparentid = 0",
+        [table],
+    )
+    references = [f'{referencing}.{name}' for referencing, name in cursor.fetchall()]
+    if references:
+        raise NotSupportedError(
+            f'{table} is referenced by foreign keys ({", ".join(references)}); '
+            f'drop them or include tenant_id in them before partitioning {table}'
+        )
+
+
+def _partition_key(cursor, table):
+    """Columns of the partition key of ``table``."""
+    cursor.execute(
+        """
+        SELECT attribute.attname
+        FROM pg_partitioned_table parent
+        JOIN pg_attribute attribute
+          ON attribute.attrelid = parent.partrelid AND attribute.attnum = ANY(parent.partattrs::int2[])
+        WHERE parent.partrelid = %s::regclass
+        ORDER BY array_position(parent.partattrs::int2[], attribute.attnum)
+        """,
+        [table],
+    )
+    return [row[0] for row in cursor.fetchall()]
+
+
+def _partition_plain_table(cursor, table, count):
+    legacy = f'{table}_unpartitioned'
+    cursor.execute(
+        "SELECT pg_get_indexdef(indexrelid) FROM pg_index "
+        "WHERE indrelid = %s::regclass AND NOT indisprimary",
+        [table],
+    )
+    index_definitions = [row[0] for row in cursor.fetchall()]
+    cursor.execute(
+        "SELECT conname, contype, pg_get_constraintdef(oid) FROM pg_constraint "
+        "WHERE conrelid = %s::regclass AND contype IN ('p', 'f')",
+        [table],
+    )
+    constraints = cursor.fetchall()
+    primary_key = next(name for name, kind, _ in constraints if kind == 'p')
+    foreign_keys = [(name, definition) for name, kind, definition in constraints if kind == 'f']
+    cursor.execute(
+        "SELECT pg_get_triggerdef(oid) FROM pg_trigger "
+        "WHERE tgrelid = %s::regclass AND NOT tgisinternal",
+        [table],
+    )
+    triggers = [row[0] for row in cursor.fetchall()]
+
+    cursor.execute(f'ALTER TABLE {table} RENAME TO {legacy}')
+    cursor.execute(f'ALTER TABLE {legacy} RENAME CONSTRAINT {primary_key} TO {legacy}_pkey')
+    cursor.execute(f'CREATE TABLE {table} (LIKE {legacy} INCLUDING DEFAULTS) PARTITION BY HASH (tenant_id)')
+    # The partition key must be part of the primary key
+    cursor.execute(f'ALTER TABLE {table} ADD CONSTRAINT {primary_key} PRIMARY KEY (id, tenant_id)')
+    create_hash_partitions(cursor, table, count)
+
+    # Copied rows keep their search vectors; the triggers are added afterwards
+    cursor.execute(f'INSERT INTO {table} SELECT * FROM {legacy}')
+    cursor.execute(f'DROP TABLE {legacy}')
+    for definition in index_definitions:
+        cursor.execute(definition)
+    for name, definition in foreign_keys:
+        cursor.execute(f'ALTER TABLE {table} ADD CONSTRAINT {name} {definition}')
+    for definition in triggers:
+        cursor.execute(definition)
+
+
+def _subpartition_range_table(cursor, table, count):
+    cursor.execute(
+        "SELECT conname, pg_get_constraintdef(oid) FROM pg_constraint "
+        "WHERE conrelid = %s::regclass AND contype = 'p'",
+        [table],
+    )
+    row = cursor.fetchone()
+    if row is not None and 'tenant_id' not in row[1]:
+        cursor.execute(f'ALTER TABLE {table} DROP CONSTRAINT {row[0]}')
+        cursor.execute(f'CREATE INDEX {table}_id_idx ON {table} (id)')
+
+    for name, bound, relkind in _child_partitions(cursor, table):
+        if relkind == 'p':
+            continue
+        legacy = f'{name}_unpartitioned'
+        cursor.execute(f'ALTER TABLE {table} DETACH PARTITION {name}')
+        cursor.execute(f'ALTER TABLE {name} RENAME TO {legacy}')
+        cursor.execute(f'CREATE TABLE {name} PARTITION OF {table} {bound} PARTITION BY HASH (tenant_id)')
+        create_hash_partitions(cursor, name, count)
+        cursor.execute(f'INSERT INTO {name} SELECT * FROM {legacy}')
+        cursor.execute(f'DROP TABLE {legacy}')
+
+
+def partition_by_tenant(cursor, table, count):
+    """
+    Hash partition ``table`` by ``tenant_id`` into ``count`` partitions.
+
+    A plain table is rebuilt as a hash partitioned one; the partitions of a
+    range partitioned table are each sub-partitioned. Returns False if the
+    table was already partitioned by tenant.
+    """
+    if _relkind(cursor, table) == 'r':
+        _check_not_referenced(cursor, table)
+        _partition_plain_table(cursor, table, count)
+        return True
+    children = _child_partitions(cursor, table)
+    if hash_modulus(cursor, table) or all(relkind == 'p' for _, _, relkind in children):
+        return False
+    _check_not_referenced(cursor, table)
+    _subpartition_range_table(cursor, table, count)
+    return True
+
+
+def _unpartition_hash_table(cursor, table):
+    plain = f'{table}_plain'
+    cursor.execute(
+        "SELECT pg_get_indexdef(indexrelid) FROM pg_index "
+        "WHERE indrelid = %s::regclass AND NOT indisprimary",
+        [table],
+    )
+    # Indexes of a partitioned table are defined ON ONLY the parent
+    index_definitions = [row[0].replace(' ON ONLY ', ' ON ', 1) for row in cursor.fetchall()]
+    cursor.execute(
+        "SELECT conname, contype, pg_get_constraintdef(oid) FROM pg_constraint "
+        "WHERE conrelid = %s::regclass AND contype IN ('p', 'f')",
+        [table],
+    )
+    constraints = cursor.fetchall()
+    primary_key = next(name for name, kind, _ in constraints if kind == 'p')
+    foreign_keys = [(name, definition) for name, kind, definition in constraints if kind == 'f']
+    cursor.execute(
+        "SELECT pg_get_triggerdef(oid) FROM pg_trigger "
+        "WHERE tgrelid = %s::regclass AND NOT tgisinternal",
+        [table],
+    )
+    triggers = [row[0] for row in cursor.fetchall()]
+
+    cursor.execute(f'CREATE TABLE {plain} (LIKE {table} INCLUDING DEFAULTS)')
+    cursor.execute(f'INSERT INTO {plain} SELECT * FROM {table}')
+    cursor.execute(f'DROP TABLE {table}')
+    cursor.execute(f'ALTER TABLE {plain} RENAME TO {table}')
+    cursor.execute(f'ALTER TABLE {table} ADD CONSTRAINT {primary_key} PRIMARY KEY (id)')
+    for definition in index_definitions:
+        cursor.execute(definition)
+    for name, definition in foreign_keys:
+        cursor.execute(f'ALTER TABLE {table} ADD CONSTRAINT {name} {definition}')
+    for definition in triggers:
+        cursor.execute(definition)
+
+
+def _unpartition_range_table(cursor, table):
+    for name, bound, relkind in _child_partitions(cursor, table):
+        if relkind != 'p':
+            continue
+        legacy = f'{name}_partitioned'
+        cursor.execute(f'ALTER TABLE {table} DETACH PARTITION {name}')
+        cursor.execute(f'ALTER TABLE {name} RENAME TO {legacy}')
+        cursor.execute(f'CREATE TABLE {name} PARTITION OF {table} {bound}')
+        cursor.execute(f'INSERT INTO {name} SELECT * FROM {legacy}')
+        cursor.execute(f'DROP TABLE {legacy}')
+
+    cursor.execute(
+        "SELECT 1 FROM pg_constraint WHERE conrelid = %s::regclass AND contype = 'p'",
+        [table],
+    )
+    if cursor.fetchone() is None:
+        columns = ', '.join(['id', *_partition_key(cursor, table)])
+        cursor.execute(f'DROP INDEX IF EXISTS {table}_id_idx')
+        cursor.execute(f'ALTER TABLE {table} ADD CONSTRAINT {table}_pkey PRIMARY KEY ({columns})')
+
+
+def unpartition_by_tenant(cursor, table):
+    """
+    Undo partition_by_tenant: rebuild a hash partitioned ``table`` as a plain
+    table with an ``id`` primary key, or turn the sub-partitioned partitions
+    of a range partitioned one back into plain partitions. Returns False if
+    ``table`` was not partitioned by tenant.
+    """
+    if _relkind(cursor, table) != 'p':
+        return False
+    if hash_modulus(cursor, table):
+        _check_not_referenced(cursor, table)
+        _unpartition_hash_table(cursor, table)
+        return True
+    if all(relkind != 'p' for _, _, relkind in _child_partitions(cursor, table)):
+        return False
+    _unpartition_range_table(cursor, table)
+    return True
+
+
+def tenant_partitioning_operations(table):
+    """Migration operations hash partitioning ``table`` if the setting asks for it."""
+
+    def partition(apps, schema_editor):
+        count = partition_count()
+        if schema_editor.connection.vendor != 'postgresql' or count <= 0:
+            return
+        with schema_editor.connection.cursor() as cursor:
+            partition_by_tenant(cursor, table, count)
+
+    def unpartition(apps, schema_editor):
+        # The setting may have changed since, or the table been converted later
+        if schema_editor.connection.vendor != 'postgresql':
+            return
+        with schema_editor.connection.cursor() as cursor:
+            unpartition_by_tenant(cursor, table)
+
+    return [migrations.RunPython(partition, unpartition)]
+
+
+# ----- verification -----
+
+def hash_partition_layout(cursor, table):
+    """
+    ``{parent: [(partition, modulus, remainder, estimated rows)]}`` for every
+    table in the partition tree of ``table`` that is hash partitioned.
+    """
+    cursor.execute(
+        """
+        SELECT tree.relid::regclass::text, tree.parentrelid::regclass::text,
+               pg_get_expr(child.relpartbound, child.oid), child.reltuples
+        FROM pg_partition_tree(%s::regclass) tree
+        JOIN pg_class child ON child.oid = tree.relid
+        JOIN pg_partitioned_table parent ON parent.partrelid = tree.parentrelid
+        WHERE tree.isleaf AND parent.partstrat = 'h'
+        ORDER BY 1
+        """,
+        [table],
+    )
+    layout = {}
+    for name, parent, bound, rows in cursor.fetchall():
+        # FOR VALUES WITH (modulus 16, remainder 3)
+        numbers = [int(word.strip(',)')) for word in bound.split() if word.strip(',)').isdigit()]
+        layout.setdefault(parent, []).append((name, numbers[0], numbers[1], max(int(rows), 0)))
+    return layout
+
+
+def plan_relations(plan):
+    """Names of the relations scanned by an ``EXPLAIN (FORMAT JSON)`` plan."""
+    relations = set()
+    nodes = [entry['Plan'] for entry in plan]
+    while nodes:
+        node = nodes.pop()
+        if 'Relation Name' in node:
+            relations.add(node['Relation Name'])
+        nodes.extend(node.get('Plans', []))
+    return relations
+
+
+def scanned_relations(queryset):
+    """Relations PostgreSQL would scan to run ``queryset``."""
+    sql, params = queryset.query.sql_with_params()
+    with connections[queryset.db].cursor() as cursor:
+        cursor.execute(f'EXPLAIN (FORMAT JSON) {sql}', params)
+        plan = cursor.fetchone()[0]
+    return plan_relations(json.loads(plan) if isinstance(plan, str) else plan)
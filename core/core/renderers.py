@@ -0,0 +1,109 @@
+"""
+JSON renderer and parser backed by orjson.
+
+orjson encodes dicts, lists, strings, numbers and UUIDs in C instead of
+calling back into ``JSONEncoder`` for every value, which is most of the
+cost of rendering long task and audit log lists. Everything else
+(datetimes, dates and times, Decimal, lazy translation strings, querysets,
+...) is converted by DRF's own encoder, so the rendered bytes are the same
+as ``JSONRenderer``'s. orjson would write NaN and infinite floats as
+``null``; payloads containing them are rendered by ``JSONRenderer``, which
+rejects them (``STRICT_JSON``) or writes them as JavaScript literals.
+
+orjson is optional: without it both classes behave exactly like DRF's
+``JSONRenderer`` and ``JSONParser``. ``benchmark_renderers.py`` compares the
+two renderers on task and audit log payloads.
+"""
+
+import math
+from decimal import Decimal
+
+from django.conf import settings
+from rest_framework.exceptions import ParseError
+from rest_framework.parsers import JSONParser
+from rest_framework.renderers import JSONRenderer
+from rest_framework.utils import encoders
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover - optional dependency
+    orjson = None
+
+_fallback_encoder = encoders.JSONEncoder()
+
+# DRF escapes these so that JSON stays a strict JavaScript subset
+_LINE_SEPARATORS = ((b'\xe2\x80\xa8', b'\\u2028'), (b'\xe2\x80\xa9', b'\\u2029'))
+
+
+def _default(obj):
+    return _fallback_encoder.default(obj)
+
+
+_SCALARS = {str, int, bool, type(None)}
+
+
+def _has_non_finite(data):
+    """Whether ``data`` holds a NaN or infinite float or Decimal."""
+    stack = [[data]]
+    while stack:
+        container = stack.pop()
+        for value in container.values() if isinstance(container, dict) else container:
+            # Most values are strings; test their exact type first
+            if type(value) in _SCALARS:
+                continue
+            if isinstance(value, (dict, list, tuple)):
+                stack.append(value)
+            elif isinstance(value, float):
+                if not math.isfinite(value):
+                    return True
+            elif isinstance(value, Decimal) and not value.is_finite():
+                return True
+    return False
+
+
+class FastJSONRenderer(JSONRenderer):
+    """``JSONRenderer`` using orjson when it is installed."""
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        if orjson is None or self.ensure_ascii:
+            return super().render(data, accepted_media_type, renderer_context)
+        if data is None:
+            return b''
+
+        # DRF formats datetimes itself (see _default)
+        option = orjson.OPT_NON_STR_KEYS | orjson.OPT_PASSTHROUGH_DATETIME
+        if self.get_indent(accepted_media_type, renderer_context or {}):
+            # orjson only indents by two spaces
+            option |= orjson.OPT_INDENT_2
+        try:
+            ret = orjson.dumps(data, default=_default, option=option)
+        except orjson.JSONEncodeError:
+            # Raise what JSONRenderer raises (e.g. ValueError for aware times)
+            return super().render(data, accepted_media_type, renderer_context)
+        # orjson writes NaN and infinity as null; only scan when it could have
+        if b'null' in ret and _has_non_finite(data):
+            return super().render(data, accepted_media_type, renderer_context)
+        for raw, escaped in _LINE_SEPARATORS:
+            if raw in ret:
+                ret = ret.replace(raw, escaped)
+        return ret
+
+
+class FastJSONParser(JSONParser):
+    """``JSONParser`` using orjson when it is installed."""
+
+    renderer_class = FastJSONRenderer
+
+    def parse(self, stream, media_type=None, parser_context=None):
+        if orjson is None:
+            return super().parse(stream, media_type, parser_context)
+
+        parser_context = parser_context or {}
+        encoding = parser_context.get('encoding') or settings.DEFAULT_CHARSET
+        try:
+            body = stream.read()
+            if encoding.lower().replace('-', '') != 'utf8':
+                body = body.decode(encoding)
+            return orjson.loads(body)
+        except ValueError as exc:
+            raise ParseError('JSON parse error - %s' % str(exc))
@@ -0,0 +1,243 @@
+"""
+Full-text search over tasks, projects and users.
+
+PostgreSQL: each searchable table gets a ``search_vector tsvector`` column
+with a GIN index, kept in sync by a BEFORE INSERT/UPDATE trigger, so bulk
+writes are covered as well as ``save()``. Queries use ``@@`` with prefix
+terms and are ranked with ``ts_rank``.
+
+SQLite (local development): an FTS5 table ``<table>_fts`` mirrors the
+searchable columns through triggers and is queried with ``MATCH`` and ranked
+with ``bm25``. If the SQLite build has no FTS5 the search falls back to
+``icontains`` filters.
+
+The database objects are created by each app's migration through
+``search_operations``; views call ``apply_search``.
+"""
+
+import re
+
+from django.db import connections, migrations
+from django.db.models import BooleanField, FloatField, Q
+from django.db.models.expressions import RawSQL
+
+TOKEN_RE = re.compile(r'\w+', re.UNICODE)
+
+# Searchable columns per table with their PostgreSQL rank weight
+SEARCH_FIELDS = {
+    'tasks_task': (('title', 'A'), ('description', 'B')),
+    'projects_project': (('name', 'A'), ('description', 'B')),
+    'accounts_user': (('full_name', 'A'), ('email', 'A')),
+}
+
+_fts_tables = {}
+
+
+def search_query(request):
+    """The ``q`` query parameter; ``search`` is accepted as an older alias."""
+    return request.query_params.get('q') or request.query_params.get('search') or ''
+
+
+def search_terms(query):
+    """Split a user query into word tokens; every token is prefix matched."""
+    return TOKEN_RE.findall(query or '')[:16]
+
+
+# ----- schema (used by migrations) -----
+
+def _postgres_install(cursor, table, fields):
+    function = f'{table}_search_vector_update'
+    # Punctuation is turned into spaces so that e.g. e-mail addresses are
+    # indexed as separate words, matching how queries are tokenized.
+    vector = ' || '.join(
+        f"setweight(to_tsvector('simple', regexp_replace(coalesce(NEW.{column}, ''), "
+        f"'[^[:alnum:]]+', ' ', 'g')), '{weight}')"
+        for column, weight in fields
+    )
+    columns = ', '.join(column for column, _ in fields)
+    cursor.execute(f'ALTER TABLE {table} ADD COLUMN search_vector tsvector')
+    cursor.execute(
+        f'CREATE FUNCTION {function}() RETURNS trigger AS $$ '
+        f'BEGIN NEW.search_vector := {vector}; RETURN NEW; END '
+        f'$$ LANGUAGE plpgsql'
+    )
+    cursor.execute(
+        f'CREATE TRIGGER {table}_search_vector BEFORE INSERT OR UPDATE OF {columns} '
+        f'ON {table} FOR EACH ROW EXECUTE FUNCTION {function}()'
+    )
+    # Backfill existing rows through the trigger
+    first_column = fields[0][0]
+    cursor.execute(f'UPDATE {table} SET {first_column} = {first_column}')
+    cursor.execute(
+        f'CREATE INDEX {table}_search_vector_idx ON {table} USING GIN (search_vector)'
+    )
+
+
+def _postgres_uninstall(cursor, table):
+    cursor.execute(f'DROP TRIGGER IF EXISTS {table}_search_vector ON {table}')
+    cursor.execute(f'DROP FUNCTION IF EXISTS {table}_search_vector_update()')
+    cursor.execute(f'ALTER TABLE {table} DROP COLUMN IF EXISTS search_vector')
+
+
+def _sqlite_has_fts5(cursor):
+    try:
+        cursor.execute('CREATE VIRTUAL TABLE temp.fts5_probe USING fts5(x)')
+        cursor.execute('DROP TABLE temp.fts5_probe')
+    except Exception:
+        return False
+    return True
+
+
+def _sqlite_sync(cursor, table, fields):
+    """(Re)create the sync triggers and reload the FTS table from ``table``."""
+    fts = f'{table}_fts'
+    columns = ', '.join(column for column, _ in fields)
+    new_values = ', '.join(f'NEW.{column}' for column, _ in fields)
+    for suffix in ('insert', 'update', 'delete'):
+        cursor.execute(f'DROP TRIGGER IF EXISTS {fts}_{suffix}')
+    cursor.execute(
+        f'CREATE TRIGGER {fts}_insert AFTER INSERT ON {table} BEGIN '
+        f'INSERT INTO {fts} (id, {columns}) VALUES (NEW.id, {new_values}); END'
+    )
+    cursor.execute(
+        f'CREATE TRIGGER {fts}_update AFTER UPDATE OF {columns} ON {table} BEGIN '
+        f'DELETE FROM {fts} WHERE id = OLD.id; '
+        f'INSERT INTO {fts} (id, {columns}) VALUES (NEW.id, {new_values}); END'
+    )
+    cursor.execute(
+        f'CREATE TRIGGER {fts}_delete AFTER DELETE ON {table} BEGIN '
+        f'DELETE FROM {fts} WHERE id = OLD.id; END'
+    )
+    cursor.execute(f'DELETE FROM {fts}')
+    cursor.execute(f'INSERT INTO {fts} (id, {columns}) SELECT id, {columns} FROM {table}')
+
+
+def _sqlite_install(cursor, table, fields):
+    if not _sqlite_has_fts5(cursor):
+        return
+    columns = ', '.join(column for column, _ in fields)
+    cursor.execute(
+        f"CREATE VIRTUAL TABLE {table}_fts USING fts5(id UNINDEXED, {columns}, "
+        f"tokenize = 'unicode61 remove_diacritics 2')"
+    )
+    _sqlite_sync(cursor, table, fields)
+
+
+def _sqlite_uninstall(cursor, table):
+    fts = f'{table}_fts'
+    for suffix in ('insert', 'update', 'delete'):
+        cursor.execute(f'DROP TRIGGER IF EXISTS {fts}_{suffix}')
+    cursor.execute(f'DROP TABLE IF EXISTS {fts}')
+
+
+def search_operations(table, fields):
+    """Migration operations installing the search index for ``table``."""
+
+    def install(apps, schema_editor):
+        vendor = schema_editor.connection.vendor
+        with schema_editor.connection.cursor() as cursor:
+            if vendor == 'postgresql':
+                _postgres_install(cursor, table, fields)
+            elif vendor == 'sqlite':
+                _sqlite_install(cursor, table, fields)
+
+    def uninstall(apps, schema_editor):
+        vendor = schema_editor.connection.vendor
+        with schema_editor.connection.cursor() as cursor:
+            if vendor == 'postgresql':
+                _postgres_uninstall(cursor, table)
+            elif vendor == 'sqlite':
+                _sqlite_uninstall(cursor, table)
+
+    return [migrations.RunPython(install, uninstall)]
+
+
+def repair_sqlite_triggers(using='default', **kwargs):
+    """
+    ``post_migrate`` receiver restoring the FTS5 triggers on SQLite.
+
+    SQLite cannot alter most columns in place, so Django rebuilds the table
+    (create, copy, drop, rename) and the triggers of the old table are lost.
+    """
+    connection = connections[using]
+    if connection.vendor != 'sqlite':
+        return
+    tables = set(connection.introspection.table_names())
+    with connection.cursor() as cursor:
+        for table, fields in SEARCH_FIELDS.items():
+            fts = f'{table}_fts'
+            if table not in tables or fts not in tables:
+                continue
+            cursor.execute(
+                "SELECT COUNT(*) FROM sqlite_master WHERE type = 'trigger' AND tbl_name = %s",
+                [table],
+            )
+            if cursor.fetchone()[0] < 3:
+                _sqlite_sync(cursor, table, fields)
+
+
+# ----- querying -----
+
+def _has_fts_table(connection, table):
+    key = (connection.alias, connection.settings_dict['NAME'], table)
+    if key not in _fts_tables:
+        _fts_tables[key] = f'{table}_fts' in connection.introspection.table_names()
+    return _fts_tables[key]
+
+
+def apply_search(queryset, query):
+    """
+    Filter ``queryset`` to rows matching every term of ``query`` (as a
+    prefix) and annotate them with ``search_rank`` (higher is better).
+    """
+    terms = search_terms(query)
+    if not terms:
+        return queryset
+
+    model = queryset.model
+    table = model._meta.db_table
+    connection = connections[queryset.db]
+    column = f'{connection.ops.quote_name(table)}.'
+
+    if connection.vendor == 'postgresql':
+        tsquery = ' & '.join(f'{term}:*' for term in terms)
+        match = RawSQL(
+            f"{column}search_vector @@ to_tsquery('simple', %s)",
+            [tsquery],
+            output_field=BooleanField(),
+        )
+        rank = RawSQL(
+            # float8: ts_rank is a float4, which loses precision when the rank
+            # is compared with the float8 value decoded from a cursor
+            f"ts_rank({column}search_vector, to_tsquery('simple', %s))::float8",
+            [tsquery],
+            output_field=FloatField(),
+        )
+        return queryset.filter(match).annotate(search_rank=rank)
+
+    if connection.vendor == 'sqlite' and _has_fts_table(connection, table):
+        fts = f'{table}_fts'
+        expression = ' '.join(f'"{term}"*' for term in terms)
+        match = RawSQL(
+            f'{column}id IN (SELECT id FROM {fts} WHERE {fts} MATCH %s)',
+            [expression],
+            output_field=BooleanField(),
+        )
+        # bm25 is lower for better matches
+        rank = RawSQL(
+            f'(SELECT -bm25({fts}) FROM {fts} WHERE {fts} MATCH %s AND {fts}.id = {column}id)',
+            [expression],
+            output_field=FloatField(),
+        )
+        return queryset.filter(match).annotate(search_rank=rank)
+
+    # No full-text index: every term must appear in one of the fields
+    condition = Q()
+    for term in terms:
+        term_condition = Q()
+        for field, _ in SEARCH_FIELDS.get(table, ()):
+            term_condition |= Q(**{f'{field}__icontains': term})
+        condition &= term_condition
+    return queryset.filter(condition).annotate(
+        search_rank=RawSQL('0.0', [], output_field=FloatField())
+    )
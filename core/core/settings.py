@@ -60,31 +60,145 @@ INSTALLED_APPS = [
     'projects',
     'tasks',
     'audit_logs',
+    'sync',
+    'realtime',
+    'dashboard',
 ]
 
 AUTH_USER_MODEL = 'accounts.User'
 
 REST_FRAMEWORK = {
     'DEFAULT_AUTHENTICATION_CLASSES': (
-        'rest_framework_simplejwt.authentication.JWTAuthentication',
+        'accounts.authentication.CachedJWTAuthentication',
     ),
     'DEFAULT_PERMISSION_CLASSES': (
         'rest_framework.permissions.IsAuthenticated',
     ),
+    # orjson based JSON (see core.renderers); plain DRF JSON without orjson
+    'DEFAULT_RENDERER_CLASSES': (
+        'core.renderers.FastJSONRenderer',
+        'rest_framework.renderers.BrowsableAPIRenderer',
+    ),
+    'DEFAULT_PARSER_CLASSES': (
+        'core.renderers.FastJSONParser',
+        'rest_framework.parsers.FormParser',
+        'rest_framework.parsers.MultiPartParser',
+    ),
+}
+
+# Django cache. The default is private to each process; point it at a
+# cache shared by the worker processes (FileBasedCache on one host,
+# memcached/redis across hosts) when running several of them.
+CACHES = {
+    'default': {
+        'BACKEND': os.environ.get('CACHE_BACKEND', 'django.core.cache.backends.locmem.LocMemCache'),
+        'LOCATION': os.environ.get('CACHE_LOCATION', ''),
+    }
+}
+
+# In-process cache of authenticated principals (see accounts.principal_cache).
+# Revocations reach the other processes through CACHES[PRINCIPAL_CACHE_ALIAS];
+# an empty alias leaves them to the TTL.
+PRINCIPAL_CACHE_MAX_ENTRIES = int(os.environ.get('PRINCIPAL_CACHE_MAX_ENTRIES', 1024))
+PRINCIPAL_CACHE_TTL = int(os.environ.get('PRINCIPAL_CACHE_TTL', 60))
+PRINCIPAL_CACHE_ALIAS = os.environ.get('PRINCIPAL_CACHE_ALIAS', 'default')
+
+# Buffered audit log writer (see audit_logs.writer). SYNC writes each entry
+# inside the request (the test settings turn it on).
+AUDIT_LOG_WRITER = {
+    'SYNC': os.environ.get('AUDIT_LOG_SYNC', 'False').lower() in ('true', '1', 'yes'),
+    'BATCH_SIZE': int(os.environ.get('AUDIT_LOG_BATCH_SIZE', 100)),
+    'FLUSH_INTERVAL': float(os.environ.get('AUDIT_LOG_FLUSH_INTERVAL', 1.0)),
+    'MAX_QUEUE': int(os.environ.get('AUDIT_LOG_MAX_QUEUE', 10000)),
+}
+
+# Monthly audit log partitions (see audit_logs.partitions). Retention is in
+# months per subscription plan; manage_audit_partitions applies it.
+AUDIT_LOG_PARTITIONS_AHEAD = 3
+AUDIT_LOG_RETENTION_MONTHS = {
+    'free': 3,
+    'pro': 12,
+    'enterprise': 36,
+}
+
+# Delta sync (see sync.views). Changes younger than SYNC_SETTLE_SECONDS are
+# held back so transactions committing out of order are not skipped.
+SYNC_SETTLE_SECONDS = int(os.environ.get('SYNC_SETTLE_SECONDS', 2))
+SYNC_TOMBSTONE_RETENTION_DAYS = int(os.environ.get('SYNC_TOMBSTONE_RETENTION_DAYS', 30))
+
+# Realtime events over ASGI (see realtime.broadcaster). LocalBackend fans out
+# within one process; use realtime.broadcaster.PostgresBackend when running
+# several ASGI workers.
+REALTIME = {
+    'BACKEND': os.environ.get('REALTIME_BACKEND', 'realtime.broadcaster.LocalBackend'),
+    'QUEUE_SIZE': int(os.environ.get('REALTIME_QUEUE_SIZE', 100)),
+    'KEEPALIVE': int(os.environ.get('REALTIME_KEEPALIVE', 15)),
 }
+
+# Bulk tenant imports (see tenants.importer). Passwords are hashed in a pool
+# of IMPORT_HASH_WORKERS processes (0: one per CPU).
+IMPORT_BATCH_SIZE = int(os.environ.get('IMPORT_BATCH_SIZE', 1000))
+IMPORT_HASH_WORKERS = int(os.environ.get('IMPORT_HASH_WORKERS', 0))
+
+# Background purge of deleted tenants and projects (see tenants.purge). SYNC
+# runs each job inside the deleting request (the test settings turn it on).
+PURGE_JOBS = {
+    'SYNC': os.environ.get('PURGE_JOBS_SYNC', 'False').lower() in ('true', '1', 'yes'),
+    'BATCH_SIZE': int(os.environ.get('PURGE_BATCH_SIZE', 1000)),
+    'STALE_AFTER': int(os.environ.get('PURGE_STALE_AFTER', 300)),
+}
+
+# Hash partitioning of tasks and audit logs by tenant on PostgreSQL (see
+# core.partitioning). Read when migrating; 0 keeps the plain tables.
+TENANT_HASH_PARTITIONS = int(os.environ.get('TENANT_HASH_PARTITIONS', 0))
+
+# Dashboard summary rollups (see dashboard.summary). Tenant rollups are keyed
+# by the tenant's data version, so TIMEOUT only bounds memory; platform-wide
+# rollups for super admins are refreshed every PLATFORM_TIMEOUT seconds.
+DASHBOARD_SUMMARY = {
+    'TIMEOUT': int(os.environ.get('DASHBOARD_SUMMARY_TIMEOUT', 300)),
+    'PLATFORM_TIMEOUT': int(os.environ.get('DASHBOARD_PLATFORM_TIMEOUT', 60)),
+}
+
+# Response cache of tenant read endpoints (see tenants.response_cache).
+# LocMemBackend keeps up to MAX_BYTES per process; DjangoCacheBackend shares
+# entries between workers through CACHES[CACHE_ALIAS] (file, memcached,
+# redis). An empty backend turns the cache off.
+RESPONSE_CACHE = {
+    'BACKEND': os.environ.get('RESPONSE_CACHE_BACKEND', 'tenants.response_cache.LocMemBackend'),
+    'MAX_BYTES': int(os.environ.get('RESPONSE_CACHE_MAX_BYTES', 32 * 1024 * 1024)),
+    'TIMEOUT': int(os.environ.get('RESPONSE_CACHE_TIMEOUT', 300)),
+    'CACHE_ALIAS': os.environ.get('RESPONSE_CACHE_ALIAS', 'default'),
+}
+
+# Per-request SQL/timing instrumentation (see core.instrumentation). Repeated
+# query shapes of sampled requests are logged as suspected N+1s; the
+# Server-Timing header reveals query counts and timings to any client, so it
+# is only sent with DEBUG unless SERVER_TIMING says otherwise.
+REQUEST_INSTRUMENTATION = {
+    'SAMPLE_RATE': float(os.environ.get('REQUEST_INSTRUMENTATION_SAMPLE_RATE', 1.0 if DEBUG else 0.01)),
+    'N_PLUS_ONE_THRESHOLD': int(os.environ.get('N_PLUS_ONE_THRESHOLD', 5)),
+    'SERVER_TIMING': os.environ.get('SERVER_TIMING', str(DEBUG)).lower() in ('true', '1', 'yes'),
+}
+
 MIDDLEWARE = [
+    "core.instrumentation.RequestInstrumentationMiddleware",
     "corsheaders.middleware.CorsMiddleware", 
     "django.middleware.security.SecurityMiddleware",
     "django.contrib.sessions.middleware.SessionMiddleware",
     "django.middleware.common.CommonMiddleware",
     "django.middleware.csrf.CsrfViewMiddleware",
     "django.contrib.auth.middleware.AuthenticationMiddleware",
+    "tenants.middleware.TenantContextMiddleware",
     "django.contrib.messages.middleware.MessageMiddleware",
     "django.middleware.clickjacking.XFrameOptionsMiddleware",
 ]
 
 ROOT_URLCONF = "core.urls"
 
+# Refuses to run the suite without core.settings_test
+TEST_RUNNER = "core.test_runner.TestRunner"
+
 TEMPLATES = [
     {
         "BACKEND": "django.template.backends.django.DjangoTemplates",
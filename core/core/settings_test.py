@@ -0,0 +1,25 @@
+"""
+Settings for running the test suite.
+
+``manage.py test`` uses this module unless DJANGO_SETTINGS_MODULE says
+otherwise; other runners have to select it, e.g.
+``DJANGO_SETTINGS_MODULE=core.settings_test python -m django test``.
+Background work runs inline, so tests can assert on its results at once.
+"""
+
+from .settings import *  # noqa: F401,F403
+from .settings import AUDIT_LOG_WRITER, PURGE_JOBS, REQUEST_INSTRUMENTATION
+
+TEST_SETTINGS = True
+
+# Audit entries are inserted in the request's transaction
+AUDIT_LOG_WRITER = {**AUDIT_LOG_WRITER, 'SYNC': True}
+
+# Purge jobs run inside the deleting request
+PURGE_JOBS = {**PURGE_JOBS, 'SYNC': True}
+
+# Delta sync returns changes at once
+SYNC_SETTLE_SECONDS = 0
+
+# Only the tests that sample requests turn instrumentation on
+REQUEST_INSTRUMENTATION = {**REQUEST_INSTRUMENTATION, 'SAMPLE_RATE': 0.0}
@@ -0,0 +1,19 @@
+from django.conf import settings
+from django.core.exceptions import ImproperlyConfigured
+from django.test.runner import DiscoverRunner
+
+
+class TestRunner(DiscoverRunner):
+    """
+    ``DiscoverRunner`` that requires the test settings (core.settings_test).
+
+    Under the regular settings audit entries and purge jobs are written by
+    background threads, which many tests would see as missing rows.
+    """
+
+    def setup_test_environment(self, **kwargs):
+        if not getattr(settings, 'TEST_SETTINGS', False):
+            raise ImproperlyConfigured(
+                'Run the tests with DJANGO_SETTINGS_MODULE=core.settings_test'
+            )
+        super().setup_test_environment(**kwargs)
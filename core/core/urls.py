@@ -39,9 +39,14 @@ def health_check(request):
             "error": str(e)
         }, status=503)
     
+    from audit_logs.writer import audit_writer
+    from tenants.response_cache import response_cache_stats
+
     return JsonResponse({
         "status": "ok",
-        "database": db_status
+        "database": db_status,
+        "auditLogWriter": audit_writer.stats(),
+        "responseCache": response_cache_stats()
     })
 
 
@@ -63,7 +68,9 @@ def api_root(request):
             "users": "/api/tenants/{id}/users",
             "projects": "/api/projects",
             "tasks": "/api/tasks",
-            "audit_logs": "/api/audit-logs/"
+            "audit_logs": "/api/audit-logs/",
+            "sync": "/api/sync",
+            "dashboard": "/api/dashboard/summary"
         },
         "documentation": "See README.md for full API documentation"
     })
@@ -78,6 +85,8 @@ urlpatterns = [
     path('api/', include('tasks.urls')),
     path('api/tenants', include('tenants.urls')),  # Without trailing slash for /api/tenants
     path('api/audit-logs/', include('audit_logs.urls')),
+    path('api/', include('sync.urls')),
+    path('api/', include('dashboard.urls')),
 ]
 
 if settings.DEBUG:
@@ -0,0 +1,143 @@
+"""
+Dashboard rollups.
+
+A summary is built from one query per entity: project counts by status
+(grouped), task counts by status, priority and overdue (one conditional
+aggregate) and the newest projects, plus the user's upcoming tasks.
+
+Rollups are cached in the default Django cache under the tenant's data
+version (``TenantUsage.version``, increased by every write), so a write
+makes the cached entry unreachable without any explicit invalidation. A
+user's upcoming tasks are cached per user under the same version. Keys also
+carry the date because "overdue" changes at midnight. Platform-wide rollups
+for super admins have no version and expire after ``PLATFORM_TIMEOUT``
+seconds.
+"""
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db.models import Count, F, Q
+from django.utils import timezone
+
+DEFAULTS = {
+    'TIMEOUT': 300,
+    'PLATFORM_TIMEOUT': 60,
+    'UPCOMING_LIMIT': 5,
+    'MAX_UPCOMING_LIMIT': 20,
+    'RECENT_PROJECTS': 5,
+}
+
+
+def dashboard_settings():
+    return {**DEFAULTS, **getattr(settings, 'DASHBOARD_SUMMARY', {})}
+
+
+def tenant_data_version(tenant_id):
+    from tenants.models import TenantUsage
+
+    return TenantUsage.objects.filter(tenant_id=tenant_id).values_list('version', flat=True).first()
+
+
+def compute_rollups(tenant_id=None):
+    """Project and task counts of a tenant (or of every tenant) and its newest projects."""
+    from projects.models import Project
+    from tasks.models import Task
+
+    projects = Project.objects.all()
+    tasks = Task.objects.all()
+    if tenant_id is not None:
+        projects = projects.filter(tenant_id=tenant_id)
+        tasks = tasks.filter(tenant_id=tenant_id)
+
+    by_status = dict.fromkeys((status for status, _ in Project.STATUS_CHOICES), 0)
+    by_status.update(projects.order_by().values_list('status').annotate(n=Count('id')))
+
+    counts = tasks.aggregate(
+        total=Count('id'),
+        overdue=Count('id', filter=Q(due_date__lt=timezone.localdate()) & ~Q(status='completed')),
+        **{f'status:{status}': Count('id', filter=Q(status=status)) for status, _ in Task.STATUS_CHOICES},
+        **{f'priority:{priority}': Count('id', filter=Q(priority=priority)) for priority, _ in Task.PRIORITY_CHOICES}
+    )
+
+    recent = projects.order_by('-created_at', '-id').values(
+        'id', 'name', 'description', 'status', 'created_at'
+    )[:dashboard_settings()['RECENT_PROJECTS']]
+
+    return {
+        "projects": {
+            "total": sum(by_status.values()),
+            "byStatus": by_status,
+        },
+        "tasks": {
+            "total": counts['total'],
+            "open": counts['total'] - counts['status:completed'],
+            "overdue": counts['overdue'],
+            "byStatus": {status: counts[f'status:{status}'] for status, _ in Task.STATUS_CHOICES},
+            "byPriority": {priority: counts[f'priority:{priority}'] for priority, _ in Task.PRIORITY_CHOICES},
+        },
+        "recentProjects": [
+            {
+                "id": str(project['id']),
+                "name": project['name'],
+                "description": project['description'],
+                "status": project['status'],
+                "createdAt": project['created_at'],
+            }
+            for project in recent
+        ],
+    }
+
+
+def upcoming_tasks(user, limit):
+    """The user's open tasks, earliest due date first (undated last)."""
+    from tasks.models import Task
+
+    tasks = (
+        Task.objects.filter(tenant_id=user.tenant_id, assigned_to_id=user.id)
+        .exclude(status='completed')
+        .select_related('project')
+        .order_by(F('due_date').asc(nulls_last=True), '-priority_rank', 'id')[:limit]
+    )
+    return [
+        {
+            "id": str(task.id),
+            "title": task.title,
+            "status": task.status,
+            "priority": task.priority,
+            "dueDate": task.due_date,
+            "project": {"id": str(task.project_id), "name": task.project.name},
+        }
+        for task in tasks
+    ]
+
+
+def get_summary(user, limit):
+    """Dashboard summary for ``user``: their tenant's rollups and upcoming tasks."""
+    options = dashboard_settings()
+    today = timezone.localdate().isoformat()
+
+    if user.tenant_id is None:
+        key = f'dashboard:platform:{today}'
+        rollups = cache.get(key)
+        if rollups is None:
+            rollups = compute_rollups()
+            cache.set(key, rollups, options['PLATFORM_TIMEOUT'])
+        return {**rollups, "upcomingTasks": []}
+
+    version = tenant_data_version(user.tenant_id)
+    if version is None:
+        # No usage row yet: nothing to key the cache on
+        return {**compute_rollups(user.tenant_id), "upcomingTasks": upcoming_tasks(user, limit)}
+
+    prefix = f'dashboard:{user.tenant_id}:{version}:{today}'
+    user_key = f'{prefix}:user:{user.id}:{limit}'
+    cached = cache.get_many([prefix, user_key])
+    rollups = cached.get(prefix)
+    upcoming = cached.get(user_key)
+    if rollups is None:
+        rollups = compute_rollups(user.tenant_id)
+        cache.set(prefix, rollups, options['TIMEOUT'])
+    if upcoming is None:
+        upcoming = upcoming_tasks(user, limit)
+        cache.set(user_key, upcoming, options['TIMEOUT'])
+    return {**rollups, "upcomingTasks": upcoming}
@@ -0,0 +1,100 @@
+"""Tests for dashboard app."""
+from datetime import timedelta
+from django.core.cache import cache
+from django.utils import timezone
+from rest_framework.test import APITestCase, APIClient
+from rest_framework import status
+from accounts.models import User
+from tenants.models import Tenant
+from tenants.usage import get_usage
+from projects.models import Project
+from tasks.models import Task
+
+
+class DashboardSummaryTests(APITestCase):
+    """Test cases for GET /api/dashboard/summary"""
+
+    def setUp(self):
+        cache.clear()
+        self.client = APIClient()
+        self.tenant = Tenant.objects.create(name="Demo Company", subdomain="demo", max_projects=10)
+        self.admin = User.objects.create_user(
+            email="admin@demo.com",
+            password="Admin@123",
+            full_name="Admin User",
+            tenant=self.tenant,
+            role="tenant_admin"
+        )
+        response = self.client.post('/api/auth/login', {
+            'email': 'admin@demo.com',
+            'password': 'Admin@123',
+            'tenantSubdomain': 'demo'
+        }, format='json')
+        self.client.credentials(HTTP_AUTHORIZATION=f"Bearer {response.data['data']['token']}")
+
+        today = timezone.localdate()
+        self.project = Project.objects.create(name="Website", tenant=self.tenant, created_by=self.admin)
+        Project.objects.create(name="Archive", tenant=self.tenant, created_by=self.admin, status="archived")
+        self.overdue = Task.objects.create(
+            project=self.project, tenant=self.tenant, title="Overdue", assigned_to=self.admin,
+            priority="high", due_date=today - timedelta(days=1)
+        )
+        Task.objects.create(
+            project=self.project, tenant=self.tenant, title="Later", assigned_to=self.admin,
+            due_date=today + timedelta(days=3)
+        )
+        Task.objects.create(project=self.project, tenant=self.tenant, title="Undated", assigned_to=self.admin)
+        Task.objects.create(
+            project=self.project, tenant=self.tenant, title="Done", assigned_to=self.admin,
+            status="completed", due_date=today - timedelta(days=5)
+        )
+
+        other = Tenant.objects.create(name="Other Company", subdomain="other")
+        other_admin = User.objects.create_user(
+            email="admin@other.com", password="Admin@123", full_name="Other Admin", tenant=other
+        )
+        other_project = Project.objects.create(name="Hidden", tenant=other, created_by=other_admin)
+        Task.objects.create(project=other_project, tenant=other, title="Hidden")
+
+        get_usage(self.tenant)
+        # Cache the principal so only the view's queries are counted
+        self.client.get('/api/auth/me')
+
+    def test_summary_counts(self):
+        """Test project and task counts, recent projects and upcoming tasks"""
+        response = self.client.get('/api/dashboard/summary')
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        data = response.data['data']
+        self.assertEqual(data['projects'], {
+            'total': 2, 'byStatus': {'active': 1, 'archived': 1, 'completed': 0}
+        })
+        self.assertEqual(data['tasks']['total'], 4)
+        self.assertEqual(data['tasks']['open'], 3)
+        self.assertEqual(data['tasks']['overdue'], 1)
+        self.assertEqual(data['tasks']['byStatus'], {'todo': 3, 'in_progress': 0, 'completed': 1})
+        self.assertEqual(data['tasks']['byPriority'], {'low': 0, 'medium': 3, 'high': 1})
+        self.assertEqual([p['name'] for p in data['recentProjects']], ['Archive', 'Website'])
+        self.assertEqual([t['title'] for t in data['upcomingTasks']], ['Overdue', 'Later', 'Undated'])
+        self.assertEqual(data['upcomingTasks'][0]['project']['name'], 'Website')
+
+        response = self.client.get('/api/dashboard/summary', {'limit': 1})
+        self.assertEqual(len(response.data['data']['upcomingTasks']), 1)
+
+    def test_summary_is_cached_until_a_write(self):
+        """Test a repeated request only looks up versions and a write invalidates it"""
+        url = '/api/dashboard/summary'
+        # Version lookup, rollup version, project counts, task counts, recent projects, upcoming tasks
+        with self.assertNumQueries(6):
+            self.client.get(url)
+        with self.assertNumQueries(2):
+            self.client.get(url)
+
+        self.client.patch(f'/api/tasks/{self.overdue.id}/status', {'status': 'completed'}, format='json')
+        data = self.client.get(url).data['data']
+        self.assertEqual(data['tasks']['overdue'], 0)
+        self.assertEqual([t['title'] for t in data['upcomingTasks']], ['Later', 'Undated'])
+
+    def test_invalid_limit_is_rejected(self):
+        """Test a non-integer limit is a 400"""
+        response = self.client.get('/api/dashboard/summary', {'limit': 'ten'})
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
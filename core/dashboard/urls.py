@@ -0,0 +1,6 @@
+from django.urls import path
+from dashboard.views import dashboard_summary
+
+urlpatterns = [
+    path('dashboard/summary', dashboard_summary),
+]
@@ -0,0 +1,41 @@
+from rest_framework.decorators import api_view, permission_classes
+from rest_framework.exceptions import ValidationError
+from rest_framework.permissions import IsAuthenticated
+from rest_framework.response import Response
+from django.utils import timezone
+from tenants.versions import conditional_get, tenant_version
+from dashboard.summary import dashboard_settings, get_summary
+
+
+def summary_version(request, **kwargs):
+    # Overdue counts change with the date even when no data does
+    version = tenant_version(request)
+    return None if version is None else f'{version}-{timezone.localdate().isoformat()}'
+
+
+def _upcoming_limit(request):
+    options = dashboard_settings()
+    raw = request.query_params.get('limit')
+    if raw in (None, ''):
+        return options['UPCOMING_LIMIT']
+    try:
+        limit = int(raw)
+    except ValueError:
+        raise ValidationError({'limit': 'Must be an integer.'})
+    return max(1, min(limit, options['MAX_UPCOMING_LIMIT']))
+
+
+@api_view(['GET'])
+@permission_classes([IsAuthenticated])
+@conditional_get(summary_version)
+def dashboard_summary(request):
+    """
+    Everything the dashboard shows in one response: project and task counts
+    of the user's tenant (every tenant for super admins), the newest
+    projects and the user's upcoming tasks.
+    """
+    limit = _upcoming_limit(request)
+    return Response({
+        "success": True,
+        "data": get_summary(request.user, limit)
+    })
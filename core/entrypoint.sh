@@ -19,6 +19,9 @@ echo "Running database migrations..."
 python manage.py migrate --noinput
 echo "✓ Migrations complete!"
 
+# Make sure upcoming audit log partitions exist and apply retention
+python manage.py manage_audit_partitions
+
 # Load seed data
 echo "Loading seed data..."
 python manage.py seed_data || echo "Seed data already exists, skipping"
@@ -58,6 +61,17 @@ if not super_admin:
 "
 echo "✓ Seed data verified!"
 
-# Start server
+# Start server. Django runs sync views of an ASGI app on one thread per
+# process, so the API is served by several uvicorn workers under gunicorn;
+# the workers share realtime events through PostgreSQL LISTEN/NOTIFY.
 echo "Starting Django server on 0.0.0.0:5000..."
-exec python manage.py runserver 0.0.0.0:5000
+export REALTIME_BACKEND="${REALTIME_BACKEND:-realtime.broadcaster.PostgresBackend}"
+RELOAD=""
+if [ "$(echo "${DEBUG:-False}" | tr '[:upper:]' '[:lower:]')" = "true" ]; then
+  RELOAD="--reload"
+fi
+exec gunicorn core.asgi:application \
+  --worker-class uvicorn.workers.UvicornWorker \
+  --workers "${WEB_CONCURRENCY:-4}" \
+  --bind 0.0.0.0:5000 \
+  $RELOAD
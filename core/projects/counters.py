@@ -0,0 +1,64 @@
+"""
+Denormalized task counters of projects.
+
+``Project.task_count`` and ``Project.completed_task_count`` are updated by
+every task write path with ``adjust_task_counts``, an F() update inside the
+write's transaction, so listing projects never touches the tasks table.
+``rebuild_project_counters`` recomputes them from the tasks table.
+"""
+
+from django.db.models import Count, F, Q
+
+COUNTER_FIELDS = ('task_count', 'completed_task_count')
+
+
+def adjust_task_counts(project_id, tasks=0, open_tasks=0):
+    """
+    Apply task count deltas to a project.
+
+    Takes the same ``tasks`` / ``open_tasks`` deltas as
+    ``tenants.usage.adjust_usage``; completed tasks are the difference.
+    """
+    from projects.models import Project
+
+    completed = tasks - open_tasks
+    updates = {
+        field: F(field) + delta
+        for field, delta in (('task_count', tasks), ('completed_task_count', completed))
+        if delta
+    }
+    if updates:
+        Project.all_objects.filter(id=project_id).update(**updates)
+
+
+def compute_task_counts(project_ids):
+    """Return project_id -> {counter: value} counted from the tasks table."""
+    from tasks.models import Task
+
+    counts = {project_id: dict.fromkeys(COUNTER_FIELDS, 0) for project_id in project_ids}
+    rows = (
+        Task.all_objects.filter(project_id__in=counts.keys())
+        .order_by()
+        .values('project_id')
+        .annotate(
+            task_count=Count('id'),
+            completed_task_count=Count('id', filter=Q(status='completed')),
+        )
+        .values_list('project_id', *COUNTER_FIELDS)
+    )
+    for project_id, *values in rows:
+        counts[project_id] = dict(zip(COUNTER_FIELDS, values))
+    return counts
+
+
+def rebuild_task_counts(project_ids, batch_size=1000):
+    """Recompute and store the counters of ``project_ids``. Returns the values."""
+    from projects.models import Project
+
+    counts = compute_task_counts(project_ids)
+    Project.all_objects.bulk_update(
+        [Project(id=project_id, **values) for project_id, values in counts.items()],
+        list(COUNTER_FIELDS),
+        batch_size=batch_size,
+    )
+    return counts
@@ -0,0 +1,72 @@
+"""
+Django management command to rebuild or verify the task counters of projects.
+
+``Project.task_count`` and ``completed_task_count`` are maintained
+incrementally by the task write paths; this command recomputes them from
+the tasks table. With --verify it only reports drift and exits with an
+error if any counter is wrong.
+"""
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+from projects.counters import COUNTER_FIELDS, compute_task_counts, rebuild_task_counts
+from projects.models import Project
+
+
+class Command(BaseCommand):
+    help = 'Rebuild (or verify) denormalized project task counters'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--tenant',
+            action='append',
+            dest='tenants',
+            help='Only process projects of this tenant id (may be repeated)',
+        )
+        parser.add_argument(
+            '--batch-size',
+            type=int,
+            default=1000,
+            help='Projects counted per query',
+        )
+        parser.add_argument(
+            '--verify',
+            action='store_true',
+            help='Report counters that differ from the tasks table without changing them',
+        )
+
+    def handle(self, *args, **options):
+        projects = Project.all_objects.order_by('id')
+        if options['tenants']:
+            projects = projects.filter(tenant_id__in=options['tenants'])
+        project_ids = list(projects.values_list('id', flat=True))
+        batch_size = options['batch_size']
+
+        drifted = 0
+        for start in range(0, len(project_ids), batch_size):
+            batch = project_ids[start:start + batch_size]
+            with transaction.atomic():
+                expected = compute_task_counts(batch)
+                stored = Project.all_objects.filter(id__in=batch).values_list('id', *COUNTER_FIELDS)
+                wrong = []
+                for project_id, *values in stored:
+                    diffs = [
+                        f'{field} {value} -> {expected[project_id][field]}'
+                        for field, value in zip(COUNTER_FIELDS, values)
+                        if value != expected[project_id][field]
+                    ]
+                    if diffs:
+                        wrong.append(project_id)
+                        self.stdout.write(f'  {project_id}: ' + ', '.join(diffs))
+                drifted += len(wrong)
+                if wrong and not options['verify']:
+                    rebuild_task_counts(wrong)
+
+        if options['verify']:
+            if drifted:
+                raise CommandError(f'{drifted} of {len(project_ids)} projects have drifted counters')
+            self.stdout.write(self.style.SUCCESS(f'✓ {len(project_ids)} projects verified'))
+            return
+        self.stdout.write(self.style.SUCCESS(
+            f'✓ Checked {len(project_ids)} projects ({drifted} corrected)'
+        ))
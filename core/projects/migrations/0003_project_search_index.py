@@ -0,0 +1,14 @@
+from django.db import migrations
+
+from core.search import search_operations
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("projects", "0002_project_status_project_updated_at_alter_project_id"),
+    ]
+
+    operations = search_operations(
+        "projects_project", (("name", "A"), ("description", "B"))
+    )
@@ -0,0 +1,57 @@
+# Generated by Django 5.2.18 on 2026-10-18 08:11
+
+from django.db import migrations, models
+from django.db.models import Count, Q
+
+
+def count_tasks(apps, schema_editor):
+    Project = apps.get_model("projects", "Project")
+    Task = apps.get_model("tasks", "Task")
+    rows = (
+        Task.objects.order_by()
+        .values("project_id")
+        .annotate(
+            task_count=Count("id"),
+            completed_task_count=Count("id", filter=Q(status="completed")),
+        )
+    )
+    projects = [
+        Project(
+            id=row["project_id"],
+            task_count=row["task_count"],
+            completed_task_count=row["completed_task_count"],
+        )
+        for row in rows
+    ]
+    Project.objects.bulk_update(
+        projects, ["task_count", "completed_task_count"], batch_size=1000
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("projects", "0006_project_deleted_at"),
+        ("tasks", "0006_partition_by_tenant"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="project",
+            name="completed_task_count",
+            field=models.IntegerField(default=0, editable=False),
+        ),
+        migrations.AddField(
+            model_name="project",
+            name="task_count",
+            field=models.IntegerField(default=0, editable=False),
+        ),
+        migrations.RunPython(count_tasks, migrations.RunPython.noop),
+        migrations.AddIndex(
+            model_name="project",
+            index=models.Index(
+                fields=["tenant", "-created_at", "-id"],
+                name="project_tenant_created_idx",
+            ),
+        ),
+    ]
@@ -1,5 +1,14 @@
 import uuid
 from django.db import models
+from tenants.scoping import TenantScopedManager
+
+
+class ActiveProjectManager(TenantScopedManager):
+    """Projects of the current tenant that are not being purged."""
+
+    def get_queryset(self):
+        return super().get_queryset().filter(deleted_at__isnull=True)
+
 
 class Project(models.Model):
     STATUS_CHOICES = (
@@ -16,6 +25,37 @@ class Project(models.Model):
     created_by = models.ForeignKey('accounts.User', on_delete=models.CASCADE)
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
+    # Increased on every write to the project or its tasks (tenants.versions)
+    version = models.PositiveBigIntegerField(default=0, editable=False)
+    # Maintained by the task write paths (projects.counters)
+    task_count = models.IntegerField(default=0, editable=False)
+    completed_task_count = models.IntegerField(default=0, editable=False)
+    # Set when the project is deleted; a PurgeJob then removes its tasks
+    deleted_at = models.DateTimeField(null=True, blank=True)
+
+    objects = ActiveProjectManager()
+    all_objects = models.Manager()
+
+    class Meta:
+        indexes = [
+            # Project list (newest first)
+            models.Index(fields=['tenant', '-created_at', '-id'], name='project_tenant_created_idx'),
+            # Delta sync
+            models.Index(fields=['tenant', 'updated_at', 'id'], name='project_tenant_updated_idx'),
+        ]
+
+    # Only changed through F() updates
+    F_UPDATED_FIELDS = ('version', 'task_count', 'completed_task_count')
+
+    def save(self, *args, **kwargs):
+        # A full save must not write back the (possibly stale) values of
+        # F_UPDATED_FIELDS loaded with the instance.
+        if not self._state.adding and kwargs.get('update_fields') is None:
+            kwargs['update_fields'] = [
+                field.name for field in self._meta.concrete_fields
+                if not field.primary_key and field.name not in self.F_UPDATED_FIELDS
+            ]
+        super().save(*args, **kwargs)
 
     def __str__(self):
         return self.name
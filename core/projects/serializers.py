@@ -1,5 +1,6 @@
 from rest_framework import serializers
 from projects.models import Project
+from core.projections import Field, Projection
 
 class ProjectCreateSerializer(serializers.ModelSerializer):
     class Meta:
@@ -8,8 +9,6 @@ class ProjectCreateSerializer(serializers.ModelSerializer):
 
 
 class ProjectListSerializer(serializers.ModelSerializer):
-    task_count = serializers.IntegerField(read_only=True)
-    completed_task_count = serializers.IntegerField(read_only=True)
     created_by = serializers.CharField(source='created_by.full_name', read_only=True)
 
     class Meta:
@@ -20,6 +19,20 @@ class ProjectListSerializer(serializers.ModelSerializer):
         ]
 
 
+# ProjectListSerializer as a projection for list endpoints (core.projections)
+project_list_projection = Projection(
+    Project,
+    id=Field(),
+    name=Field(),
+    description=Field(),
+    status=Field(),
+    created_by=Field('created_by__full_name'),
+    task_count=Field(),
+    completed_task_count=Field(),
+    created_at=Field(),
+)
+
+
 class ProjectUpdateSerializer(serializers.ModelSerializer):
     class Meta:
         model = Project
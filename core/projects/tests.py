@@ -1,10 +1,17 @@
 """Tests for projects app."""
+from io import StringIO
+from django.core.management import call_command
+from django.core.management.base import CommandError
+from django.db import connection
 from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
 from rest_framework.test import APITestCase, APIClient
 from rest_framework import status
 from accounts.models import User
 from tenants.models import Tenant
 from projects.models import Project
+from projects.serializers import ProjectListSerializer, project_list_projection
+from tasks.models import Task
 
 
 class ProjectModelTests(TestCase):
@@ -118,3 +125,148 @@ class ProjectAPITests(APITestCase):
         projects = response.data.get('data', {}).get('projects', [])
         project_names = [p.get('name') for p in projects]
         self.assertNotIn('Other Project', project_names)
+
+    def test_search_projects(self):
+        """Test searching projects by name and description"""
+        Project.objects.create(
+            name="Website redesign",
+            tenant=self.tenant,
+            created_by=self.admin
+        )
+        Project.objects.create(
+            name="Mobile app",
+            description="Companion to the website",
+            tenant=self.tenant,
+            created_by=self.admin
+        )
+        response = self.client.get('/api/projects', {'q': 'web'})
+        names = [p['name'] for p in response.data['data']['projects']]
+        self.assertEqual(names, ['Website redesign', 'Mobile app'])
+
+
+class TenantAdminTestCase(APITestCase):
+    """Base case with a tenant admin logged in and one project"""
+
+    def setUp(self):
+        self.client = APIClient()
+        self.tenant = Tenant.objects.create(name="Demo Company", subdomain="demo", max_projects=10)
+        self.admin = User.objects.create_user(
+            email="admin@demo.com",
+            password="Admin@123",
+            full_name="Admin User",
+            tenant=self.tenant,
+            role="tenant_admin"
+        )
+        response = self.client.post('/api/auth/login', {
+            'email': 'admin@demo.com',
+            'password': 'Admin@123',
+            'tenantSubdomain': 'demo'
+        }, format='json')
+        self.client.credentials(HTTP_AUTHORIZATION=f"Bearer {response.data['data']['token']}")
+        self.project = Project.objects.create(name="Counted", tenant=self.tenant, created_by=self.admin)
+
+
+class ProjectTaskCounterTests(TenantAdminTestCase):
+    """Test cases for the denormalized task counters"""
+
+    def counters(self):
+        self.project.refresh_from_db()
+        return self.project.task_count, self.project.completed_task_count
+
+    def test_task_writes_maintain_counters(self):
+        """Test create, status change, update, delete and bulk keep the counters exact"""
+        url = f'/api/projects/{self.project.id}/tasks'
+        ids = [self.client.post(url, {'title': f'Task {i}'}, format='json').data['data']['id'] for i in range(3)]
+        self.assertEqual(self.counters(), (3, 0))
+
+        self.client.patch(f'/api/tasks/{ids[0]}/status', {'status': 'completed'}, format='json')
+        self.client.put(f'/api/tasks/{ids[1]}', {'status': 'completed'}, format='json')
+        self.assertEqual(self.counters(), (3, 2))
+
+        self.client.delete(f'/api/tasks/{ids[0]}/delete')
+        self.assertEqual(self.counters(), (2, 1))
+
+        self.client.post(f'{url}/bulk', {'operations': [
+            {'op': 'create', 'title': 'Bulk'},
+            {'op': 'status', 'id': ids[2], 'status': 'completed'},
+            {'op': 'delete', 'id': ids[1]},
+        ]}, format='json')
+        self.assertEqual(self.counters(), (2, 1))
+        call_command('rebuild_project_counters', '--verify', stdout=StringIO())
+
+    def test_list_reads_stored_counters(self):
+        """Test the project list does not query the tasks table"""
+        Project.objects.filter(id=self.project.id).update(task_count=5, completed_task_count=2)
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get('/api/projects')
+        self.assertFalse(any('tasks_task' in query['sql'] for query in queries))
+        project = response.data['data']['projects'][0]
+        self.assertEqual((project['task_count'], project['completed_task_count']), (5, 2))
+
+    def test_rebuild_command_corrects_drift(self):
+        """Test --verify reports drift and a rebuild fixes it"""
+        Task.objects.create(project=self.project, tenant=self.tenant, title="Done", status="completed")
+        with self.assertRaises(CommandError):
+            call_command('rebuild_project_counters', '--verify', stdout=StringIO())
+        call_command('rebuild_project_counters', stdout=StringIO())
+        self.assertEqual(self.counters(), (1, 1))
+
+
+class ProjectListProjectionTests(TenantAdminTestCase):
+    """Test cases for the projection used by the project list"""
+
+    def test_projection_matches_serializer(self):
+        """Test the values() projection renders exactly like ProjectListSerializer"""
+        Project.objects.create(name="Second", description="", tenant=self.tenant, created_by=self.admin, status="archived")
+        projects = Project.objects.order_by('name')
+        projected = project_list_projection.project(project_list_projection.values(projects))
+        self.assertEqual(projected, ProjectListSerializer(projects, many=True).data)
+
+
+class ProjectDetailIncludeTests(TenantAdminTestCase):
+    """Test cases for ?include= on the project detail endpoint"""
+
+    def setUp(self):
+        super().setUp()
+        for i in range(3):
+            member = User.objects.create_user(
+                email=f"member{i}@demo.com", password="User@1234", full_name=f"Member {i}", tenant=self.tenant
+            )
+            Task.objects.create(
+                project=self.project, tenant=self.tenant, title=f"Task {i}", assigned_to=member,
+                status='completed' if i == 0 else 'todo'
+            )
+        call_command('rebuild_project_counters', stdout=StringIO())
+        # Cache the principal so only the view's queries are counted
+        self.client.get('/api/auth/me')
+
+    def test_include_everything_in_fixed_queries(self):
+        """Test tasks, stats, creator and members come with one query each"""
+        url = f'/api/projects/{self.project.id}'
+        # Version lookup, project with creator, stats, members, tasks
+        with self.assertNumQueries(5):
+            response = self.client.get(url, {'include': 'tasks,stats,creator,members'})
+        data = response.data['data']
+        self.assertEqual(data['creator']['email'], 'admin@demo.com')
+        self.assertEqual(len(data['tasks']), 3)
+        self.assertEqual([m['fullName'] for m in data['members']], ['Member 0', 'Member 1', 'Member 2'])
+        self.assertEqual(data['stats']['taskCount'], 3)
+        self.assertEqual(data['stats']['byStatus'], {'todo': 2, 'in_progress': 0, 'completed': 1})
+
+        response = self.client.get(url)
+        self.assertNotIn('tasks', response.data['data'])
+
+    def test_embedded_tasks_are_paged(self):
+        """Test limit and cursor page the embedded tasks"""
+        url = f'/api/projects/{self.project.id}'
+        first = self.client.get(url, {'include': 'tasks', 'limit': 2}).data['data']
+        self.assertEqual(len(first['tasks']), 2)
+        cursor = first['tasksPagination']['nextCursor']
+        rest = self.client.get(url, {'include': 'tasks', 'limit': 2, 'cursor': cursor}).data['data']
+        self.assertEqual(len(rest['tasks']), 1)
+        self.assertIsNone(rest['tasksPagination']['nextCursor'])
+
+    def test_unknown_include_is_rejected(self):
+        """Test an unknown include name is a 400"""
+        response = self.client.get(f'/api/projects/{self.project.id}', {'include': 'tasks,owner'})
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
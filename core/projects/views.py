@@ -1,16 +1,41 @@
 from rest_framework.decorators import api_view, permission_classes
+from rest_framework.exceptions import ValidationError
 from rest_framework.permissions import IsAuthenticated
 from rest_framework.response import Response
 from django.shortcuts import get_object_or_404
+from django.db import transaction
 from django.db.models import Count, Q
+from django.utils import timezone
+from accounts.models import User
 from projects.models import Project
 from projects.serializers import (
     ProjectCreateSerializer,
-    ProjectListSerializer,
-    ProjectUpdateSerializer
+    ProjectUpdateSerializer,
+    project_list_projection
 )
+from tasks.models import Task
+from tasks.pagination import task_paginator
+from tasks.serializers import task_list_projection
+from tenants.quota import QuotaExceeded, reserve_quota
+from tenants.purge import enqueue_purge
+from tenants.usage import adjust_usage, task_totals
+from tenants.versions import bump_version, conditional_get, project_version, tenant_version
+from tenants.response_cache import cached_response
+from sync.utils import record_deletions
+from realtime.events import publish_event
+from core.pagination import CursorPaginator
+from core.search import apply_search, search_query
+
+project_paginator = CursorPaginator(['-created_at', '-id'], default_limit=100, max_limit=500)
+project_search_paginator = CursorPaginator(
+    ['-search_rank', '-created_at', '-id'], default_limit=100, max_limit=500
+)
+
+
 @api_view(['GET', 'POST'])
 @permission_classes([IsAuthenticated])
+@conditional_get(tenant_version)
+@cached_response(tenant_version)
 def projects_list_create(request):
     user = request.user
     tenant = user.tenant
@@ -24,20 +49,28 @@ def projects_list_create(request):
                 {"message": "Super admin cannot create projects"},
                 status=403
             )
-        if Project.objects.filter(tenant=tenant).count() >= tenant.max_projects:
+        serializer = ProjectCreateSerializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+
+        try:
+            with transaction.atomic():
+                reserve_quota(tenant.id, 'projects')
+                project = serializer.save(
+                    tenant=tenant,
+                    created_by=request.user
+                )
+                bump_version(tenant.id)
+                publish_event(tenant.id, 'project.created', {
+                    'id': project.id,
+                    'name': project.name,
+                    'status': project.status
+                })
+        except QuotaExceeded:
             return Response(
                 {"message": "Project limit reached"},
                 status=403
             )
 
-        serializer = ProjectCreateSerializer(data=request.data)
-        serializer.is_valid(raise_exception=True)
-
-        project = serializer.save(
-            tenant=tenant,
-            created_by=request.user
-        )
-
         return Response({
             "success": True,
             "data": {
@@ -51,64 +84,130 @@ def projects_list_create(request):
         }, status=201)
 
     # ================= LIST PROJECTS =================
+    # Task counts are stored on the project (projects.counters)
     # Super admin sees ALL projects across all tenants
     if is_super_admin:
-        projects = Project.objects.all().annotate(
-            task_count=Count('tasks'),
-            completed_task_count=Count(
-                'tasks',
-                filter=Q(tasks__status='completed')
-            )
-        ).order_by('-created_at')
+        projects = Project.objects.all()
     else:
-        projects = Project.objects.filter(tenant=tenant).annotate(
-        task_count=Count('tasks'),
-        completed_task_count=Count(
-            'tasks',
-            filter=Q(tasks__status='completed')
-        )
-        ).order_by('-created_at')
+        projects = Project.objects.filter(tenant_id=tenant.id)
+
+    paginator = project_paginator
+    search = search_query(request)
+    if search:
+        projects = apply_search(projects, search)
+        paginator = project_search_paginator
 
-    serializer = ProjectListSerializer(projects, many=True)
+    page = paginator.paginate(request, project_list_projection.values(projects, *paginator.fields))
 
     return Response({
         "success": True,
         "data": {
-            "projects": serializer.data,
-            "total": projects.count()
+            "projects": project_list_projection.project(page.items),
+            "total": page.total,
+            "pagination": page.metadata()
         }
     })
 
 
 
 
+PROJECT_INCLUDES = ('tasks', 'stats', 'creator', 'members')
+
+
+def _project_includes(request):
+    """Names in the comma separated ``include`` query parameter."""
+    raw = request.query_params.get('include') or ''
+    includes = {name.strip() for name in raw.split(',') if name.strip()}
+    unknown = includes.difference(PROJECT_INCLUDES)
+    if unknown:
+        raise ValidationError({
+            'include': f"Unknown: {', '.join(sorted(unknown))}. Allowed: {', '.join(PROJECT_INCLUDES)}."
+        })
+    return includes
+
+
+def _project_detail(request, project, includes):
+    """
+    The project plus the requested related data, one query per include
+    (``creator`` is joined into the project query by the caller).
+    ``tasks`` is a page of the project's tasks, continued with ``cursor``.
+    """
+    data = {
+        "id": str(project.id),
+        "name": project.name,
+        "description": project.description,
+        "status": project.status,
+        "createdBy": str(project.created_by_id),
+        "createdAt": project.created_at,
+        "updatedAt": project.updated_at
+    }
+    tasks = Task.objects.filter(tenant_id=project.tenant_id, project=project)
+
+    if 'creator' in includes:
+        creator = project.created_by
+        data['creator'] = {
+            "id": str(creator.id),
+            "fullName": creator.full_name,
+            "email": creator.email
+        }
+
+    if 'stats' in includes:
+        counts = tasks.aggregate(
+            todo=Count('id', filter=Q(status='todo')),
+            in_progress=Count('id', filter=Q(status='in_progress')),
+            overdue=Count('id', filter=Q(due_date__lt=timezone.localdate()) & ~Q(status='completed'))
+        )
+        data['stats'] = {
+            "taskCount": project.task_count,
+            "completedTaskCount": project.completed_task_count,
+            "overdueTaskCount": counts['overdue'],
+            "byStatus": {
+                "todo": counts['todo'],
+                "in_progress": counts['in_progress'],
+                "completed": project.completed_task_count
+            }
+        }
+
+    if 'members' in includes:
+        # Users with tasks in the project
+        members = User.objects.filter(
+            id__in=tasks.filter(assigned_to__isnull=False).values('assigned_to_id')
+        ).order_by('full_name', 'id')
+        data['members'] = [
+            {"id": str(member.id), "fullName": member.full_name, "email": member.email}
+            for member in members
+        ]
+
+    if 'tasks' in includes:
+        page = task_paginator.paginate(request, task_list_projection.values(tasks, *task_paginator.fields))
+        data['tasks'] = task_list_projection.project(page.items)
+        data['tasksPagination'] = page.metadata()
+
+    return data
+
+
 @api_view(['GET', 'PUT', 'DELETE'])
 @permission_classes([IsAuthenticated])
+@conditional_get(project_version)
 def update_or_delete_project(request, project_id):
-    project = get_object_or_404(Project, id=project_id)
+    includes = _project_includes(request) if request.method == 'GET' else set()
+    projects = Project.objects.select_related('created_by') if 'creator' in includes else Project.objects
+    project = get_object_or_404(projects, id=project_id)
     is_super_admin = request.user.role == 'super_admin'
 
     # Tenant isolation (super admin can access all)
-    if not is_super_admin and project.tenant != request.user.tenant:
+    if not is_super_admin and project.tenant_id != request.user.tenant_id:
         return Response({"message": "Forbidden"}, status=403)
 
     # ================= GET PROJECT DETAILS =================
     if request.method == 'GET':
         return Response({
             "success": True,
-            "data": {
-                "id": str(project.id),
-                "name": project.name,
-                "description": project.description,
-                "status": project.status,
-                "createdBy": str(project.created_by.id) if project.created_by else None,
-                "createdAt": project.created_at,
-                "updatedAt": project.updated_at
-            }
+            "data": _project_detail(request, project, includes)
         })
 
     # Authorization (for PUT/DELETE only)
-    if request.user.role != 'tenant_admin' and project.created_by != request.user:
+    if request.user.role != 'tenant_admin' and project.created_by_id != request.user.id:
         return Response({"message": "Not authorized"}, status=403)
 
     if request.method == 'PUT':
@@ -118,7 +217,14 @@ def update_or_delete_project(request, project_id):
             partial=True
         )
         serializer.is_valid(raise_exception=True)
-        serializer.save()
+        with transaction.atomic():
+            serializer.save()
+            bump_version(project.tenant_id, project.id)
+            publish_event(project.tenant_id, 'project.updated', {
+                'id': project.id,
+                'name': project.name,
+                'status': project.status
+            })
 
         return Response({
             "success": True,
@@ -127,8 +233,24 @@ def update_or_delete_project(request, project_id):
         })
 
     if request.method == 'DELETE':
-        project.delete()
+        # Hide the project now; its tasks are removed in batches by a purge
+        # job (which also records their tombstones)
+        with transaction.atomic():
+            deleted_tasks = task_totals(Task.objects.filter(project=project))
+            project.deleted_at = timezone.now()
+            project.save(update_fields=['deleted_at'])
+            record_deletions(project.tenant_id, 'project', [project.id])
+            adjust_usage(
+                project.tenant_id,
+                projects=-1,
+                tasks=-deleted_tasks['tasks'],
+                open_tasks=-deleted_tasks['open_tasks']
+            )
+            bump_version(project.tenant_id)
+            publish_event(project.tenant_id, 'project.deleted', {'id': project_id})
+            job = enqueue_purge('project', project.id, project.tenant_id)
         return Response({
             "success": True,
-            "message": "Project deleted successfully"
+            "message": "Project deleted successfully",
+            "data": {"purgeJobId": job.id}
         })
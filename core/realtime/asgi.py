@@ -0,0 +1,188 @@
+"""
+ASGI endpoints streaming a tenant's realtime events.
+
+- ``GET /api/events``: Server-Sent Events (``text/event-stream``)
+- ``/ws/events``: WebSocket, one JSON text frame per event
+
+Both authenticate with the regular access token, either as
+``Authorization: Bearer <token>`` or as ``?token=<token>`` (browsers cannot
+set headers on EventSource / WebSocket). Every other request is passed to
+the Django application.
+"""
+
+import asyncio
+import json
+from urllib.parse import parse_qs
+
+from asgiref.sync import sync_to_async
+
+from .broadcaster import broadcaster, get_backend, realtime_settings
+
+SSE_PATH = '/api/events'
+WEBSOCKET_PATH = '/ws/events'
+
+# WebSocket close codes (4000-4999 are application defined)
+CLOSE_UNAUTHORIZED = 4401
+CLOSE_NOT_FOUND = 4404
+
+
+def _token(scope):
+    for name, value in scope.get('headers', []):
+        if name == b'authorization':
+            scheme, _, token = value.decode('latin-1').partition(' ')
+            if scheme.lower() == 'bearer' and token:
+                return token.strip()
+    values = parse_qs(scope.get('query_string', b'').decode()).get('token')
+    return values[0] if values else None
+
+
+@sync_to_async
+def _authenticate(token):
+    """The active tenant user for an access token, or None."""
+    from rest_framework.exceptions import AuthenticationFailed
+    from rest_framework_simplejwt.exceptions import InvalidToken, TokenError
+    from accounts.authentication import CachedJWTAuthentication
+
+    if not token:
+        return None
+    authentication = CachedJWTAuthentication()
+    try:
+        user = authentication.get_user(authentication.get_validated_token(token))
+    except (AuthenticationFailed, InvalidToken, TokenError):
+        return None
+    return user if user.tenant_id else None
+
+
+def _sse_frame(message):
+    return f"event: {message['type']}\ndata: {json.dumps(message)}\n\n".encode()
+
+
+async def _wait_for_disconnect(receive):
+    while (await receive())['type'] != 'http.disconnect':
+        pass
+
+
+async def _stream(subscription, other, on_message, on_idle=None, timeout=None):
+    """
+    Pump subscription messages to ``on_message`` until ``other`` (a task
+    watching the client) finishes. ``on_idle`` runs after ``timeout``
+    seconds without messages.
+    """
+    pending = None
+    try:
+        while True:
+            if pending is None:
+                pending = asyncio.ensure_future(subscription.get())
+            done, _ = await asyncio.wait(
+                {pending, other}, timeout=timeout, return_when=asyncio.FIRST_COMPLETED
+            )
+            if other in done:
+                return
+            if pending in done:
+                message, pending = pending.result(), None
+                await on_message(message)
+            elif on_idle is not None:
+                await on_idle()
+    finally:
+        if pending is not None:
+            pending.cancel()
+
+
+async def sse_events(scope, receive, send):
+    user = await _authenticate(_token(scope))
+    if user is None:
+        await send({
+            'type': 'http.response.start',
+            'status': 401,
+            'headers': [(b'content-type', b'application/json')],
+        })
+        await send({'type': 'http.response.body', 'body': b'{"message": "Unauthorized"}'})
+        return
+
+    subscription = broadcaster.subscribe(user.tenant_id)
+    get_backend().start()
+    disconnect = asyncio.ensure_future(_wait_for_disconnect(receive))
+    try:
+        await send({
+            'type': 'http.response.start',
+            'status': 200,
+            'headers': [
+                (b'content-type', b'text/event-stream'),
+                (b'cache-control', b'no-cache'),
+                # Disable response buffering in nginx
+                (b'x-accel-buffering', b'no'),
+            ],
+        })
+        await send({'type': 'http.response.body', 'body': b': connected\n\n', 'more_body': True})
+
+        async def on_message(message):
+            await send({'type': 'http.response.body', 'body': _sse_frame(message), 'more_body': True})
+
+        async def on_idle():
+            await send({'type': 'http.response.body', 'body': b': keepalive\n\n', 'more_body': True})
+
+        await _stream(
+            subscription, disconnect, on_message, on_idle,
+            timeout=realtime_settings()['KEEPALIVE']
+        )
+    finally:
+        broadcaster.unsubscribe(subscription)
+        disconnect.cancel()
+
+
+async def websocket_events(scope, receive, send):
+    if (await receive())['type'] != 'websocket.connect':
+        return
+    user = await _authenticate(_token(scope))
+    if user is None:
+        await send({'type': 'websocket.close', 'code': CLOSE_UNAUTHORIZED})
+        return
+
+    subscription = broadcaster.subscribe(user.tenant_id)
+    get_backend().start()
+    await send({'type': 'websocket.accept'})
+
+    async def wait_for_disconnect():
+        # Messages from the client are ignored
+        while (await receive())['type'] != 'websocket.disconnect':
+            pass
+
+    disconnect = asyncio.ensure_future(wait_for_disconnect())
+
+    async def on_message(message):
+        await send({'type': 'websocket.send', 'text': json.dumps(message)})
+
+    try:
+        await _stream(subscription, disconnect, on_message)
+    finally:
+        broadcaster.unsubscribe(subscription)
+        disconnect.cancel()
+
+
+class RealtimeRouter:
+    """Serve the event streams and hand everything else to ``application``."""
+
+    def __init__(self, application):
+        self.application = application
+
+    async def __call__(self, scope, receive, send):
+        if scope['type'] == 'lifespan':
+            return await self.lifespan(receive, send)
+        if scope['type'] == 'websocket':
+            if scope['path'] == WEBSOCKET_PATH:
+                return await websocket_events(scope, receive, send)
+            await send({'type': 'websocket.close', 'code': CLOSE_NOT_FOUND})
+            return
+        if scope['type'] == 'http' and scope['path'] == SSE_PATH:
+            return await sse_events(scope, receive, send)
+        return await self.application(scope, receive, send)
+
+    async def lifespan(self, receive, send):
+        # Django's handler does not implement the lifespan protocol
+        while True:
+            message = await receive()
+            if message['type'] == 'lifespan.startup':
+                await send({'type': 'lifespan.startup.complete'})
+            elif message['type'] == 'lifespan.shutdown':
+                await send({'type': 'lifespan.shutdown.complete'})
+                return
@@ -0,0 +1,183 @@
+"""
+Per-tenant fan-out of realtime events to connected clients.
+
+``Broadcaster`` keeps the subscriptions of this process (one asyncio queue
+per open WebSocket / SSE connection) and can be fed from any thread. A
+backend carries published events to the broadcasters:
+
+- ``LocalBackend`` hands events straight to this process' broadcaster. It is
+  enough for a single ASGI worker and for local development.
+- ``PostgresBackend`` sends events with ``pg_notify`` and runs one LISTEN
+  thread per process, so every worker receives every event.
+
+The backend is chosen with ``REALTIME['BACKEND']``.
+"""
+
+import asyncio
+import json
+import logging
+import select
+import threading
+import time
+
+from django.conf import settings
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db import connection, connections
+from django.utils.module_loading import import_string
+
+logger = logging.getLogger(__name__)
+
+DEFAULTS = {
+    'BACKEND': 'realtime.broadcaster.LocalBackend',
+    'QUEUE_SIZE': 100,
+    'KEEPALIVE': 15,
+}
+
+# Sent instead of the dropped events when a slow client's queue overflows
+RESYNC = {'type': 'resync'}
+
+
+def realtime_settings():
+    return {**DEFAULTS, **getattr(settings, 'REALTIME', {})}
+
+
+class Subscription:
+    def __init__(self, tenant_id, loop, queue_size):
+        self.tenant_id = tenant_id
+        self.loop = loop
+        self.queue = asyncio.Queue(queue_size)
+
+    def offer(self, message):
+        """Queue a message from any thread."""
+        try:
+            self.loop.call_soon_threadsafe(self._put, message)
+        except RuntimeError:
+            # Event loop already closed
+            pass
+
+    def _put(self, message):
+        if self.queue.full():
+            # The client fell behind: replace the backlog with a resync hint
+            while not self.queue.empty():
+                self.queue.get_nowait()
+            message = RESYNC
+        self.queue.put_nowait(message)
+
+    async def get(self):
+        return await self.queue.get()
+
+
+class Broadcaster:
+    def __init__(self, queue_size=100):
+        self.queue_size = queue_size
+        self._subscriptions = {}
+        self._lock = threading.Lock()
+
+    def subscribe(self, tenant_id):
+        """Subscribe the running event loop to a tenant's events."""
+        subscription = Subscription(str(tenant_id), asyncio.get_running_loop(), self.queue_size)
+        with self._lock:
+            self._subscriptions.setdefault(subscription.tenant_id, set()).add(subscription)
+        return subscription
+
+    def unsubscribe(self, subscription):
+        with self._lock:
+            subscriptions = self._subscriptions.get(subscription.tenant_id)
+            if subscriptions is not None:
+                subscriptions.discard(subscription)
+                if not subscriptions:
+                    del self._subscriptions[subscription.tenant_id]
+
+    def dispatch(self, message):
+        """Deliver a message to the subscribers of its tenant (thread-safe)."""
+        with self._lock:
+            subscriptions = list(self._subscriptions.get(message.get('tenantId'), ()))
+        for subscription in subscriptions:
+            subscription.offer(message)
+
+    def __len__(self):
+        with self._lock:
+            return sum(len(subscriptions) for subscriptions in self._subscriptions.values())
+
+
+class LocalBackend:
+    """Deliver events within this process only."""
+
+    def __init__(self, broadcaster):
+        self.broadcaster = broadcaster
+
+    def start(self):
+        pass
+
+    def publish(self, message):
+        self.broadcaster.dispatch(message)
+
+
+class PostgresBackend:
+    """Deliver events to every process through PostgreSQL LISTEN/NOTIFY."""
+
+    CHANNEL = 'realtime_events'
+    # NOTIFY payloads are limited to 8000 bytes
+    MAX_PAYLOAD = 7900
+
+    def __init__(self, broadcaster):
+        self.broadcaster = broadcaster
+        self._thread = None
+        self._lock = threading.Lock()
+
+    def start(self):
+        with self._lock:
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._listen, name='realtime-listener', daemon=True)
+                self._thread.start()
+
+    def publish(self, message):
+        payload = json.dumps(message, cls=DjangoJSONEncoder)
+        if len(payload.encode()) > self.MAX_PAYLOAD:
+            # Keep the identifying fields; clients refetch the details
+            data = {
+                key: value for key, value in message.get('data', {}).items()
+                if not isinstance(value, (list, dict))
+            }
+            payload = json.dumps({**message, 'data': {**data, 'truncated': True}}, cls=DjangoJSONEncoder)
+        with connection.cursor() as cursor:
+            cursor.execute('SELECT pg_notify(%s, %s)', [self.CHANNEL, payload])
+
+    def _listen(self):
+        import psycopg2
+
+        params = connections['default'].get_connection_params()
+        while True:
+            listener = None
+            try:
+                listener = psycopg2.connect(**params)
+                listener.autocommit = True
+                with listener.cursor() as cursor:
+                    cursor.execute(f'LISTEN {self.CHANNEL}')
+                while True:
+                    if select.select([listener], [], [], 5) == ([], [], []):
+                        continue
+                    listener.poll()
+                    while listener.notifies:
+                        notify = listener.notifies.pop(0)
+                        self.broadcaster.dispatch(json.loads(notify.payload))
+            except Exception:
+                logger.exception("Realtime listener failed; reconnecting")
+                time.sleep(1)
+            finally:
+                if listener is not None:
+                    listener.close()
+
+
+broadcaster = Broadcaster(queue_size=realtime_settings()['QUEUE_SIZE'])
+
+_backend = None
+_backend_lock = threading.Lock()
+
+
+def get_backend():
+    global _backend
+    with _backend_lock:
+        if _backend is None:
+            _backend = import_string(realtime_settings()['BACKEND'])(broadcaster)
+        return _backend
@@ -0,0 +1,43 @@
+"""
+Publishing realtime events from the write paths.
+
+Views call ``publish_event`` next to the write; the event is handed to the
+backend only once the transaction commits, so clients never see changes
+that were rolled back.
+"""
+
+import json
+import logging
+
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db import transaction
+from django.utils import timezone
+
+from .broadcaster import get_backend
+
+logger = logging.getLogger(__name__)
+
+
+def publish_event(tenant_id, event_type, data):
+    """
+    Publish ``{"type": event_type, "tenantId": ..., "data": data}`` to the
+    tenant's subscribers after the current transaction commits.
+    """
+    if tenant_id is None:
+        return
+    # Serialize now so the payload is a snapshot of the committed state
+    message = json.loads(json.dumps({
+        'type': event_type,
+        'tenantId': str(tenant_id),
+        'data': data,
+        'at': timezone.now(),
+    }, cls=DjangoJSONEncoder))
+    transaction.on_commit(lambda: _send(message))
+
+
+def _send(message):
+    try:
+        get_backend().publish(message)
+    except Exception:
+        # Realtime delivery is best effort; the write already succeeded
+        logger.exception("Failed to publish %s event", message['type'])
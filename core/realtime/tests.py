@@ -0,0 +1,233 @@
+"""Tests for realtime app."""
+import asyncio
+import json
+from unittest import mock
+
+from asgiref.sync import async_to_sync
+from asgiref.testing import ApplicationCommunicator
+from rest_framework.test import APITestCase, APIClient
+from rest_framework import status
+from accounts.models import User
+from tenants.models import Tenant
+from projects.models import Project
+from realtime.asgi import CLOSE_UNAUTHORIZED, RealtimeRouter
+from realtime.broadcaster import RESYNC, Broadcaster, broadcaster
+
+
+async def not_found(scope, receive, send):
+    await send({'type': 'http.response.start', 'status': 404, 'headers': []})
+    await send({'type': 'http.response.body', 'body': b''})
+
+
+class BroadcasterTests(APITestCase):
+    """Test cases for the per-tenant fan-out"""
+
+    def test_dispatches_to_tenant_subscribers_only(self):
+        """Test an event reaches its tenant's subscribers and no one else"""
+        async def run():
+            hub = Broadcaster(queue_size=10)
+            first = hub.subscribe('tenant-a')
+            second = hub.subscribe('tenant-a')
+            other = hub.subscribe('tenant-b')
+            hub.dispatch({'type': 'task.created', 'tenantId': 'tenant-a'})
+            await asyncio.sleep(0)
+            self.assertEqual((await first.get())['type'], 'task.created')
+            self.assertEqual((await second.get())['type'], 'task.created')
+            self.assertTrue(other.queue.empty())
+            hub.unsubscribe(first)
+            hub.unsubscribe(second)
+            hub.unsubscribe(other)
+            self.assertEqual(len(hub), 0)
+
+        async_to_sync(run)()
+
+    def test_overflow_is_replaced_by_resync(self):
+        """Test a client that falls behind gets a resync hint instead of the backlog"""
+        async def run():
+            hub = Broadcaster(queue_size=2)
+            subscription = hub.subscribe('tenant-a')
+            for i in range(3):
+                hub.dispatch({'type': 'task.updated', 'tenantId': 'tenant-a', 'data': {'n': i}})
+            await asyncio.sleep(0)
+            self.assertEqual(await subscription.get(), RESYNC)
+            self.assertTrue(subscription.queue.empty())
+
+        async_to_sync(run)()
+
+
+class RealtimeStreamTests(APITestCase):
+    """Test cases for the SSE and WebSocket endpoints"""
+
+    def setUp(self):
+        self.client = APIClient()
+        self.tenant = Tenant.objects.create(
+            name="Demo Company",
+            subdomain="demo",
+            status="active"
+        )
+        self.admin = User.objects.create_user(
+            email="admin@demo.com",
+            password="Admin@123",
+            full_name="Admin User",
+            tenant=self.tenant,
+            role="tenant_admin"
+        )
+        response = self.client.post('/api/auth/login', {
+            'email': 'admin@demo.com',
+            'password': 'Admin@123',
+            'tenantSubdomain': 'demo'
+        }, format='json')
+        self.token = response.data['data']['token']
+        self.app = RealtimeRouter(not_found)
+
+    def event(self, event_type='task.created', tenant_id=None):
+        return {
+            'type': event_type,
+            'tenantId': str(tenant_id or self.tenant.id),
+            'data': {'id': 'x'},
+        }
+
+    def test_sse_streams_tenant_events(self):
+        """Test the event stream sends the tenant's events as SSE frames"""
+        async def run():
+            communicator = ApplicationCommunicator(self.app, {
+                'type': 'http',
+                'method': 'GET',
+                'path': '/api/events',
+                'query_string': f'token={self.token}'.encode(),
+                'headers': [],
+            })
+            await communicator.send_input({'type': 'http.request', 'body': b''})
+            start = await communicator.receive_output(5)
+            self.assertEqual(start['status'], 200)
+            self.assertIn((b'content-type', b'text/event-stream'), start['headers'])
+            self.assertEqual((await communicator.receive_output(5))['body'], b': connected\n\n')
+
+            broadcaster.dispatch(self.event(tenant_id='another-tenant'))
+            broadcaster.dispatch(self.event())
+            frame = (await communicator.receive_output(5))['body'].decode()
+            self.assertTrue(frame.startswith('event: task.created\n'))
+            self.assertEqual(json.loads(frame.split('data: ', 1)[1])['tenantId'], str(self.tenant.id))
+
+            await communicator.send_input({'type': 'http.disconnect'})
+            await communicator.wait(5)
+            self.assertEqual(len(broadcaster), 0)
+
+        async_to_sync(run)()
+
+    def test_sse_requires_token(self):
+        """Test the event stream rejects requests without a valid token"""
+        async def run():
+            communicator = ApplicationCommunicator(self.app, {
+                'type': 'http',
+                'method': 'GET',
+                'path': '/api/events',
+                'query_string': b'token=invalid',
+                'headers': [],
+            })
+            await communicator.send_input({'type': 'http.request', 'body': b''})
+            self.assertEqual((await communicator.receive_output(5))['status'], 401)
+            await communicator.wait(5)
+
+        async_to_sync(run)()
+
+    def test_websocket_streams_tenant_events(self):
+        """Test the WebSocket accepts a bearer token and sends events as JSON"""
+        async def run():
+            communicator = ApplicationCommunicator(self.app, {
+                'type': 'websocket',
+                'path': '/ws/events',
+                'query_string': b'',
+                'headers': [(b'authorization', f'Bearer {self.token}'.encode())],
+            })
+            await communicator.send_input({'type': 'websocket.connect'})
+            self.assertEqual((await communicator.receive_output(5))['type'], 'websocket.accept')
+
+            broadcaster.dispatch(self.event('project.updated'))
+            message = await communicator.receive_output(5)
+            self.assertEqual(json.loads(message['text'])['type'], 'project.updated')
+
+            await communicator.send_input({'type': 'websocket.disconnect', 'code': 1000})
+            await communicator.wait(5)
+            self.assertEqual(len(broadcaster), 0)
+
+        async_to_sync(run)()
+
+    def test_websocket_rejects_invalid_token(self):
+        """Test the WebSocket is closed with 4401 without a valid token"""
+        async def run():
+            communicator = ApplicationCommunicator(self.app, {
+                'type': 'websocket',
+                'path': '/ws/events',
+                'query_string': b'token=invalid',
+                'headers': [],
+            })
+            await communicator.send_input({'type': 'websocket.connect'})
+            message = await communicator.receive_output(5)
+            self.assertEqual(message, {'type': 'websocket.close', 'code': CLOSE_UNAUTHORIZED})
+
+        async_to_sync(run)()
+
+    def test_other_requests_reach_django(self):
+        """Test requests outside the event endpoints go to the wrapped application"""
+        async def run():
+            communicator = ApplicationCommunicator(self.app, {
+                'type': 'http', 'method': 'GET', 'path': '/api/health', 'query_string': b'', 'headers': [],
+            })
+            await communicator.send_input({'type': 'http.request', 'body': b''})
+            self.assertEqual((await communicator.receive_output(5))['status'], 404)
+
+        async_to_sync(run)()
+
+
+class PublishEventTests(APITestCase):
+    """Test cases for publishing events from the write endpoints"""
+
+    def setUp(self):
+        self.client = APIClient()
+        self.tenant = Tenant.objects.create(
+            name="Demo Company",
+            subdomain="demo",
+            status="active"
+        )
+        self.admin = User.objects.create_user(
+            email="admin@demo.com",
+            password="Admin@123",
+            full_name="Admin User",
+            tenant=self.tenant,
+            role="tenant_admin"
+        )
+        self.project = Project.objects.create(
+            name="Test Project",
+            tenant=self.tenant,
+            created_by=self.admin
+        )
+        self.client.force_authenticate(user=self.admin)
+
+    def test_task_events_published_on_commit(self):
+        """Test task writes publish events to the tenant after commit"""
+        with mock.patch('realtime.events.get_backend') as get_backend:
+            with self.captureOnCommitCallbacks(execute=True):
+                response = self.client.post(
+                    f'/api/projects/{self.project.id}/tasks',
+                    {'title': 'Design'},
+                    format='json'
+                )
+            self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+            message = get_backend.return_value.publish.call_args.args[0]
+        self.assertEqual(message['type'], 'task.created')
+        self.assertEqual(message['tenantId'], str(self.tenant.id))
+        self.assertEqual(message['data']['id'], str(response.data['data']['id']))
+
+    def test_failed_writes_publish_nothing(self):
+        """Test rejected writes do not publish events"""
+        with mock.patch('realtime.events.get_backend') as get_backend:
+            with self.captureOnCommitCallbacks(execute=True) as callbacks:
+                response = self.client.post(
+                    f'/api/projects/{self.project.id}/tasks',
+                    {'title': ''},
+                    format='json'
+                )
+            self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+            self.assertEqual(callbacks, [])
+            get_backend.return_value.publish.assert_not_called()
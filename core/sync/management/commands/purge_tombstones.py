@@ -0,0 +1,22 @@
+"""
+Django management command to delete tombstones past the sync retention.
+
+Sync cursors older than SYNC_TOMBSTONE_RETENTION_DAYS are rejected by the
+sync endpoint, so the tombstones they would need can be removed.
+"""
+
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from django.utils import timezone
+from sync.models import Tombstone
+
+
+class Command(BaseCommand):
+    help = 'Delete sync tombstones older than the retention period'
+
+    def handle(self, *args, **options):
+        cutoff = timezone.now() - timedelta(days=settings.SYNC_TOMBSTONE_RETENTION_DAYS)
+        deleted, _ = Tombstone.objects.filter(deleted_at__lt=cutoff).delete()
+        self.stdout.write(self.style.SUCCESS(f'✓ Deleted {deleted} tombstones'))
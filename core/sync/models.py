@@ -0,0 +1,32 @@
+import uuid
+from django.db import models
+from django.utils import timezone
+
+
+class Tombstone(models.Model):
+    """
+    Record of a deleted task, project or user.
+
+    Rows no longer exist once deleted, so the sync endpoint reads deletions
+    from here. Written by the delete paths through ``sync.utils``; old
+    entries are removed by ``purge_tombstones``.
+    """
+    ENTITY_CHOICES = (
+        ('task', 'Task'),
+        ('project', 'Project'),
+        ('user', 'User'),
+    )
+
+    id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
+    tenant = models.ForeignKey('tenants.Tenant', on_delete=models.CASCADE)
+    entity_type = models.CharField(max_length=20, choices=ENTITY_CHOICES)
+    entity_id = models.UUIDField()
+    deleted_at = models.DateTimeField(default=timezone.now)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['tenant', 'deleted_at', 'id'], name='tombstone_tenant_deleted_idx'),
+        ]
+
+    def __str__(self):
+        return f"{self.entity_type} {self.entity_id}"
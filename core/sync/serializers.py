@@ -0,0 +1,28 @@
+from rest_framework import serializers
+from accounts.models import User
+from projects.models import Project
+from tasks.models import Task
+
+
+class TaskSyncSerializer(serializers.ModelSerializer):
+    class Meta:
+        model = Task
+        fields = [
+            'id', 'project', 'title', 'description', 'status', 'priority',
+            'assigned_to', 'due_date', 'created_at', 'updated_at'
+        ]
+
+
+class ProjectSyncSerializer(serializers.ModelSerializer):
+    class Meta:
+        model = Project
+        fields = [
+            'id', 'name', 'description', 'status', 'created_by',
+            'created_at', 'updated_at'
+        ]
+
+
+class UserSyncSerializer(serializers.ModelSerializer):
+    class Meta:
+        model = User
+        fields = ['id', 'email', 'full_name', 'role', 'is_active', 'created_at', 'updated_at']
@@ -0,0 +1,113 @@
+"""Tests for sync app."""
+from io import StringIO
+from django.core.management import call_command
+from django.test import override_settings
+from rest_framework.test import APITestCase, APIClient
+from rest_framework import status
+from accounts.models import User
+from tenants.models import Tenant
+from projects.models import Project
+from tasks.models import Task
+from sync.models import Tombstone
+
+
+class SyncAPITests(APITestCase):
+    """Test cases for the delta sync endpoint"""
+
+    def setUp(self):
+        self.client = APIClient()
+        self.tenant = Tenant.objects.create(
+            name="Demo Company",
+            subdomain="demo",
+            status="active"
+        )
+        self.admin = User.objects.create_user(
+            email="admin@demo.com",
+            password="Admin@123",
+            full_name="Admin User",
+            tenant=self.tenant,
+            role="tenant_admin"
+        )
+        self.project = Project.objects.create(
+            name="Test Project",
+            tenant=self.tenant,
+            created_by=self.admin
+        )
+        response = self.client.post('/api/auth/login', {
+            'email': 'admin@demo.com',
+            'password': 'Admin@123',
+            'tenantSubdomain': 'demo'
+        }, format='json')
+        self.client.credentials(HTTP_AUTHORIZATION=f"Bearer {response.data['data']['token']}")
+
+    def sync(self, since=None, **params):
+        if since:
+            params['since'] = since
+        response = self.client.get('/api/sync', params)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        return response.data['data']
+
+    def test_returns_only_changes_since_cursor(self):
+        """Test a second sync returns only rows written after the first"""
+        task = Task.objects.create(title="Design", project=self.project, tenant=self.tenant)
+        data = self.sync()
+        self.assertEqual([t['id'] for t in data['tasks']], [str(task.id)])
+        self.assertEqual(len(data['projects']), 1)
+        self.assertEqual(len(data['users']), 1)
+
+        data = self.sync(data['nextCursor'])
+        self.assertEqual((data['tasks'], data['projects'], data['users']), ([], [], []))
+
+        self.client.patch(f'/api/tasks/{task.id}/status', {'status': 'completed'}, format='json')
+        data = self.sync(data['nextCursor'])
+        self.assertEqual([t['status'] for t in data['tasks']], ['completed'])
+        self.assertEqual(data['projects'], [])
+
+    def test_deletions_come_from_tombstones(self):
+        """Test deleted tasks and projects (with cascaded tasks) are reported"""
+        first = Task.objects.create(title="First", project=self.project, tenant=self.tenant)
+        second = Task.objects.create(title="Second", project=self.project, tenant=self.tenant)
+        cursor = self.sync()['nextCursor']
+
+        self.client.delete(f'/api/tasks/{first.id}/delete')
+        data = self.sync(cursor)
+        self.assertEqual(data['deleted']['tasks'], [first.id])
+
+        self.client.delete(f'/api/projects/{self.project.id}')
+        data = self.sync(data['nextCursor'])
+        self.assertEqual(data['deleted']['tasks'], [second.id])
+        self.assertEqual(data['deleted']['projects'], [self.project.id])
+
+    def test_pages_with_cursor(self):
+        """Test large change sets are paged"""
+        ids = {
+            str(Task.objects.create(title=f"Task {i}", project=self.project, tenant=self.tenant).id)
+            for i in range(5)
+        }
+        seen = set()
+        data = self.sync(limit=2)
+        seen.update(t['id'] for t in data['tasks'])
+        while data['hasMore']:
+            data = self.sync(data['nextCursor'], limit=2)
+            seen.update(t['id'] for t in data['tasks'])
+        self.assertEqual(seen, ids)
+
+    def test_rejects_foreign_and_expired_cursors(self):
+        """Test cursors are bound to the tenant and expire with tombstones"""
+        cursor = self.sync()['nextCursor']
+        response = self.client.get('/api/sync', {'since': cursor + 'x'})
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+        with override_settings(SYNC_TOMBSTONE_RETENTION_DAYS=0):
+            response = self.client.get('/api/sync', {'since': cursor})
+        self.assertEqual(response.status_code, status.HTTP_410_GONE)
+
+    def test_purge_tombstones(self):
+        """Test the purge command removes tombstones past retention"""
+        task = Task.objects.create(title="Design", project=self.project, tenant=self.tenant)
+        self.client.delete(f'/api/tasks/{task.id}/delete')
+        call_command('purge_tombstones', stdout=StringIO())
+        self.assertEqual(Tombstone.objects.count(), 1)
+        with override_settings(SYNC_TOMBSTONE_RETENTION_DAYS=0):
+            call_command('purge_tombstones', stdout=StringIO())
+        self.assertEqual(Tombstone.objects.count(), 0)
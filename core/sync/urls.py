@@ -0,0 +1,6 @@
+from django.urls import path
+from sync.views import sync_changes
+
+urlpatterns = [
+    path('sync', sync_changes),
+]
@@ -0,0 +1,14 @@
+from .models import Tombstone
+
+
+def record_deletions(tenant_id, entity_type, entity_ids):
+    """
+    Record deleted entities for the sync endpoint.
+
+    Call inside the transaction of the delete, with the ids of every row it
+    removes (including cascaded ones).
+    """
+    Tombstone.objects.bulk_create([
+        Tombstone(tenant_id=tenant_id, entity_type=entity_type, entity_id=entity_id)
+        for entity_id in entity_ids
+    ])
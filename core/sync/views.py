@@ -0,0 +1,119 @@
+from datetime import timedelta
+
+from django.conf import settings
+from django.core import signing
+from django.utils import timezone
+from django.utils.dateparse import parse_datetime
+from rest_framework.decorators import api_view, permission_classes
+from rest_framework.exceptions import ValidationError
+from rest_framework.permissions import IsAuthenticated
+from rest_framework.response import Response
+
+from accounts.models import User
+from core.pagination import CursorPaginator
+from projects.models import Project
+from tasks.models import Task
+from sync.models import Tombstone
+from sync.serializers import ProjectSyncSerializer, TaskSyncSerializer, UserSyncSerializer
+
+CURSOR_SALT = 'sync.cursor'
+
+# Response key -> (model, serializer, tombstone entity type)
+SYNC_ENTITIES = {
+    'tasks': (Task, TaskSyncSerializer, 'task'),
+    'projects': (Project, ProjectSyncSerializer, 'project'),
+    'users': (User, UserSyncSerializer, 'user'),
+}
+
+change_paginator = CursorPaginator(['updated_at', 'id'], default_limit=200, max_limit=1000)
+tombstone_paginator = CursorPaginator(['deleted_at', 'id'], default_limit=200, max_limit=1000)
+
+
+def _decode_since(since, tenant_id):
+    if not since:
+        return {}
+    try:
+        state = signing.loads(since, salt=CURSOR_SALT)
+    except signing.BadSignature:
+        raise ValidationError({'since': 'Invalid cursor.'})
+    if not isinstance(state, dict) or state.get('tenant') != str(tenant_id):
+        raise ValidationError({'since': 'Invalid cursor.'})
+    return state
+
+
+@api_view(['GET'])
+@permission_classes([IsAuthenticated])
+def sync_changes(request):
+    """
+    Tasks, projects and users changed since a cursor, plus deletions.
+
+    Without ``since`` the tenant's data is returned from the beginning; each
+    response carries ``nextCursor`` for the next call. Rows are walked in
+    ``(updated_at, id)`` order per entity, and deletions in
+    ``(deleted_at, id)`` order from the tombstone table, so a call costs
+    O(changes) rather than O(tenant size).
+
+    Only rows older than ``SYNC_SETTLE_SECONDS`` are returned: a write whose
+    transaction commits after a later one would otherwise land behind a
+    cursor that has already passed its timestamp.
+    """
+    user = request.user
+    if user.tenant_id is None:
+        return Response({"message": "Sync is only available to tenant users"}, status=403)
+
+    state = _decode_since(request.query_params.get('since'), user.tenant_id)
+    now = timezone.now()
+    retention = timedelta(days=settings.SYNC_TOMBSTONE_RETENTION_DAYS)
+    if state and parse_datetime(state['at']) < now - retention:
+        return Response({
+            "message": "Sync cursor has expired; sync again without a cursor"
+        }, status=410)
+
+    limit = change_paginator.get_limit(request)
+    horizon = now - timedelta(seconds=settings.SYNC_SETTLE_SECONDS)
+    positions = state.get('positions', {})
+    next_positions = {}
+    has_more = False
+    data = {}
+
+    for key, (model, serializer_class, _) in SYNC_ENTITIES.items():
+        queryset = model.objects.filter(tenant_id=user.tenant_id, updated_at__lte=horizon)
+        position = positions.get(key)
+        if position:
+            queryset = queryset.filter(
+                change_paginator.after(model, change_paginator.decode_position(position, model))
+            )
+        rows = list(change_paginator.order_by(queryset)[:limit + 1])
+        has_more |= len(rows) > limit
+        rows = rows[:limit]
+        next_positions[key] = change_paginator.position(rows[-1]) if rows else position
+        data[key] = serializer_class(rows, many=True).data
+
+    tombstones = Tombstone.objects.filter(tenant_id=user.tenant_id, deleted_at__lte=horizon)
+    position = positions.get('deleted')
+    if position:
+        tombstones = tombstones.filter(
+            tombstone_paginator.after(Tombstone, tombstone_paginator.decode_position(position, Tombstone))
+        )
+    rows = list(tombstone_paginator.order_by(tombstones)[:limit + 1])
+    has_more |= len(rows) > limit
+    rows = rows[:limit]
+    next_positions['deleted'] = tombstone_paginator.position(rows[-1]) if rows else position
+
+    deleted = {key: [] for key in SYNC_ENTITIES}
+    keys = {entity_type: key for key, (_, _, entity_type) in SYNC_ENTITIES.items()}
+    for tombstone in rows:
+        deleted[keys[tombstone.entity_type]].append(tombstone.entity_id)
+    data['deleted'] = deleted
+
+    data['nextCursor'] = signing.dumps({
+        'tenant': str(user.tenant_id),
+        'at': now.isoformat(),
+        'positions': next_positions,
+    }, salt=CURSOR_SALT, compress=True)
+    data['hasMore'] = has_more
+
+    return Response({
+        "success": True,
+        "data": data
+    })
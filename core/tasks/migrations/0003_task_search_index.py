@@ -0,0 +1,12 @@
+from django.db import migrations
+
+from core.search import search_operations
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("tasks", "0002_alter_task_project"),
+    ]
+
+    operations = search_operations("tasks_task", (("title", "A"), ("description", "B")))
@@ -0,0 +1,56 @@
+# Generated by Django 5.2.18 on 2026-10-18 07:24
+
+from django.conf import settings
+from django.db import migrations, models
+from django.db.models import Case, Value, When
+
+
+def backfill_priority_rank(apps, schema_editor):
+    Task = apps.get_model("tasks", "Task")
+    Task.objects.update(
+        priority_rank=Case(
+            When(priority="low", then=Value(1)),
+            When(priority="medium", then=Value(2)),
+            When(priority="high", then=Value(3)),
+            default=Value(0),
+        )
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("projects", "0003_project_search_index"),
+        ("tasks", "0003_task_search_index"),
+        ("tenants", "0003_tenantusage"),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="task",
+            name="priority_rank",
+            field=models.PositiveSmallIntegerField(default=2, editable=False),
+        ),
+        migrations.RunPython(backfill_priority_rank, migrations.RunPython.noop),
+        migrations.AddIndex(
+            model_name="task",
+            index=models.Index(
+                fields=["project", "status", "-priority_rank", "due_date"],
+                name="task_project_status_rank_idx",
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="task",
+            index=models.Index(
+                fields=["tenant", "assigned_to", "status"],
+                name="task_tenant_assignee_idx",
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="task",
+            index=models.Index(
+                fields=["tenant", "created_at"], name="task_tenant_created_idx"
+            ),
+        ),
+    ]
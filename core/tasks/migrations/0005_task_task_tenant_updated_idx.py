@@ -0,0 +1,23 @@
+# Generated by Django 5.2.18 on 2026-10-18 07:35
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("projects", "0005_project_project_tenant_updated_idx"),
+        ("tasks", "0004_task_priority_rank"),
+        ("tenants", "0004_tenantusage_version"),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name="task",
+            index=models.Index(
+                fields=["tenant", "updated_at", "id"], name="task_tenant_updated_idx"
+            ),
+        ),
+    ]
@@ -0,0 +1,12 @@
+from django.db import migrations
+
+from core.partitioning import tenant_partitioning_operations
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("tasks", "0005_task_task_tenant_updated_idx"),
+    ]
+
+    operations = tenant_partitioning_operations("tasks_task")
@@ -1,5 +1,14 @@
 import uuid
 from django.db import models
+from tenants.scoping import TenantScopedManager
+
+
+class ActiveTaskManager(TenantScopedManager):
+    """Tasks of the current tenant whose project is not being purged."""
+
+    def get_queryset(self):
+        return super().get_queryset().filter(project__deleted_at__isnull=True)
+
 
 class Task(models.Model):
     STATUS_CHOICES = (
@@ -14,6 +23,9 @@ class Task(models.Model):
         ('high', 'High'),
     )
 
+    # Numeric sort key for ``priority`` (the string sorts lexicographically)
+    PRIORITY_RANKS = {'low': 1, 'medium': 2, 'high': 3}
+
     id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
     project = models.ForeignKey(
         'projects.Project',
@@ -25,6 +37,7 @@ class Task(models.Model):
     description = models.TextField(blank=True)
     status = models.CharField(max_length=20, choices=STATUS_CHOICES, default='todo')
     priority = models.CharField(max_length=20, choices=PRIORITY_CHOICES, default='medium')
+    priority_rank = models.PositiveSmallIntegerField(default=2, editable=False)
     assigned_to = models.ForeignKey(
         'accounts.User',
         null=True,
@@ -35,5 +48,29 @@ class Task(models.Model):
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
 
+    objects = ActiveTaskManager()
+    all_objects = models.Manager()
+
+    class Meta:
+        indexes = [
+            # Project task lists: filter by status, order by priority then due date
+            models.Index(
+                fields=['project', 'status', '-priority_rank', 'due_date'],
+                name='task_project_status_rank_idx'
+            ),
+            # "My tasks"
+            models.Index(fields=['tenant', 'assigned_to', 'status'], name='task_tenant_assignee_idx'),
+            models.Index(fields=['tenant', 'created_at'], name='task_tenant_created_idx'),
+            # Delta sync
+            models.Index(fields=['tenant', 'updated_at', 'id'], name='task_tenant_updated_idx'),
+        ]
+
+    def save(self, *args, **kwargs):
+        self.priority_rank = self.PRIORITY_RANKS.get(self.priority, 0)
+        update_fields = kwargs.get('update_fields')
+        if update_fields is not None and 'priority' in update_fields:
+            kwargs['update_fields'] = {*update_fields, 'priority_rank'}
+        super().save(*args, **kwargs)
+
     def __str__(self):
         return self.title
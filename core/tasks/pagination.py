@@ -0,0 +1,16 @@
+"""
+Paginators of task lists, shared by the task and project views.
+
+Cursors carry the ordering values, so every list of tasks in the same order
+(task list, board columns, tasks embedded in a project) uses the same
+ordering and cursor format.
+"""
+
+from core.pagination import CursorPaginator
+
+task_paginator = CursorPaginator(['-priority_rank', 'due_date', 'id'], default_limit=100, max_limit=500)
+task_search_paginator = CursorPaginator(
+    ['-search_rank', '-priority_rank', 'due_date', 'id'], default_limit=100, max_limit=500
+)
+# Same ordering (and cursor format) as task_paginator, smaller pages
+board_column_paginator = CursorPaginator(['-priority_rank', 'due_date', 'id'], default_limit=20, max_limit=100)
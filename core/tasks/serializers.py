@@ -1,5 +1,6 @@
 from rest_framework import serializers
 from tasks.models import Task
+from core.projections import Field, Nested, Projection
 
 class TaskCreateSerializer(serializers.ModelSerializer):
     class Meta:
@@ -27,6 +28,25 @@ class TaskListSerializer(serializers.ModelSerializer):
         return None
 
 
+# TaskListSerializer as a projection for list endpoints (core.projections)
+task_list_projection = Projection(
+    Task,
+    id=Field(),
+    title=Field(),
+    description=Field(),
+    status=Field(),
+    priority=Field(),
+    assigned_to=Nested(
+        'assigned_to',
+        id=Field('assigned_to'),
+        full_name=Field('assigned_to__full_name'),
+        email=Field('assigned_to__email'),
+    ),
+    due_date=Field(),
+    created_at=Field(),
+)
+
+
 class TaskUpdateSerializer(serializers.ModelSerializer):
     class Meta:
         model = Task
@@ -34,3 +54,31 @@ class TaskUpdateSerializer(serializers.ModelSerializer):
             'title', 'description', 'status',
             'priority', 'assigned_to', 'due_date'
         ]
+
+
+class TaskBulkCreateSerializer(TaskCreateSerializer):
+    # Assignees of a bulk request are loaded in one query by the view
+    assigned_to = serializers.UUIDField(required=False, allow_null=True)
+
+
+class TaskBulkOperationSerializer(serializers.Serializer):
+    OPERATIONS = ('create', 'status', 'assign', 'priority', 'delete')
+    # Field each operation requires besides the task id
+    REQUIRED_FIELDS = {'status': 'status', 'assign': 'assigned_to', 'priority': 'priority'}
+
+    op = serializers.ChoiceField(choices=OPERATIONS)
+    id = serializers.UUIDField(required=False)
+    status = serializers.ChoiceField(choices=Task.STATUS_CHOICES, required=False)
+    priority = serializers.ChoiceField(choices=Task.PRIORITY_CHOICES, required=False)
+    assigned_to = serializers.UUIDField(required=False, allow_null=True)
+
+    def validate(self, attrs):
+        op = attrs['op']
+        if op == 'create':
+            return attrs
+        if 'id' not in attrs:
+            raise serializers.ValidationError({'id': 'This field is required.'})
+        required = self.REQUIRED_FIELDS.get(op)
+        if required and required not in attrs:
+            raise serializers.ValidationError({required: 'This field is required.'})
+        return attrs
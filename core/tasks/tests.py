@@ -1,11 +1,27 @@
 """Tests for tasks app."""
-from django.test import TestCase
+import io
+import json
+import uuid
+from datetime import date, datetime, time, timezone as dt_timezone
+from decimal import Decimal
+from unittest import mock, skipUnless
+from zoneinfo import ZoneInfo
+from django.db import connection
+from django.http import HttpResponse
+from django.test import RequestFactory, TestCase, override_settings
+from django.utils.translation import gettext_lazy
+from rest_framework.exceptions import ParseError
+from rest_framework.renderers import JSONRenderer
 from rest_framework.test import APITestCase, APIClient
 from rest_framework import status
 from accounts.models import User
 from tenants.models import Tenant
 from projects.models import Project
 from tasks.models import Task
+from tenants.response_cache import get_response_cache
+from tasks.serializers import TaskListSerializer, task_list_projection
+from core.renderers import FastJSONParser, FastJSONRenderer
+from core.instrumentation import RequestInstrumentationMiddleware, query_shape
 
 
 class TaskModelTests(TestCase):
@@ -58,6 +74,21 @@ class TaskModelTests(TestCase):
         task.save()
         self.assertEqual(task.status, "in_progress")
 
+    def test_priority_rank_follows_priority(self):
+        """Test priority_rank is kept in step with priority on save"""
+        task = Task.objects.create(
+            title="Test Task",
+            project=self.project,
+            tenant=self.tenant,
+            priority="low"
+        )
+        self.assertEqual(task.priority_rank, 1)
+
+        task.priority = "high"
+        task.save(update_fields=['priority'])
+        task.refresh_from_db()
+        self.assertEqual(task.priority_rank, 3)
+
 
 class TaskAPITests(APITestCase):
     """Test cases for Task API endpoints"""
@@ -123,3 +154,426 @@ class TaskAPITests(APITestCase):
         )
         response = self.client.get(f'/api/tasks?project={self.project.id}')
         self.assertEqual(response.status_code, status.HTTP_200_OK)
+
+    def test_task_list_orders_by_priority(self):
+        """Test tasks are listed high, medium, low rather than alphabetically"""
+        for priority in ['medium', 'low', 'high']:
+            Task.objects.create(
+                title=f"{priority} task",
+                project=self.project,
+                tenant=self.tenant,
+                priority=priority
+            )
+        response = self.client.get(f'/api/projects/{self.project.id}/tasks')
+        priorities = [task['priority'] for task in response.data['data']['tasks']]
+        self.assertEqual(priorities, ['high', 'medium', 'low'])
+
+    def test_task_list_pages_with_null_due_dates(self):
+        """Test cursor pagination keeps tasks without due dates last"""
+        from datetime import date
+        for i, due in enumerate([date(2026, 1, 2), None, date(2026, 1, 1), None]):
+            Task.objects.create(
+                title=f"Task {i}",
+                project=self.project,
+                tenant=self.tenant,
+                due_date=due
+            )
+        titles = []
+        url = f'/api/projects/{self.project.id}/tasks'
+        response = self.client.get(url, {'limit': 1})
+        while True:
+            data = response.data['data']
+            titles.extend(task['title'] for task in data['tasks'])
+            if not data['pagination']['hasMore']:
+                break
+            response = self.client.get(url, {'limit': 1, 'cursor': data['pagination']['nextCursor']})
+        self.assertEqual(len(titles), 4)
+        self.assertEqual(titles[:2], ['Task 2', 'Task 0'])
+        self.assertEqual(sorted(titles[2:]), ['Task 1', 'Task 3'])
+
+    def test_board_columns(self):
+        """Test the board groups tasks by status with totals and cursors"""
+        for i in range(3):
+            Task.objects.create(
+                title=f"Todo {i}",
+                project=self.project,
+                tenant=self.tenant,
+                priority=['low', 'high', 'medium'][i],
+                assigned_to=self.admin
+            )
+        Task.objects.create(
+            title="Done",
+            project=self.project,
+            tenant=self.tenant,
+            status="completed"
+        )
+        url = f'/api/projects/{self.project.id}/board'
+        self.client.get(url)
+
+        # Version lookup, project, one windowed query for every column
+        with self.assertNumQueries(3):
+            response = self.client.get(url, {'limit': 2})
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        columns = {c['status']: c for c in response.data['data']['columns']}
+        self.assertEqual(list(columns), ['todo', 'in_progress', 'completed'])
+        self.assertEqual(columns['todo']['total'], 3)
+        self.assertEqual([t['title'] for t in columns['todo']['tasks']], ['Todo 1', 'Todo 2'])
+        self.assertTrue(columns['todo']['hasMore'])
+        self.assertEqual(columns['in_progress']['total'], 0)
+        self.assertEqual(columns['completed']['total'], 1)
+        self.assertFalse(columns['completed']['hasMore'])
+
+        # The column cursor continues in the task list
+        response = self.client.get(f'/api/projects/{self.project.id}/tasks', {
+            'status': 'todo', 'cursor': columns['todo']['nextCursor']
+        })
+        self.assertEqual([t['title'] for t in response.data['data']['tasks']], ['Todo 0'])
+
+    def test_search_tasks(self):
+        """Test full-text search matches word prefixes and ranks title hits first"""
+        Task.objects.create(
+            title="Fix login page",
+            project=self.project,
+            tenant=self.tenant
+        )
+        Task.objects.create(
+            title="Write docs",
+            description="Explain the login flow",
+            project=self.project,
+            tenant=self.tenant
+        )
+        Task.objects.create(
+            title="Unrelated",
+            project=self.project,
+            tenant=self.tenant
+        )
+        url = f'/api/projects/{self.project.id}/tasks'
+
+        response = self.client.get(url, {'q': 'log'})
+        titles = [task['title'] for task in response.data['data']['tasks']]
+        self.assertEqual(titles, ['Fix login page', 'Write docs'])
+
+        # Every term must match
+        response = self.client.get(url, {'q': 'login docs'})
+        titles = [task['title'] for task in response.data['data']['tasks']]
+        self.assertEqual(titles, ['Write docs'])
+
+        # Older ``search`` parameter is still accepted
+        response = self.client.get(url, {'search': 'unrel'})
+        self.assertEqual(len(response.data['data']['tasks']), 1)
+
+    def test_search_index_follows_writes(self):
+        """Test the search index is kept in sync on update and delete"""
+        task = Task.objects.create(
+            title="Alpha",
+            project=self.project,
+            tenant=self.tenant
+        )
+        url = f'/api/projects/{self.project.id}/tasks'
+        task.title = "Bravo"
+        task.save()
+        self.assertEqual(len(self.client.get(url, {'q': 'alpha'}).data['data']['tasks']), 0)
+        self.assertEqual(len(self.client.get(url, {'q': 'bravo'}).data['data']['tasks']), 1)
+
+        Task.objects.filter(id=task.id).update(title="Charlie")
+        self.assertEqual(len(self.client.get(url, {'q': 'charlie'}).data['data']['tasks']), 1)
+
+        task.delete()
+        # ORM writes do not bump the tenant version the response cache is keyed on
+        get_response_cache().clear()
+        self.assertEqual(len(self.client.get(url, {'q': 'charlie'}).data['data']['tasks']), 0)
+
+    def test_search_results_page_with_cursor(self):
+        """Test ranked search results can be paged with cursors"""
+        for i in range(5):
+            Task.objects.create(
+                title=f"Report {i}",
+                project=self.project,
+                tenant=self.tenant
+            )
+        url = f'/api/projects/{self.project.id}/tasks'
+        titles = []
+        response = self.client.get(url, {'q': 'report', 'limit': 2})
+        while True:
+            data = response.data['data']
+            titles.extend(task['title'] for task in data['tasks'])
+            if not data['pagination']['hasMore']:
+                break
+            response = self.client.get(url, {
+                'q': 'report', 'limit': 2, 'cursor': data['pagination']['nextCursor']
+            })
+        self.assertEqual(sorted(titles), [f"Report {i}" for i in range(5)])
+
+    @skipUnless(connection.vendor == 'postgresql', 'ts_rank ranking needs PostgreSQL')
+    def test_search_results_with_tied_ranks_page_with_cursor(self):
+        """Test paging search results of equal rank neither repeats nor loops"""
+        for i in range(7):
+            Task.objects.create(
+                title="Weekly report",
+                description=f"Week {i}",
+                project=self.project,
+                tenant=self.tenant
+            )
+        url = f'/api/projects/{self.project.id}/tasks'
+        ids = []
+        params = {'q': 'report', 'limit': 2}
+        for _ in range(10):
+            data = self.client.get(url, params).data['data']
+            ids.extend(task['id'] for task in data['tasks'])
+            if not data['pagination']['hasMore']:
+                break
+            params['cursor'] = data['pagination']['nextCursor']
+        else:
+            self.fail('Paging did not terminate')
+        self.assertEqual(len(ids), 7)
+        self.assertEqual(len(set(ids)), 7)
+
+
+class TaskBulkAPITests(APITestCase):
+    """Test cases for the bulk task endpoint"""
+
+    def setUp(self):
+        self.client = APIClient()
+        self.tenant = Tenant.objects.create(
+            name="Demo Company",
+            subdomain="demo",
+            status="active"
+        )
+        self.admin = User.objects.create_user(
+            email="admin@demo.com",
+            password="Admin@123",
+            full_name="Admin User",
+            tenant=self.tenant,
+            role="tenant_admin"
+        )
+        self.member = User.objects.create_user(
+            email="user@demo.com",
+            password="User@123",
+            full_name="Demo User",
+            tenant=self.tenant,
+            role="user"
+        )
+        self.project = Project.objects.create(
+            name="Test Project",
+            tenant=self.tenant,
+            created_by=self.admin
+        )
+        self.url = f'/api/projects/{self.project.id}/tasks/bulk'
+        self.login('admin@demo.com', 'Admin@123')
+
+    def login(self, email, password):
+        response = self.client.post('/api/auth/login', {
+            'email': email,
+            'password': password,
+            'tenantSubdomain': 'demo'
+        }, format='json')
+        self.client.credentials(HTTP_AUTHORIZATION=f"Bearer {response.data['data']['token']}")
+
+    def make_tasks(self, count, **fields):
+        return [
+            Task.objects.create(
+                title=f"Task {i}",
+                project=self.project,
+                tenant=self.tenant,
+                **fields
+            )
+            for i in range(count)
+        ]
+
+    def test_mixed_operations(self):
+        """Test create, status, assign, priority and delete in one request"""
+        from tenants.usage import compute_usage, get_usage
+        first, second, third = self.make_tasks(3)
+        response = self.client.post(self.url, {'operations': [
+            {'op': 'create', 'title': 'New task', 'priority': 'high'},
+            {'op': 'status', 'id': str(first.id), 'status': 'completed'},
+            {'op': 'assign', 'id': str(first.id), 'assigned_to': str(self.member.id)},
+            {'op': 'priority', 'id': str(second.id), 'priority': 'low'},
+            {'op': 'delete', 'id': str(third.id)},
+        ]}, format='json')
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        data = response.data['data']
+        self.assertEqual((data['created'], data['updated'], data['deleted']), (1, 2, 1))
+        self.assertEqual(
+            [item['result'] for item in data['results']],
+            ['created', 'updated', 'updated', 'updated', 'deleted']
+        )
+
+        created = Task.objects.get(title='New task')
+        self.assertEqual(created.priority_rank, 3)
+        first.refresh_from_db()
+        self.assertEqual((first.status, first.assigned_to_id), ('completed', self.member.id))
+        second.refresh_from_db()
+        self.assertEqual((second.priority, second.priority_rank), ('low', 1))
+        self.assertFalse(Task.objects.filter(id=third.id).exists())
+
+        usage = get_usage(self.tenant)
+        expected = compute_usage([self.tenant.id])[self.tenant.id]
+        self.assertEqual((usage.tasks, usage.open_tasks), (expected['tasks'], expected['open_tasks']))
+
+    def test_invalid_item_rejects_whole_request(self):
+        """Test nothing is written when any item fails validation"""
+        task, = self.make_tasks(1)
+        response = self.client.post(self.url, {'operations': [
+            {'op': 'status', 'id': str(task.id), 'status': 'completed'},
+            {'op': 'priority', 'id': str(task.id), 'priority': 'urgent'},
+            {'op': 'delete', 'id': '00000000-0000-0000-0000-000000000000'},
+        ]}, format='json')
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertEqual([item['index'] for item in response.data['errors']], [1, 2])
+        task.refresh_from_db()
+        self.assertEqual(task.status, 'todo')
+
+    def test_member_permissions(self):
+        """Test members may only change the status of their own tasks"""
+        own, = self.make_tasks(1, assigned_to=self.member)
+        other, = self.make_tasks(1)
+        self.login('user@demo.com', 'User@123')
+
+        response = self.client.post(self.url, {'operations': [
+            {'op': 'status', 'id': str(own.id), 'status': 'in_progress'},
+        ]}, format='json')
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+
+        response = self.client.post(self.url, {'operations': [
+            {'op': 'status', 'id': str(other.id), 'status': 'in_progress'},
+            {'op': 'delete', 'id': str(own.id)},
+        ]}, format='json')
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertEqual(len(response.data['errors']), 2)
+
+    def test_bulk_reassignment_query_count(self):
+        """Test reassigning 200 tasks takes a handful of queries"""
+        from django.db import connection
+        from django.test.utils import CaptureQueriesContext
+        tasks = self.make_tasks(200)
+        operations = [
+            {'op': 'assign', 'id': str(task.id), 'assigned_to': str(self.member.id)}
+            for task in tasks
+        ]
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.post(self.url, {'operations': operations}, format='json')
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertLessEqual(len(queries), 10)
+        self.assertEqual(Task.objects.filter(assigned_to=self.member).count(), 200)
+
+
+class JSONRendererTests(TestCase):
+    """Test cases for the orjson renderer and parser (core.renderers)"""
+
+    def payload(self):
+        tenant = Tenant(name="Demo Company", subdomain="demo")
+        user = User(email="user@demo.com", full_name="Demo User\u2028", tenant=tenant)
+        task = Task(
+            tenant=tenant, title="Design", assigned_to=user,
+            due_date=date(2024, 1, 15), created_at=datetime(2024, 1, 10, 9, 30, tzinfo=dt_timezone.utc)
+        )
+        return {
+            "success": True,
+            "data": {"tasks": TaskListSerializer([task], many=True).data, "budget": Decimal("1.50")},
+            "message": gettext_lazy("Task list"),
+        }
+
+    def test_renders_same_values_as_drf(self):
+        """Test UUIDs, dates, Decimal and lazy strings render like JSONRenderer"""
+        data = self.payload()
+        fast = FastJSONRenderer().render(data)
+        self.assertEqual(json.loads(fast), json.loads(JSONRenderer().render(data)))
+        self.assertIn(b'\\u2028', fast)
+
+    def test_renders_same_bytes_as_drf(self):
+        """Test datetimes, times, UUIDs and non-finite numbers render byte for byte like JSONRenderer"""
+        data = {
+            "utc": datetime(2024, 1, 10, 9, 30, 0, 123456, tzinfo=dt_timezone.utc),
+            "offset": datetime(2024, 7, 10, 9, 30, 0, 500, tzinfo=ZoneInfo("Europe/Berlin")),
+            "naive": datetime(2024, 1, 10, 9, 30),
+            "date": date(2024, 1, 15),
+            "time": time(9, 30, 0, 123),
+            "id": uuid.UUID(int=1),
+            "nested": [{"count": 2, "ratio": 0.5, "missing": None}],
+        }
+        self.assertEqual(FastJSONRenderer().render(data), JSONRenderer().render(data))
+
+        # Aware times and NaN are rejected as by JSONRenderer
+        for value in (time(9, 30, tzinfo=dt_timezone.utc), float("nan"), Decimal("Infinity")):
+            with self.assertRaises(ValueError):
+                JSONRenderer().render({"value": value, "none": None})
+            with self.assertRaises(ValueError):
+                FastJSONRenderer().render({"value": value, "none": None})
+
+    def test_stdlib_fallback_without_orjson(self):
+        """Test the classes behave like DRF's when orjson is missing"""
+        data = self.payload()
+        with mock.patch('core.renderers.orjson', None):
+            self.assertEqual(FastJSONRenderer().render(data), JSONRenderer().render(data))
+            self.assertEqual(FastJSONParser().parse(io.BytesIO(b'{"a": [1]}')), {'a': [1]})
+
+    def test_parser_rejects_invalid_json(self):
+        """Test malformed bodies are a ParseError"""
+        self.assertEqual(FastJSONParser().parse(io.BytesIO('{"title": "Café"}'.encode())), {'title': 'Café'})
+        with self.assertRaises(ParseError):
+            FastJSONParser().parse(io.BytesIO(b'{"title": '))
+
+
+class TaskListProjectionTests(TestCase):
+    """Test cases for the projection used by task list endpoints"""
+
+    def test_projection_matches_serializer(self):
+        """Test the values() projection renders exactly like TaskListSerializer"""
+        tenant = Tenant.objects.create(name="Demo Company", subdomain="demo")
+        user = User.objects.create_user(
+            email="user@demo.com", password="User@1234", full_name="Demo User", tenant=tenant
+        )
+        project = Project.objects.create(name="Website", tenant=tenant, created_by=user)
+        Task.objects.create(project=project, tenant=tenant, title="Assigned", assigned_to=user, due_date=date(2024, 1, 15))
+        Task.objects.create(project=project, tenant=tenant, title="Unassigned", description="")
+
+        tasks = Task.objects.filter(project=project).order_by('title')
+        with self.assertNumQueries(1):
+            projected = task_list_projection.project(task_list_projection.values(tasks))
+        self.assertEqual(projected, TaskListSerializer(tasks, many=True).data)
+        self.assertIsNone(projected[1]['assigned_to'])
+
+
+class RequestInstrumentationTests(APITestCase):
+    """Test cases for the query/timing middleware (core.instrumentation)"""
+
+    def setUp(self):
+        self.client = APIClient()
+        self.tenant = Tenant.objects.create(name="Demo Company", subdomain="demo")
+        self.admin = User.objects.create_user(
+            email="admin@demo.com", password="Admin@123", full_name="Admin User",
+            tenant=self.tenant, role="tenant_admin"
+        )
+        self.project = Project.objects.create(name="Website", tenant=self.tenant, created_by=self.admin)
+        self.client.force_authenticate(user=self.admin)
+
+    def test_server_timing_on_sampled_requests(self):
+        """Test sampled responses report queries, app, render and total time"""
+        url = f'/api/projects/{self.project.id}/tasks'
+        self.assertNotIn('Server-Timing', self.client.get(url))
+        with override_settings(REQUEST_INSTRUMENTATION={'SAMPLE_RATE': 1.0, 'SERVER_TIMING': True}):
+            header = self.client.get(url)['Server-Timing']
+        self.assertRegex(header, r'^db;dur=[\d.]+;desc="\d+ queries", app;dur=[\d.]+, render;dur=[\d.]+, total;dur=[\d.]+$')
+
+    def test_repeated_query_shapes_are_logged(self):
+        """Test identical query shapes above the threshold are flagged as N+1"""
+        def view(request):
+            for i in range(3):
+                list(User.objects.filter(email=f'user{i}@demo.com'))
+            list(User.objects.filter(id__in=[self.admin.id, self.admin.id]))
+            return HttpResponse()
+
+        middleware = RequestInstrumentationMiddleware(view)
+        with override_settings(REQUEST_INSTRUMENTATION={'SAMPLE_RATE': 1.0, 'N_PLUS_ONE_THRESHOLD': 3}):
+            with self.assertLogs('core.instrumentation', 'WARNING') as logs:
+                response = middleware(RequestFactory().get('/api/users'))
+        # Logged server-side only: the header is off unless SERVER_TIMING is set
+        self.assertNotIn('Server-Timing', response)
+        [record] = [json.loads(line.split(':', 2)[2]) for line in logs.output]
+        self.assertEqual((record['event'], record['count'], record['path']), ('suspected_n_plus_one', 3, '/api/users'))
+
+    def test_query_shape_collapses_lists(self):
+        """Test IN and VALUES lists of any length have one shape"""
+        self.assertEqual(query_shape('SELECT 1 WHERE id IN (%s, %s, %s)'), 'SELECT 1 WHERE id IN (%s, ...)')
+        self.assertEqual(query_shape('INSERT INTO t VALUES (%s, %s), (%s, %s)'), 'INSERT INTO t VALUES (%s, %s), ...')
@@ -1,8 +1,10 @@
 from django.urls import path
-from tasks.views import my_tasks, project_tasks, update_task_status, update_task, delete_task
+from tasks.views import bulk_tasks, my_tasks, project_board, project_tasks, update_task_status, update_task, delete_task
 
 urlpatterns = [
     path('projects/<uuid:project_id>/tasks', project_tasks),
+    path('projects/<uuid:project_id>/tasks/bulk', bulk_tasks),
+    path('projects/<uuid:project_id>/board', project_board),
     path('tasks/<uuid:task_id>/status', update_task_status),
     path('tasks/<uuid:task_id>', update_task),
     path('tasks/<uuid:task_id>/delete', delete_task),
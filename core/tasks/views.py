@@ -2,26 +2,49 @@ from rest_framework.decorators import api_view, permission_classes
 from rest_framework.permissions import IsAuthenticated
 from rest_framework.response import Response
 from django.shortcuts import get_object_or_404
-from django.db.models import Q
+from django.db import transaction
+from django.db.models import Count, F, Window
+from django.db.models.functions import RowNumber
+from django.utils import timezone
 
 from tasks.models import Task
 from tasks.serializers import (
+    TaskBulkCreateSerializer,
+    TaskBulkOperationSerializer,
     TaskCreateSerializer,
     TaskListSerializer,
-    TaskUpdateSerializer
+    TaskUpdateSerializer,
+    task_list_projection
 )
+from tasks.pagination import board_column_paginator, task_paginator, task_search_paginator
+from projects.counters import adjust_task_counts
 from projects.models import Project
 from accounts.models import User
+from tenants.usage import adjust_usage
+from tenants.versions import bump_version, conditional_get, project_version, tenant_version
+from tenants.response_cache import cached_response
+from sync.utils import record_deletions
+from realtime.events import publish_event
+from core.search import apply_search, search_query
+
+BULK_TASKS_MAX = 500
+
+
+def _open_delta(old_status, new_status):
+    """Change in the tenant's open task count caused by a status change."""
+    return int(old_status == 'completed') - int(new_status == 'completed')
 
 # API 16 + 17
 @api_view(['POST', 'GET'])
 @permission_classes([IsAuthenticated])
+@conditional_get(project_version)
+@cached_response(project_version)
 def project_tasks(request, project_id):
     project = get_object_or_404(Project, id=project_id)
     is_super_admin = request.user.role == 'super_admin'
 
     # Tenant isolation (super admin can access all)
-    if not is_super_admin and project.tenant != request.user.tenant:
+    if not is_super_admin and project.tenant_id != request.user.tenant_id:
         return Response({"message": "Forbidden"}, status=403)
 
     # ---------- CREATE TASK ----------
@@ -30,30 +53,38 @@ def project_tasks(request, project_id):
         serializer.is_valid(raise_exception=True)
 
         assigned_user = serializer.validated_data.get('assigned_to')
-        if assigned_user and assigned_user.tenant != request.user.tenant:
+        if assigned_user and assigned_user.tenant_id != request.user.tenant_id:
             return Response(
                 {"message": "Assigned user must belong to same tenant"},
                 status=400
             )
 
-        task = serializer.save(
-            project=project,
-            tenant=project.tenant
-        )
+        with transaction.atomic():
+            task = serializer.save(
+                project=project,
+                tenant_id=project.tenant_id
+            )
+            deltas = {'tasks': 1, 'open_tasks': _open_delta('completed', task.status)}
+            adjust_usage(project.tenant_id, **deltas)
+            adjust_task_counts(project.id, **deltas)
+            bump_version(project.tenant_id, project.id)
+            data = TaskListSerializer(task).data
+            publish_event(project.tenant_id, 'task.created', {**data, 'projectId': project.id})
 
         return Response({
             "success": True,
-            "data": TaskListSerializer(task).data
+            "data": data
         }, status=201)
 
     # ---------- LIST TASKS ----------
-    tasks = Task.objects.filter(project=project)
+    # tenant_id lets PostgreSQL prune to the tenant's partition
+    tasks = Task.objects.filter(tenant_id=project.tenant_id, project=project)
 
     # Filters
     status = request.GET.get('status')
     assigned_to = request.GET.get('assignedTo')
     priority = request.GET.get('priority')
-    search = request.GET.get('search')
+    search = search_query(request)
 
     if status:
         tasks = tasks.filter(status=status)
@@ -61,17 +92,84 @@ def project_tasks(request, project_id):
         tasks = tasks.filter(assigned_to_id=assigned_to)
     if priority:
         tasks = tasks.filter(priority=priority)
+
+    paginator = task_paginator
     if search:
-        tasks = tasks.filter(title__icontains=search)
+        tasks = apply_search(tasks, search)
+        paginator = task_search_paginator
 
-    tasks = tasks.order_by('-priority', 'due_date')
+    page = paginator.paginate(request, task_list_projection.values(tasks, *paginator.fields))
+
+    return Response({
+        "success": True,
+        "data": {
+            "tasks": task_list_projection.project(page.items),
+            "total": page.total,
+            "pagination": page.metadata()
+        }
+    })
+
+
+@api_view(['GET'])
+@permission_classes([IsAuthenticated])
+@conditional_get(project_version)
+def project_board(request, project_id):
+    """
+    Kanban board: the first ``limit`` tasks of every status column plus
+    per-column totals.
+
+    The columns are read in a single query: ROW_NUMBER() and COUNT() windows
+    partitioned by status select the head of each column and its size.
+    ``nextCursor`` of a column continues it through
+    ``GET /api/projects/<id>/tasks?status=<status>&cursor=...``.
+    """
+    project = get_object_or_404(Project, id=project_id)
+    is_super_admin = request.user.role == 'super_admin'
+
+    # Tenant isolation (super admin can access all)
+    if not is_super_admin and project.tenant_id != request.user.tenant_id:
+        return Response({"message": "Forbidden"}, status=403)
+
+    limit = board_column_paginator.get_limit(request)
+    column = [F('status')]
+    tasks = (
+        Task.objects.filter(tenant_id=project.tenant_id, project=project)
+        .annotate(
+            column_position=Window(
+                RowNumber(),
+                partition_by=column,
+                order_by=board_column_paginator.ordering(Task)
+            ),
+            column_total=Window(Count('id'), partition_by=column)
+        )
+        .filter(column_position__lte=limit)
+        .order_by('status', 'column_position')
+    )
+    tasks = task_list_projection.values(tasks, 'status', 'column_total', *board_column_paginator.fields)
+
+    columns = {
+        status: {"status": status, "total": 0, "tasks": []}
+        for status, _ in Task.STATUS_CHOICES
+    }
+    for task in tasks:
+        entry = columns[task['status']]
+        entry["total"] = task['column_total']
+        entry["tasks"].append(task)
+
+    for entry in columns.values():
+        has_more = entry["total"] > len(entry["tasks"])
+        entry["hasMore"] = has_more
+        entry["nextCursor"] = (
+            board_column_paginator.encode_cursor(entry["tasks"][-1]) if has_more else None
+        )
+        entry["tasks"] = task_list_projection.project(entry["tasks"])
 
-    serializer = TaskListSerializer(tasks, many=True)
     return Response({
         "success": True,
         "data": {
-            "tasks": serializer.data,
-            "total": tasks.count()
+            "project": {"id": project.id, "name": project.name},
+            "limit": limit,
+            "columns": list(columns.values())
         }
     })
 
@@ -84,12 +182,12 @@ def update_task_status(request, task_id):
     is_super_admin = request.user.role == 'super_admin'
 
     # Tenant isolation (super admin can access all)
-    if not is_super_admin and task.tenant != request.user.tenant:
+    if not is_super_admin and task.tenant_id != request.user.tenant_id:
         return Response({"message": "Forbidden"}, status=403)
 
     # Permission: Only assigned user or admin can update status
     is_admin = request.user.role == 'tenant_admin'
-    is_assignee = task.assigned_to == request.user
+    is_assignee = task.assigned_to_id == request.user.id
     
     if not is_admin and not is_assignee:
         return Response(
@@ -101,8 +199,19 @@ def update_task_status(request, task_id):
     if status_value not in ['todo', 'in_progress', 'completed']:
         return Response({"message": "Invalid status"}, status=400)
 
+    previous_status = task.status
     task.status = status_value
-    task.save()
+    with transaction.atomic():
+        task.save()
+        open_delta = _open_delta(previous_status, task.status)
+        adjust_usage(task.tenant_id, open_tasks=open_delta)
+        adjust_task_counts(task.project_id, open_tasks=open_delta)
+        bump_version(task.tenant_id, task.project_id)
+        publish_event(task.tenant_id, 'task.status', {
+            'id': task.id,
+            'projectId': task.project_id,
+            'status': task.status
+        })
 
     return Response({
         "success": True,
@@ -122,7 +231,7 @@ def update_task(request, task_id):
     is_super_admin = request.user.role == 'super_admin'
 
     # Tenant isolation (super admin can access all)
-    if not is_super_admin and task.tenant != request.user.tenant:
+    if not is_super_admin and task.tenant_id != request.user.tenant_id:
         return Response({"message": "Forbidden"}, status=403)
 
     # Permission: Only admin can fully edit tasks (title, description, assignee, etc.)
@@ -137,13 +246,23 @@ def update_task(request, task_id):
     serializer.is_valid(raise_exception=True)
 
     assigned_user = serializer.validated_data.get('assigned_to')
-    if assigned_user and assigned_user.tenant != request.user.tenant:
+    if assigned_user and assigned_user.tenant_id != request.user.tenant_id:
         return Response(
             {"message": "Assigned user must belong to same tenant"},
             status=400
         )
 
-    serializer.save()
+    previous_status = task.status
+    with transaction.atomic():
+        serializer.save()
+        open_delta = _open_delta(previous_status, task.status)
+        adjust_usage(task.tenant_id, open_tasks=open_delta)
+        adjust_task_counts(task.project_id, open_tasks=open_delta)
+        bump_version(task.tenant_id, task.project_id)
+        publish_event(task.tenant_id, 'task.updated', {
+            **TaskListSerializer(task).data,
+            'projectId': task.project_id
+        })
 
     return Response({
         "success": True,
@@ -160,7 +279,7 @@ def delete_task(request, task_id):
     is_super_admin = request.user.role == 'super_admin'
 
     # Tenant isolation (super admin can access all)
-    if not is_super_admin and task.tenant != request.user.tenant:
+    if not is_super_admin and task.tenant_id != request.user.tenant_id:
         return Response({"message": "Forbidden"}, status=403)
 
     # Permission: Only admin can delete tasks
@@ -171,7 +290,14 @@ def delete_task(request, task_id):
         )
 
     task_id_str = str(task.id)
-    task.delete()
+    with transaction.atomic():
+        record_deletions(task.tenant_id, 'task', [task.id])
+        task.delete()
+        deltas = {'tasks': -1, 'open_tasks': _open_delta(task.status, 'completed')}
+        adjust_usage(task.tenant_id, **deltas)
+        adjust_task_counts(task.project_id, **deltas)
+        bump_version(task.tenant_id, task.project_id)
+        publish_event(task.tenant_id, 'task.deleted', {'id': task_id, 'projectId': task.project_id})
 
     return Response({
         "success": True,
@@ -181,6 +307,7 @@ def delete_task(request, task_id):
 
 @api_view(['GET'])
 @permission_classes([IsAuthenticated])
+@conditional_get(tenant_version)
 def my_tasks(request):
     user = request.user
     is_super_admin = user.role == 'super_admin'
@@ -198,9 +325,196 @@ def my_tasks(request):
     if status:
         qs = qs.filter(status=status)
 
-    qs = qs.order_by('-priority', 'due_date')
+    paginator = task_paginator
+    search = search_query(request)
+    if search:
+        qs = apply_search(qs, search)
+        paginator = task_search_paginator
+
+    page = paginator.paginate(request, task_list_projection.values(qs, *paginator.fields))
 
     return Response({
         "success": True,
-        "data": TaskListSerializer(qs, many=True).data
+        "data": task_list_projection.project(page.items),
+        "pagination": page.metadata()
+    })
+
+
+# Bulk task operations
+@api_view(['POST'])
+@permission_classes([IsAuthenticated])
+def bulk_tasks(request, project_id):
+    """
+    Apply many task operations to a project in one transaction.
+
+    Body: ``{"operations": [...]}`` where each item is one of
+    ``{"op": "create", <task fields>}``, ``{"op": "status", "id", "status"}``,
+    ``{"op": "assign", "id", "assigned_to"}``, ``{"op": "priority", "id", "priority"}``
+    or ``{"op": "delete", "id"}``. Permissions match the single-task
+    endpoints. Every item is validated before anything is written; if any
+    item fails, nothing is changed and the errors are returned per item.
+    """
+    project = get_object_or_404(Project, id=project_id)
+    user = request.user
+    is_super_admin = user.role == 'super_admin'
+
+    # Tenant isolation (super admin can access all)
+    if not is_super_admin and project.tenant_id != user.tenant_id:
+        return Response({"message": "Forbidden"}, status=403)
+    is_admin = user.role == 'tenant_admin'
+
+    items = request.data.get('operations')
+    if not isinstance(items, list) or not items:
+        return Response({"message": "operations must be a non-empty list"}, status=400)
+    if len(items) > BULK_TASKS_MAX:
+        return Response(
+            {"message": f"At most {BULK_TASKS_MAX} operations per request"},
+            status=400
+        )
+
+    # Validate the shape of every item (no queries)
+    operations, errors = [], {}
+    for index, item in enumerate(items):
+        serializer = TaskBulkOperationSerializer(data=item)
+        if not serializer.is_valid():
+            errors[index] = serializer.errors
+            operations.append(None)
+            continue
+        operation = dict(serializer.validated_data)
+        if operation['op'] == 'create':
+            create = TaskBulkCreateSerializer(data=item)
+            if not create.is_valid():
+                errors[index] = create.errors
+                operations.append(None)
+                continue
+            operation['fields'] = dict(create.validated_data)
+            operation['assigned_to'] = operation['fields'].pop('assigned_to', None)
+        operations.append(operation)
+
+    valid = [operation for operation in operations if operation]
+    task_ids = {operation['id'] for operation in valid if operation['op'] != 'create'}
+    assignee_ids = {operation['assigned_to'] for operation in valid if operation.get('assigned_to')}
+    deleted_ids = {operation['id'] for operation in valid if operation['op'] == 'delete'}
+
+    with transaction.atomic():
+        # One query for the referenced tasks, one for the assignees
+        tasks = (
+            Task.objects.select_for_update(of=('self',))
+            .select_related('assigned_to')
+            .filter(tenant_id=project.tenant_id, project=project)
+            .in_bulk(task_ids)
+        ) if task_ids else {}
+        assignees = User.objects.filter(
+            tenant_id=project.tenant_id
+        ).in_bulk(assignee_ids) if assignee_ids else {}
+
+        for index, operation in enumerate(operations):
+            if operation is None:
+                continue
+            op = operation['op']
+            if operation.get('assigned_to') and operation['assigned_to'] not in assignees:
+                errors[index] = {"assigned_to": ["Assigned user must belong to same tenant"]}
+            elif op == 'create':
+                continue
+            elif operation['id'] not in tasks:
+                errors[index] = {"id": ["Task not found in this project"]}
+            elif op != 'delete' and operation['id'] in deleted_ids:
+                errors[index] = {"id": ["Task is also deleted in this request"]}
+            elif op == 'status':
+                if not is_admin and tasks[operation['id']].assigned_to_id != user.id:
+                    errors[index] = {"message": "Only the assigned user or admin can update this task"}
+            elif not is_admin:
+                errors[index] = {"message": (
+                    "Only admin can delete tasks" if op == 'delete'
+                    else "Only admin can edit task details"
+                )}
+
+        if errors:
+            return Response({
+                "message": "Bulk operation rejected",
+                "errors": [
+                    {"index": index, "errors": errors[index]} for index in sorted(errors)
+                ]
+            }, status=400)
+
+        now = timezone.now()
+        created, updated, deleted = [], {}, {}
+        update_fields = {'updated_at'}
+        open_delta = 0
+        results = []
+        for index, operation in enumerate(operations):
+            op = operation['op']
+            if op == 'create':
+                task = Task(
+                    project=project,
+                    tenant_id=project.tenant_id,
+                    assigned_to=assignees.get(operation['assigned_to']),
+                    **operation['fields']
+                )
+                task.priority_rank = Task.PRIORITY_RANKS.get(task.priority, 0)
+                created.append(task)
+                open_delta += _open_delta('completed', task.status)
+                results.append((index, op, task, 'created'))
+                continue
+
+            task = tasks[operation['id']]
+            if op == 'delete':
+                if task.id not in deleted:
+                    deleted[task.id] = task
+                    open_delta += _open_delta(task.status, 'completed')
+                results.append((index, op, task, 'deleted'))
+                continue
+
+            if op == 'status':
+                open_delta += _open_delta(task.status, operation['status'])
+                task.status = operation['status']
+                update_fields.add('status')
+            elif op == 'assign':
+                task.assigned_to = assignees.get(operation['assigned_to'])
+                update_fields.add('assigned_to')
+            elif op == 'priority':
+                task.priority = operation['priority']
+                task.priority_rank = Task.PRIORITY_RANKS.get(task.priority, 0)
+                update_fields.update(('priority', 'priority_rank'))
+            # bulk_update() bypasses auto_now
+            task.updated_at = now
+            updated[task.id] = task
+            results.append((index, op, task, 'updated'))
+
+        if created:
+            Task.objects.bulk_create(created)
+        if updated:
+            Task.objects.bulk_update(list(updated.values()), sorted(update_fields))
+        if deleted:
+            record_deletions(project.tenant_id, 'task', list(deleted))
+            Task.objects.filter(tenant_id=project.tenant_id, id__in=list(deleted)).delete()
+        if created or deleted or open_delta:
+            deltas = {'tasks': len(created) - len(deleted), 'open_tasks': open_delta}
+            adjust_usage(project.tenant_id, **deltas)
+            adjust_task_counts(project.id, **deltas)
+        bump_version(project.tenant_id, project.id)
+        publish_event(project.tenant_id, 'tasks.bulk', {
+            'projectId': project.id,
+            'created': [task.id for task in created],
+            'updated': list(updated),
+            'deleted': list(deleted)
+        })
+
+    return Response({
+        "success": True,
+        "data": {
+            "created": len(created),
+            "updated": len(updated),
+            "deleted": len(deleted),
+            "results": [
+                {
+                    "index": index,
+                    "op": op,
+                    "id": task.id,
+                    "result": result,
+                    "task": None if result == 'deleted' else TaskListSerializer(task).data
+                }
+                for index, op, task, result in results
+            ]
+        }
     })
@@ -0,0 +1,15 @@
+"""
+Initializer of the processes hashing imported passwords (see tenants.importer).
+
+It lives apart from the importer because spawned workers import the module
+of their initializer before Django is set up, and the importer imports
+models.
+"""
+
+
+def init_worker():
+    import django
+    from django.apps import apps
+
+    if not apps.ready:
+        django.setup()
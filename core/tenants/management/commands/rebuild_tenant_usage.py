@@ -0,0 +1,69 @@
+"""
+Django management command to rebuild or verify the per-tenant usage counters.
+
+Counters are maintained incrementally by the API write paths; this command
+recomputes them from the users, projects and tasks tables. With --verify it
+only reports drift and exits with an error if any counter is wrong.
+"""
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+from tenants.models import Tenant, TenantUsage
+from tenants.usage import COUNTER_FIELDS, compute_usage, rebuild_usage
+
+
+class Command(BaseCommand):
+    help = 'Rebuild (or verify) denormalized tenant usage counters'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--tenant',
+            action='append',
+            dest='tenants',
+            help='Only process this tenant id (may be repeated)',
+        )
+        parser.add_argument(
+            '--verify',
+            action='store_true',
+            help='Report counters that differ from the source tables without changing them',
+        )
+
+    def handle(self, *args, **options):
+        tenant_ids = options['tenants']
+        if tenant_ids:
+            tenant_ids = list(Tenant.objects.filter(id__in=tenant_ids).values_list('id', flat=True))
+
+        with transaction.atomic():
+            expected = compute_usage(tenant_ids)
+            stored = {
+                usage.tenant_id: usage
+                for usage in TenantUsage.objects.filter(tenant_id__in=expected.keys())
+            }
+
+            drifted = 0
+            for tenant_id, counters in expected.items():
+                usage = stored.get(tenant_id)
+                if usage is None:
+                    drifted += 1
+                    self.stdout.write(f'  {tenant_id}: missing usage row')
+                    continue
+                diffs = [
+                    f'{field} {getattr(usage, field)} -> {counters[field]}'
+                    for field in COUNTER_FIELDS
+                    if getattr(usage, field) != counters[field]
+                ]
+                if diffs:
+                    drifted += 1
+                    self.stdout.write(f'  {tenant_id}: ' + ', '.join(diffs))
+
+            if options['verify']:
+                if drifted:
+                    raise CommandError(f'{drifted} of {len(expected)} tenants have drifted counters')
+                self.stdout.write(self.style.SUCCESS(f'✓ {len(expected)} tenants verified'))
+                return
+
+            rebuild_usage(list(expected.keys()))
+
+        self.stdout.write(self.style.SUCCESS(
+            f'✓ Rebuilt usage for {len(expected)} tenants ({drifted} corrected)'
+        ))
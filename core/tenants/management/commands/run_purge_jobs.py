@@ -0,0 +1,66 @@
+"""
+Django management command to run pending tenant and project purge jobs.
+
+Jobs normally run in a background thread of the process that created them.
+This command finishes jobs whose process died (they resume at the stage
+and batch where they stopped) and can retry failed ones. Run it once from
+cron or after a deploy, or keep it running with ``--interval`` (the
+``purge-worker`` service of docker-compose.yml does).
+"""
+
+import logging
+import time
+
+from django.core.management.base import BaseCommand
+from django.db import close_old_connections
+from tenants.models import PurgeJob
+from tenants.purge import run_pending_jobs
+
+logger = logging.getLogger(__name__)
+
+
+class Command(BaseCommand):
+    help = 'Run pending (and abandoned) tenant and project purge jobs'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, help='Rows deleted per transaction')
+        parser.add_argument(
+            '--retry-failed',
+            action='store_true',
+            help='Queue failed jobs again before running',
+        )
+        parser.add_argument(
+            '--interval',
+            type=int,
+            help='Keep running, looking for jobs every INTERVAL seconds',
+        )
+
+    def handle(self, *args, **options):
+        if options['retry_failed']:
+            retried = PurgeJob.objects.filter(status='failed').update(status='pending')
+            self.stdout.write(f'  {retried} failed jobs queued again')
+
+        if not options['interval']:
+            self.run_jobs(options['batch_size'])
+            return
+        while True:
+            close_old_connections()
+            try:
+                self.run_jobs(options['batch_size'])
+            except Exception:
+                # e.g. the database restarting: try again next round
+                logger.exception('Running purge jobs failed')
+            time.sleep(options['interval'])
+
+    def run_jobs(self, batch_size):
+        def on_progress(job, stage, count):
+            if count:
+                self.stdout.write(f'  {job.target_type} {job.target_id}: {stage} {job.deleted[stage]}')
+
+        jobs = run_pending_jobs(batch_size, on_progress)
+        failed = [job for job in jobs if job.status == 'failed']
+        for job in failed:
+            self.stderr.write(f'  {job.target_type} {job.target_id} failed at {job.stage}: {job.error}')
+        self.stdout.write(self.style.SUCCESS(
+            f'✓ Ran {len(jobs)} purge jobs ({len(failed)} failed)'
+        ))
@@ -0,0 +1,101 @@
+"""
+Django management command to verify the hash partitioning of tasks and
+audit logs by tenant (see core.partitioning).
+
+For each table it checks that every hash partition set is complete (all
+remainders of the modulus exist, the modulus matches TENANT_HASH_PARTITIONS)
+and that a tenant-scoped query is pruned to one partition per set, then
+prints the partition sizes. --convert partitions tables that are not yet
+partitioned, e.g. after enabling the setting on a migrated database.
+"""
+
+import uuid
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import NotSupportedError, connection, transaction
+from audit_logs.models import AuditLog
+from core.partitioning import (
+    PARTITIONED_TABLES,
+    hash_partition_layout,
+    partition_by_tenant,
+    partition_count,
+    scanned_relations,
+)
+from tasks.models import Task
+from tenants.models import Tenant
+
+MODELS = {'tasks_task': Task, 'audit_logs_auditlog': AuditLog}
+
+
+class Command(BaseCommand):
+    help = 'Verify (or create) the hash partitions of tasks and audit logs by tenant'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--convert',
+            action='store_true',
+            help='Partition tables that are not partitioned by tenant yet',
+        )
+
+    def handle(self, *args, **options):
+        if connection.vendor != 'postgresql':
+            self.stdout.write(f'  {connection.vendor}: tables are not partitioned (PostgreSQL only)')
+            return
+        count = partition_count()
+        if options['convert'] and count <= 0:
+            raise CommandError('Set TENANT_HASH_PARTITIONS to the number of partitions first')
+
+        tenant_id = Tenant.all_objects.values_list('id', flat=True).first() or uuid.uuid4()
+        problems = []
+        for table in PARTITIONED_TABLES:
+            with connection.cursor() as cursor:
+                layout = hash_partition_layout(cursor, table)
+            if not layout and options['convert']:
+                self.stdout.write(f'  partitioning {table} into {count} partitions...')
+                try:
+                    with transaction.atomic(), connection.cursor() as cursor:
+                        partition_by_tenant(cursor, table, count)
+                        layout = hash_partition_layout(cursor, table)
+                except NotSupportedError as error:
+                    raise CommandError(str(error))
+            if not layout:
+                if count:
+                    problems.append(f'{table} is not partitioned by tenant (run with --convert)')
+                else:
+                    self.stdout.write(f'  {table}: not partitioned (TENANT_HASH_PARTITIONS is 0)')
+                continue
+            problems.extend(self.check_layout(table, layout, count))
+            problems.extend(self.check_pruning(table, layout, tenant_id))
+
+        for problem in problems:
+            self.stderr.write(f'  ✗ {problem}')
+        if problems:
+            raise CommandError(f'{len(problems)} partitioning problems')
+        self.stdout.write(self.style.SUCCESS('✓ Tenant partitions verified'))
+
+    def check_layout(self, table, layout, count):
+        problems = []
+        for parent, partitions in layout.items():
+            moduli = {modulus for _, modulus, _, _ in partitions}
+            remainders = sorted(remainder for _, _, remainder, _ in partitions)
+            modulus = max(moduli)
+            if len(moduli) > 1 or remainders != list(range(modulus)):
+                problems.append(f'{parent}: incomplete hash partitions {remainders} of {sorted(moduli)}')
+            elif count and modulus != count:
+                problems.append(f'{parent}: {modulus} partitions, TENANT_HASH_PARTITIONS is {count}')
+            rows = [rows for _, _, _, rows in partitions]
+            self.stdout.write(
+                f'  {parent}: {len(partitions)} partitions, '
+                f'~{sum(rows)} rows (largest ~{max(rows)})'
+            )
+        return problems
+
+    def check_pruning(self, table, layout, tenant_id):
+        leaves = {name for partitions in layout.values() for name, _, _, _ in partitions}
+        scanned = scanned_relations(MODELS[table]._base_manager.filter(tenant_id=tenant_id))
+        scanned_leaves = scanned & leaves
+        # One partition per hash partitioned parent (one per month for audit logs)
+        if scanned != scanned_leaves or len(scanned_leaves) != len(layout):
+            return [f'{table}: a tenant query scans {", ".join(sorted(scanned))}']
+        self.stdout.write(f'  {table}: a tenant query scans {len(scanned)} of {len(leaves)} partitions')
+        return []
@@ -0,0 +1,19 @@
+from tenants.scoping import reset_current_tenant_id, set_current_tenant_id
+
+
+class TenantContextMiddleware:
+    """
+    Start every request without a tenant context and restore the previous
+    one afterwards, so a tenant set by authentication never leaks into the
+    next request handled by the same thread.
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        token = set_current_tenant_id(None)
+        try:
+            return self.get_response(request)
+        finally:
+            reset_current_tenant_id(token)
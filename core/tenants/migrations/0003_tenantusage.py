@@ -0,0 +1,66 @@
+# Generated by Django 5.2.18 on 2026-10-18 07:11
+
+import django.db.models.deletion
+from django.db import migrations, models
+from django.db.models import Count
+
+
+def backfill_usage(apps, schema_editor):
+    Tenant = apps.get_model("tenants", "Tenant")
+    TenantUsage = apps.get_model("tenants", "TenantUsage")
+    User = apps.get_model("accounts", "User")
+    Project = apps.get_model("projects", "Project")
+    Task = apps.get_model("tasks", "Task")
+
+    usage = {
+        tenant_id: {"users": 0, "projects": 0, "tasks": 0, "open_tasks": 0}
+        for tenant_id in Tenant.objects.values_list("id", flat=True)
+    }
+    sources = (
+        ("users", User.objects.filter(tenant__isnull=False)),
+        ("projects", Project.objects.all()),
+        ("tasks", Task.objects.all()),
+        ("open_tasks", Task.objects.exclude(status="completed")),
+    )
+    for field, queryset in sources:
+        rows = queryset.order_by().values("tenant_id").annotate(n=Count("id"))
+        for row in rows.values_list("tenant_id", "n"):
+            usage[row[0]][field] = row[1]
+
+    TenantUsage.objects.bulk_create(
+        [TenantUsage(tenant_id=tenant_id, **counters) for tenant_id, counters in usage.items()]
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("tenants", "0002_tenant_updated_at"),
+        ("accounts", "0005_user_token_generation"),
+        ("projects", "0002_project_status_project_updated_at_alter_project_id"),
+        ("tasks", "0002_alter_task_project"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="TenantUsage",
+            fields=[
+                (
+                    "tenant",
+                    models.OneToOneField(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        primary_key=True,
+                        related_name="usage",
+                        serialize=False,
+                        to="tenants.tenant",
+                    ),
+                ),
+                ("users", models.IntegerField(default=0)),
+                ("projects", models.IntegerField(default=0)),
+                ("tasks", models.IntegerField(default=0)),
+                ("open_tasks", models.IntegerField(default=0)),
+                ("updated_at", models.DateTimeField(auto_now=True)),
+            ],
+        ),
+        migrations.RunPython(backfill_usage, migrations.RunPython.noop),
+    ]
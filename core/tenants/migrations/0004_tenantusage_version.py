@@ -0,0 +1,18 @@
+# Generated by Django 5.2.18 on 2026-10-18 07:30
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("tenants", "0003_tenantusage"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="tenantusage",
+            name="version",
+            field=models.PositiveBigIntegerField(default=0),
+        ),
+    ]
@@ -1,6 +1,14 @@
 import uuid
 from django.db import models
 
+
+class ActiveTenantManager(models.Manager):
+    """Tenants that are not being purged."""
+
+    def get_queryset(self):
+        return super().get_queryset().filter(deleted_at__isnull=True)
+
+
 class Tenant(models.Model):
     PLAN_CHOICES = (
         ('free', 'Free'),
@@ -23,6 +31,83 @@ class Tenant(models.Model):
     max_projects = models.IntegerField(default=3)
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
+    # Set when the tenant is deleted; a PurgeJob then removes its data
+    deleted_at = models.DateTimeField(null=True, blank=True)
+
+    objects = ActiveTenantManager()
+    all_objects = models.Manager()
 
     def __str__(self):
         return self.name
+
+
+class TenantUsage(models.Model):
+    """
+    Denormalized per-tenant counters.
+
+    Kept up to date by the write paths in the accounts, projects and tasks
+    views (see tenants.usage) so that tenant listings and details can serve
+    stats without counting rows. ``rebuild_tenant_usage`` recomputes them.
+
+    ``version`` increases on every write to the tenant's data and backs the
+    conditional GET support in tenants.versions.
+    """
+    tenant = models.OneToOneField(
+        Tenant,
+        primary_key=True,
+        on_delete=models.CASCADE,
+        related_name='usage'
+    )
+    users = models.IntegerField(default=0)
+    projects = models.IntegerField(default=0)
+    tasks = models.IntegerField(default=0)
+    open_tasks = models.IntegerField(default=0)
+    version = models.PositiveBigIntegerField(default=0)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    def __str__(self):
+        return f"Usage for {self.tenant_id}"
+
+
+class PurgeJob(models.Model):
+    """
+    Background removal of a deleted tenant or project (see tenants.purge).
+
+    The target is soft-deleted in the request that creates the job; the
+    job then deletes its rows bottom-up in bounded batches, recording
+    progress after every batch so that it can resume after a crash. The
+    tenant is stored by id so the job outlives it.
+    """
+    TARGET_CHOICES = (
+        ('tenant', 'Tenant'),
+        ('project', 'Project'),
+    )
+
+    STATUS_CHOICES = (
+        ('pending', 'Pending'),
+        ('running', 'Running'),
+        ('completed', 'Completed'),
+        ('failed', 'Failed'),
+    )
+
+    id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
+    target_type = models.CharField(max_length=20, choices=TARGET_CHOICES)
+    target_id = models.UUIDField()
+    tenant_id = models.UUIDField()
+    status = models.CharField(max_length=20, choices=STATUS_CHOICES, default='pending')
+    # Step being processed and rows deleted so far per step
+    stage = models.CharField(max_length=50, blank=True)
+    deleted = models.JSONField(default=dict)
+    attempts = models.PositiveIntegerField(default=0)
+    error = models.TextField(blank=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+    heartbeat_at = models.DateTimeField(null=True, blank=True)
+    finished_at = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['status', 'created_at'], name='purgejob_status_created_idx'),
+        ]
+
+    def __str__(self):
+        return f"Purge {self.target_type} {self.target_id} ({self.status})"
@@ -0,0 +1,194 @@
+"""
+Background purge of deleted tenants and projects.
+
+Deleting a tenant or a large project through Django's CASCADE collector
+loads every related row into memory and removes them in one long
+transaction. Instead, the deleting request only soft-deletes the target
+(``deleted_at``; the default managers hide it at once) and creates a
+``PurgeJob``. The job deletes the children bottom-up in batches of
+``PURGE_JOBS['BATCH_SIZE']`` rows, each batch in its own short transaction
+together with the job's progress, so a crashed job resumes where it
+stopped.
+
+Jobs are run by a per-process background thread, woken when a job is
+committed, and by the ``run_purge_jobs`` command, which also picks up jobs
+whose worker died (no heartbeat for ``STALE_AFTER`` seconds). In sync mode
+(the test suite) jobs run inside the deleting request.
+"""
+
+import logging
+import os
+import threading
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import close_old_connections, transaction
+from django.db.models import F, Q
+from django.utils import timezone
+
+from .models import PurgeJob, Tenant, TenantUsage
+
+logger = logging.getLogger(__name__)
+
+DEFAULTS = {
+    'SYNC': False,
+    'BATCH_SIZE': 1000,
+    'STALE_AFTER': 300,
+}
+
+
+def purge_settings():
+    return {**DEFAULTS, **getattr(settings, 'PURGE_JOBS', {})}
+
+
+def purge_steps(job):
+    """``(stage, queryset, tombstone entity type)`` in deletion order."""
+    from accounts.models import User
+    from audit_logs.models import AuditLog
+    from projects.models import Project
+    from sync.models import Tombstone
+    from tasks.models import Task
+
+    if job.target_type == 'project':
+        return [
+            ('tasks', Task.all_objects.filter(tenant_id=job.tenant_id, project_id=job.target_id), 'task'),
+            ('project', Project.all_objects.filter(id=job.target_id), None),
+        ]
+    # A purged tenant's sync clients are gone: no tombstones
+    tenant_id = job.target_id
+    return [
+        ('tasks', Task.all_objects.filter(tenant_id=tenant_id), None),
+        ('projects', Project.all_objects.filter(tenant_id=tenant_id), None),
+        ('tombstones', Tombstone.objects.filter(tenant_id=tenant_id), None),
+        ('audit_logs', AuditLog.objects.filter(tenant_id=tenant_id), None),
+        ('users', User.objects.filter(tenant_id=tenant_id), None),
+        ('usage', TenantUsage.objects.filter(tenant_id=tenant_id), None),
+        ('tenant', Tenant.all_objects.filter(id=tenant_id), None),
+    ]
+
+
+def enqueue_purge(target_type, target_id, tenant_id):
+    """
+    Create a purge job for a soft-deleted tenant or project.
+
+    Call inside the transaction that sets ``deleted_at``; the job starts
+    once it commits.
+    """
+    job = PurgeJob.objects.create(target_type=target_type, target_id=target_id, tenant_id=tenant_id)
+    if purge_settings()['SYNC']:
+        run_job(claim_job(job.id))
+    else:
+        transaction.on_commit(purge_worker.wake)
+    return job
+
+
+def _claimable():
+    stale = timezone.now() - timedelta(seconds=purge_settings()['STALE_AFTER'])
+    return Q(status='pending') | Q(status='running', heartbeat_at__lt=stale)
+
+
+def claim_job(job_id):
+    """Mark a pending (or abandoned) job as running; None if someone else has it."""
+    claimed = PurgeJob.objects.filter(_claimable(), id=job_id).update(
+        status='running',
+        heartbeat_at=timezone.now(),
+        attempts=F('attempts') + 1,
+    )
+    return PurgeJob.objects.get(id=job_id) if claimed else None
+
+
+def run_job(job, batch_size=None, on_progress=None):
+    """
+    Delete the rows of a claimed job batch by batch, resuming at its stage.
+
+    ``on_progress(job, stage, count)`` is called after every batch.
+    """
+    if job is None:
+        return None
+    batch_size = batch_size or purge_settings()['BATCH_SIZE']
+    from sync.utils import record_deletions
+
+    try:
+        steps = purge_steps(job)
+        stages = [stage for stage, _, _ in steps]
+        start = stages.index(job.stage) if job.stage in stages else 0
+        for stage, queryset, entity_type in steps[start:]:
+            while True:
+                with transaction.atomic():
+                    ids = list(queryset.order_by().values_list('pk', flat=True)[:batch_size])
+                    if ids:
+                        if entity_type:
+                            record_deletions(job.tenant_id, entity_type, ids)
+                        # Children are already gone, so the collector only
+                        # issues bounded queries for this batch (which keep
+                        # the tenant filter for partition pruning)
+                        queryset.filter(pk__in=ids).delete()
+                    job.stage = stage
+                    job.deleted = {**job.deleted, stage: job.deleted.get(stage, 0) + len(ids)}
+                    job.heartbeat_at = timezone.now()
+                    job.save(update_fields=['stage', 'deleted', 'heartbeat_at'])
+                if on_progress is not None:
+                    on_progress(job, stage, len(ids))
+                if len(ids) < batch_size:
+                    break
+    except Exception as exc:
+        logger.exception("Purge job %s failed at %s", job.id, job.stage)
+        job.status = 'failed'
+        job.error = f'{type(exc).__name__}: {exc}'
+        job.save(update_fields=['status', 'error'])
+        return job
+
+    job.status = 'completed'
+    job.error = ''
+    job.finished_at = timezone.now()
+    job.save(update_fields=['status', 'error', 'finished_at'])
+    return job
+
+
+def run_pending_jobs(batch_size=None, on_progress=None):
+    """Run claimable jobs, oldest first, until none are left. Returns the jobs run."""
+    jobs = []
+    while True:
+        candidates = list(
+            PurgeJob.objects.filter(_claimable()).order_by('created_at').values_list('id', flat=True)[:10]
+        )
+        job = next(filter(None, map(claim_job, candidates)), None)
+        if job is None:
+            return jobs
+        jobs.append(run_job(job, batch_size, on_progress))
+
+
+class PurgeWorker:
+    """Per-process background thread running purge jobs when woken."""
+
+    def __init__(self):
+        self._reset()
+
+    def _reset(self):
+        # Forked children inherit the state but not the thread
+        self._pid = os.getpid()
+        self._lock = threading.Lock()
+        self._wakeup = threading.Event()
+        self._thread = None
+
+    def wake(self):
+        if self._pid != os.getpid():
+            self._reset()
+        with self._lock:
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._run, name='purge-worker', daemon=True)
+                self._thread.start()
+        self._wakeup.set()
+
+    def _run(self):
+        while True:
+            self._wakeup.wait()
+            self._wakeup.clear()
+            close_old_connections()
+            try:
+                run_pending_jobs()
+            except Exception:
+                logger.exception("Purge worker failed")
+
+
+purge_worker = PurgeWorker()
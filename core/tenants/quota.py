@@ -0,0 +1,64 @@
+from django.db.models import F, Subquery
+
+from .models import Tenant, TenantUsage
+from .usage import rebuild_usage
+
+# Usage counter -> Tenant field holding its limit
+QUOTA_LIMITS = {
+    'users': 'max_users',
+    'projects': 'max_projects',
+}
+
+
+class QuotaExceeded(Exception):
+    """Raised when a tenant has no free slots left for a resource."""
+
+    def __init__(self, resource):
+        self.resource = resource
+        super().__init__(f"{resource} limit reached")
+
+
+def _increment_within_limit(tenant_id, resource, count):
+    limit = Subquery(
+        Tenant.objects.filter(id=tenant_id).values(QUOTA_LIMITS[resource])[:1]
+    )
+    return TenantUsage.objects.filter(
+        tenant_id=tenant_id,
+        **{f'{resource}__lte': limit - count}
+    ).update(**{resource: F(resource) + count})
+
+
+def reserve_quota(tenant_id, resource, count=1):
+    """
+    Reserve ``count`` slots of ``resource`` ('users' or 'projects').
+
+    The usage counter is incremented by a single conditional UPDATE that only
+    matches while the new value stays within the tenant's limit, so
+    concurrent creates serialize on the usage row and can never overshoot.
+    Call it inside ``transaction.atomic()`` before inserting the rows; if the
+    insert fails the rollback releases the reservation. Deletes release
+    slots through ``adjust_usage``.
+    """
+    if _increment_within_limit(tenant_id, resource, count):
+        return
+    if TenantUsage.objects.filter(tenant_id=tenant_id).exists():
+        raise QuotaExceeded(resource)
+
+    # No usage row yet: build it from the source tables and try once more
+    rebuild_usage([tenant_id])
+    if not _increment_within_limit(tenant_id, resource, count):
+        raise QuotaExceeded(resource)
+
+
+def quota_summary(tenant, usage):
+    """Limit, used and remaining slots per quota-controlled resource."""
+    summary = {}
+    for resource, limit_field in QUOTA_LIMITS.items():
+        limit = getattr(tenant, limit_field)
+        used = getattr(usage, resource)
+        summary[resource] = {
+            'limit': limit,
+            'used': used,
+            'remaining': max(limit - used, 0)
+        }
+    return summary
@@ -0,0 +1,237 @@
+"""
+Shared cache of read responses, invalidated by the tenant's data version.
+
+The list and detail endpoints of a tenant return the same body to every
+member who asks with the same query string. ``cached_response`` stores the
+body of a successful GET under a key made of the view, the tenant, the
+requesting role, the resource version (see tenants.versions), the URL
+arguments and the normalized query parameters. Every write increases the
+version inside its transaction, so entries of older versions are never read
+again and simply age out of the cache. Nothing has to be deleted on write.
+
+The storage is pluggable through ``RESPONSE_CACHE['BACKEND']``:
+
+- ``LocMemBackend`` (default): an LRU per process holding at most
+  ``MAX_BYTES`` of pickled bodies.
+- ``DjangoCacheBackend``: the Django cache ``CACHES[CACHE_ALIAS]``, e.g. a
+  ``FileBasedCache`` shared by the workers of one host or memcached/redis
+  shared by all of them. Size limits are those of the cache itself.
+
+An empty BACKEND turns the cache off. ``response_cache_stats()`` reports hit
+and miss counts of this process and the backend's size and evictions.
+"""
+
+import hashlib
+import pickle
+import threading
+import time
+from collections import OrderedDict
+from functools import wraps
+
+from django.conf import settings
+from django.utils.module_loading import import_string
+from rest_framework.response import Response
+
+DEFAULTS = {
+    'BACKEND': 'tenants.response_cache.LocMemBackend',
+    'MAX_BYTES': 32 * 1024 * 1024,
+    'TIMEOUT': 300,
+    'CACHE_ALIAS': 'default',
+}
+
+
+def response_cache_settings():
+    return {**DEFAULTS, **getattr(settings, 'RESPONSE_CACHE', {})}
+
+
+class LocMemBackend:
+    """Thread-safe LRU of pickled bodies bounded by their total size."""
+
+    def __init__(self, options):
+        self.max_bytes = options['MAX_BYTES']
+        self.bytes = 0
+        self.evictions = 0
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            payload, expires_at = entry
+            if expires_at < time.monotonic():
+                self._discard(key)
+                return None
+            self._entries.move_to_end(key)
+            return payload
+
+    def set(self, key, payload, timeout):
+        if len(payload) > self.max_bytes:
+            return
+        with self._lock:
+            self._discard(key)
+            self._entries[key] = (payload, time.monotonic() + timeout)
+            self.bytes += len(payload)
+            while self.bytes > self.max_bytes:
+                oldest = next(iter(self._entries))
+                self._discard(oldest)
+                self.evictions += 1
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self.bytes = 0
+
+    def stats(self):
+        return {
+            'entries': len(self._entries),
+            'bytes': self.bytes,
+            'maxBytes': self.max_bytes,
+            'evictions': self.evictions,
+        }
+
+    def _discard(self, key):
+        entry = self._entries.pop(key, None)
+        if entry is not None:
+            self.bytes -= len(entry[0])
+
+
+class DjangoCacheBackend:
+    """Bodies stored in a Django cache, shared by every process using it."""
+
+    def __init__(self, options):
+        from django.core.cache import caches
+
+        self.alias = options['CACHE_ALIAS']
+        self.cache = caches[self.alias]
+
+    def get(self, key):
+        return self.cache.get(key)
+
+    def set(self, key, payload, timeout):
+        self.cache.set(key, payload, timeout)
+
+    def clear(self):
+        self.cache.clear()
+
+    def stats(self):
+        return {'cacheAlias': self.alias}
+
+
+class ResponseCache:
+    def __init__(self, backend, timeout):
+        self.backend = backend
+        self.timeout = timeout
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        payload = self.backend.get(key)
+        with self._lock:
+            if payload is None:
+                self.misses += 1
+            else:
+                self.hits += 1
+        return None if payload is None else pickle.loads(payload)
+
+    def set(self, key, data):
+        self.backend.set(key, pickle.dumps(data, pickle.HIGHEST_PROTOCOL), self.timeout)
+
+    def clear(self):
+        self.backend.clear()
+        with self._lock:
+            self.hits = self.misses = 0
+
+    def stats(self):
+        lookups = self.hits + self.misses
+        return {
+            'backend': type(self.backend).__name__,
+            'hits': self.hits,
+            'misses': self.misses,
+            'hitRate': round(self.hits / lookups, 3) if lookups else None,
+            **self.backend.stats(),
+        }
+
+
+_UNSET = object()
+_cache = None
+_cache_lock = threading.Lock()
+
+
+def get_response_cache():
+    """The process wide ResponseCache, or None if it is turned off."""
+    global _cache
+    with _cache_lock:
+        if _cache is None:
+            options = response_cache_settings()
+            if not options['BACKEND']:
+                return None
+            backend = import_string(options['BACKEND'])(options)
+            _cache = ResponseCache(backend, options['TIMEOUT'])
+        return _cache
+
+
+def response_cache_stats():
+    cache = get_response_cache()
+    return cache.stats() if cache is not None else {'backend': None}
+
+
+def cache_key(request, view_name, version, view_kwargs):
+    # Parameter order and empty values do not change the response
+    params = sorted(
+        (name, value)
+        for name in request.query_params
+        for value in request.query_params.getlist(name)
+        if value != ''
+    )
+    parts = [
+        view_name,
+        str(request.user.tenant_id),
+        request.user.role,
+        version,
+        repr(sorted(view_kwargs.items())),
+        repr(params),
+    ]
+    return 'response:' + hashlib.sha1('|'.join(parts).encode()).hexdigest()
+
+
+def cached_response(get_version):
+    """
+    Serve GET requests of a DRF function view from the response cache.
+
+    ``get_version`` is the same lookup as for ``conditional_get``; requests
+    without a version (e.g. super admins) are not cached. Apply below
+    ``conditional_get``, which hands over the version it already looked up::
+
+        @api_view(['GET'])
+        @permission_classes([IsAuthenticated])
+        @conditional_get(tenant_version)
+        @cached_response(tenant_version)
+        def my_view(request): ...
+    """
+    def decorator(view):
+        view_name = f'{view.__module__}.{view.__name__}'
+
+        @wraps(view)
+        def wrapped(request, *args, **kwargs):
+            cache = get_response_cache()
+            if request.method != 'GET' or cache is None:
+                return view(request, *args, **kwargs)
+            version = getattr(request, 'resource_version', _UNSET)
+            if version is _UNSET:
+                version = get_version(request, **kwargs)
+            if version is None:
+                return view(request, *args, **kwargs)
+
+            key = cache_key(request, view_name, version, kwargs)
+            data = cache.get(key)
+            if data is not None:
+                return Response(data)
+            response = view(request, *args, **kwargs)
+            if response.status_code == 200:
+                cache.set(key, response.data)
+            return response
+        return wrapped
+    return decorator
@@ -0,0 +1,57 @@
+"""
+Per-request tenant context and the managers that apply it.
+
+``CachedJWTAuthentication`` records the authenticated user's tenant in a
+context variable and ``TenantContextMiddleware`` clears it around every
+request. While it is set, ``TenantScopedManager`` (the default manager of
+``Project``, ``Task``, ``User`` and ``AuditLog``) adds
+``tenant_id = <tenant>`` to every query, so lookups by id lead with the
+tenant column of the composite indexes and prune to the tenant's partition
+(core.partitioning), and a row of another tenant is simply not found.
+
+Without a context (super admins, management commands, background workers,
+unauthenticated requests) the managers do not filter. Views still check
+tenant ownership explicitly, by foreign key id. Global lookups that must see
+every tenant, e.g. email uniqueness, use the unscoped ``all_objects``.
+"""
+
+from contextlib import contextmanager
+from contextvars import ContextVar
+
+from django.db import models
+
+_current_tenant_id = ContextVar('current_tenant_id', default=None)
+
+
+def get_current_tenant_id():
+    return _current_tenant_id.get()
+
+
+def set_current_tenant_id(tenant_id):
+    """Scope queries to ``tenant_id`` (None: unscoped); returns a reset token."""
+    return _current_tenant_id.set(tenant_id)
+
+
+def reset_current_tenant_id(token):
+    _current_tenant_id.reset(token)
+
+
+@contextmanager
+def tenant_context(tenant_id):
+    """Scope queries to ``tenant_id`` inside the block (commands, workers, tests)."""
+    token = set_current_tenant_id(tenant_id)
+    try:
+        yield
+    finally:
+        reset_current_tenant_id(token)
+
+
+class TenantScopedManager(models.Manager):
+    """Manager filtering on the current tenant, if there is one."""
+
+    def get_queryset(self):
+        queryset = super().get_queryset()
+        tenant_id = get_current_tenant_id()
+        if tenant_id is None:
+            return queryset
+        return queryset.filter(tenant_id=tenant_id)
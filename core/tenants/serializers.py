@@ -1,5 +1,7 @@
 from rest_framework import serializers
-from .models import Tenant
+from projects.models import Project
+from tasks.models import Task
+from .models import PurgeJob, Tenant
 
 
 class TenantSerializer(serializers.ModelSerializer):
@@ -37,3 +39,62 @@ class TenantDetailSerializer(serializers.ModelSerializer):
             'updatedAt'
         ]
         read_only_fields = fields
+
+
+
+class PurgeJobSerializer(serializers.ModelSerializer):
+    targetType = serializers.CharField(source='target_type')
+    targetId = serializers.UUIDField(source='target_id')
+    tenantId = serializers.UUIDField(source='tenant_id')
+    createdAt = serializers.DateTimeField(source='created_at')
+    finishedAt = serializers.DateTimeField(source='finished_at')
+
+    class Meta:
+        model = PurgeJob
+        fields = [
+            'id',
+            'targetType',
+            'targetId',
+            'tenantId',
+            'status',
+            'stage',
+            'deleted',
+            'error',
+            'createdAt',
+            'finishedAt'
+        ]
+        read_only_fields = fields
+
+# ----- bulk import rows (see tenants.importer) -----
+# Plain serializers: uniqueness and references are checked per batch by the
+# importer instead of with one query per row.
+
+class UserImportSerializer(serializers.Serializer):
+    id = serializers.UUIDField(required=False)
+    email = serializers.EmailField(max_length=254)
+    full_name = serializers.CharField(max_length=255)
+    # Exports carry no passwords: such users get an unusable one
+    password = serializers.CharField(min_length=8, write_only=True, required=False)
+    role = serializers.ChoiceField(choices=['tenant_admin', 'user'], default='user')
+    is_active = serializers.BooleanField(default=True)
+
+
+class ProjectImportSerializer(serializers.Serializer):
+    id = serializers.UUIDField(required=False)
+    name = serializers.CharField(max_length=255)
+    description = serializers.CharField(required=False, allow_blank=True, default='')
+    status = serializers.ChoiceField(choices=Project.STATUS_CHOICES, default='active')
+    created_by = serializers.EmailField(required=False, help_text='Creator email')
+    created_by_id = serializers.UUIDField(required=False, help_text='Creator id')
+
+
+class TaskImportSerializer(serializers.Serializer):
+    id = serializers.UUIDField(required=False)
+    project_id = serializers.UUIDField()
+    title = serializers.CharField(max_length=255)
+    description = serializers.CharField(required=False, allow_blank=True, default='')
+    status = serializers.ChoiceField(choices=Task.STATUS_CHOICES, default='todo')
+    priority = serializers.ChoiceField(choices=Task.PRIORITY_CHOICES, default='medium')
+    assigned_to = serializers.EmailField(required=False, allow_null=True, help_text='Assignee email')
+    assigned_to_id = serializers.UUIDField(required=False, allow_null=True, help_text='Assignee id')
+    due_date = serializers.DateField(required=False, allow_null=True)
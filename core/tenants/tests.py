@@ -1,3 +1,830 @@
-from django.test import TestCase
+"""Tests for tenants app."""
+import gzip
+import json
+import os
+import tempfile
+import uuid
+from datetime import timedelta
+from io import BytesIO, StringIO
+from unittest import mock, skipIf, skipUnless
+from django.contrib.auth.hashers import check_password
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.core.management import call_command
+from django.core.management.base import CommandError
+from django.db import NotSupportedError, connection
+from django.db.migrations.executor import MigrationExecutor
+from django.test import TestCase, TransactionTestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+from rest_framework.test import APITestCase, APIClient
+from rest_framework import status
+from accounts.models import User
+from core.partitioning import hash_modulus, hash_partition_layout, plan_relations
+from core.search import apply_search
+from tenants import importer
+from tenants.models import PurgeJob, Tenant, TenantUsage
+from tenants.purge import claim_job, run_job, run_pending_jobs
+from tenants.quota import QuotaExceeded, reserve_quota
+from tenants.response_cache import LocMemBackend, get_response_cache
+from tenants.scoping import get_current_tenant_id, tenant_context
+from tenants.usage import rebuild_usage
+from projects.models import Project
+from tasks.models import Task
+from audit_logs.models import AuditLog
+from sync.models import Tombstone
+from audit_logs.tests import migrate, table_layout
 
-# Create your tests here.
+
+class RegisteredTenantTestCase(APITestCase):
+    """Base case with a freshly registered tenant and its admin logged in"""
+
+    def setUp(self):
+        self.client = APIClient()
+        response = self.client.post('/api/auth/register-tenant', {
+            'tenantName': 'Demo Company',
+            'subdomain': 'demo',
+            'adminFullName': 'Demo Admin',
+            'adminEmail': 'admin@demo.com',
+            'adminPassword': 'Admin@123'
+        }, format='json')
+        self.tenant = Tenant.objects.get(id=response.data['data']['tenantId'])
+        response = self.client.post('/api/auth/login', {
+            'email': 'admin@demo.com',
+            'password': 'Admin@123',
+            'tenantSubdomain': 'demo'
+        }, format='json')
+        self.client.credentials(HTTP_AUTHORIZATION=f"Bearer {response.data['data']['token']}")
+
+    def usage(self):
+        return TenantUsage.objects.get(tenant=self.tenant)
+
+
+class TenantUsageTests(RegisteredTenantTestCase):
+    """Test cases for denormalized tenant usage counters"""
+
+    def test_counters_follow_api_writes(self):
+        """Test creating and deleting through the API keeps counters exact"""
+        self.client.post(f'/api/tenants/{self.tenant.id}/users', {
+            'email': 'user@demo.com',
+            'password': 'User@1234',
+            'full_name': 'Demo User',
+            'role': 'user'
+        }, format='json')
+        project_id = self.client.post('/api/projects', {'name': 'Website'}, format='json').data['data']['id']
+        task_id = self.client.post(f'/api/projects/{project_id}/tasks', {'title': 'Design'}, format='json').data['data']['id']
+        self.client.post(f'/api/projects/{project_id}/tasks', {'title': 'Build'}, format='json')
+        self.client.patch(f'/api/tasks/{task_id}/status', {'status': 'completed'}, format='json')
+
+        usage = self.usage()
+        self.assertEqual((usage.users, usage.projects, usage.tasks, usage.open_tasks), (2, 1, 2, 1))
+
+        self.client.delete(f'/api/tasks/{task_id}/delete')
+        self.client.delete(f'/api/projects/{project_id}')
+        usage = self.usage()
+        self.assertEqual((usage.users, usage.projects, usage.tasks, usage.open_tasks), (2, 0, 0, 0))
+
+    def test_tenant_detail_serves_stats_from_counters(self):
+        """Test tenant detail returns counter-backed stats"""
+        response = self.client.get(f'/api/tenants/{self.tenant.id}')
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data['data']['stats'], {
+            'totalUsers': 1,
+            'totalProjects': 0,
+            'totalTasks': 0,
+            'openTasks': 0
+        })
+
+
+class QuotaTests(RegisteredTenantTestCase):
+    """Test cases for atomic quota reservation"""
+
+    def test_project_limit_is_enforced_and_released(self):
+        """Test the project limit rejects creates and frees slots on delete"""
+        ids = [
+            self.client.post('/api/projects', {'name': f'Project {i}'}, format='json').data['data']['id']
+            for i in range(3)
+        ]
+        response = self.client.post('/api/projects', {'name': 'One too many'}, format='json')
+        self.assertEqual(response.status_code, status.HTTP_403_FORBIDDEN)
+        self.assertEqual(self.usage().projects, 3)
+
+        self.client.delete(f'/api/projects/{ids[0]}')
+        response = self.client.post('/api/projects', {'name': 'Replacement'}, format='json')
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+
+    def test_failed_insert_releases_reservation(self):
+        """Test a rejected user create does not consume a slot"""
+        response = self.client.post(f'/api/tenants/{self.tenant.id}/users', {
+            'email': 'not-an-email',
+            'password': 'User@1234',
+            'full_name': 'Broken',
+            'role': 'user'
+        }, format='json')
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertEqual(self.usage().users, 1)
+
+    def test_reserve_quota_without_usage_row(self):
+        """Test reservation bootstraps missing counters before checking"""
+        TenantUsage.objects.filter(tenant=self.tenant).delete()
+        reserve_quota(self.tenant.id, 'users', count=4)
+        self.assertEqual(self.usage().users, 5)
+        with self.assertRaises(QuotaExceeded):
+            reserve_quota(self.tenant.id, 'users')
+
+    def test_tenant_detail_exposes_remaining_quota(self):
+        """Test tenant detail reports limit, used and remaining slots"""
+        response = self.client.get(f'/api/tenants/{self.tenant.id}')
+        self.assertEqual(response.data['data']['quota'], {
+            'users': {'limit': 5, 'used': 1, 'remaining': 4},
+            'projects': {'limit': 3, 'used': 0, 'remaining': 3}
+        })
+
+
+class ConditionalGetTests(RegisteredTenantTestCase):
+    """Test cases for version counters and ETag revalidation"""
+
+    def create_project(self, name):
+        return self.client.post('/api/projects', {'name': name}, format='json').data['data']['id']
+
+    def test_unchanged_list_returns_304(self):
+        """Test revalidating an unchanged list costs one query and no body"""
+        self.create_project('Website')
+        response = self.client.get('/api/projects')
+        etag = response['ETag']
+        self.assertEqual(response['Cache-Control'], 'private, no-cache')
+
+        with self.assertNumQueries(1):
+            response = self.client.get('/api/projects', HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, status.HTTP_304_NOT_MODIFIED)
+        self.assertEqual(response['ETag'], etag)
+
+        # Another query string is another representation
+        response = self.client.get('/api/projects', {'limit': 1}, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+
+    def test_writes_change_the_etag(self):
+        """Test task writes change the project's ETag but not other projects'"""
+        website = self.create_project('Website')
+        mobile = self.create_project('Mobile')
+        website_etag = self.client.get(f'/api/projects/{website}/tasks')['ETag']
+        mobile_etag = self.client.get(f'/api/projects/{mobile}/tasks')['ETag']
+        list_etag = self.client.get('/api/projects')['ETag']
+
+        self.client.post(f'/api/projects/{website}/tasks', {'title': 'Design'}, format='json')
+
+        response = self.client.get(f'/api/projects/{website}/tasks', HTTP_IF_NONE_MATCH=website_etag)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(len(response.data['data']['tasks']), 1)
+        response = self.client.get(f'/api/projects/{mobile}/tasks', HTTP_IF_NONE_MATCH=mobile_etag)
+        self.assertEqual(response.status_code, status.HTTP_304_NOT_MODIFIED)
+        response = self.client.get('/api/projects', HTTP_IF_NONE_MATCH=list_etag)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+
+    def test_user_rename_changes_project_etags(self):
+        """Test renaming a user invalidates every project of the tenant"""
+        project = self.create_project('Website')
+        etag = self.client.get(f'/api/projects/{project}/tasks')['ETag']
+        admin = User.objects.get(email='admin@demo.com')
+        self.client.put(f'/api/users/{admin.id}', {'full_name': 'Renamed Admin'}, format='json')
+
+        response = self.client.get(f'/api/projects/{project}/tasks', HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+
+    def test_project_save_keeps_version(self):
+        """Test a full save does not write back a stale version"""
+        from tenants.versions import bump_version
+        project = Project.objects.get(id=self.create_project('Website'))
+        bump_version(self.tenant.id, project.id)
+        project.name = 'Renamed'
+        project.save()
+        project.refresh_from_db()
+        self.assertEqual((project.name, project.version), ('Renamed', 1))
+
+
+class ResponseCacheTests(RegisteredTenantTestCase):
+    """Test cases for the version keyed response cache"""
+
+    def setUp(self):
+        super().setUp()
+        self.cache = get_response_cache()
+        self.cache.clear()
+
+    def test_members_share_cached_list_until_a_write(self):
+        """Test a second member is served from the cache and a write invalidates it"""
+        self.client.post('/api/projects', {'name': 'Website'}, format='json')
+        self.client.post(f'/api/tenants/{self.tenant.id}/users', {
+            'email': 'admin2@demo.com',
+            'password': 'Admin@123',
+            'full_name': 'Second Admin',
+            'role': 'tenant_admin'
+        }, format='json')
+        self.client.get('/api/projects')
+
+        member = APIClient()
+        token = member.post('/api/auth/login', {
+            'email': 'admin2@demo.com',
+            'password': 'Admin@123',
+            'tenantSubdomain': 'demo'
+        }, format='json').data['data']['token']
+        member.credentials(HTTP_AUTHORIZATION=f'Bearer {token}')
+        member.get('/api/auth/me')
+        # Only the version lookup
+        with self.assertNumQueries(1):
+            response = member.get('/api/projects')
+        self.assertEqual([p['name'] for p in response.data['data']['projects']], ['Website'])
+        self.assertEqual(self.cache.stats()['hits'], 1)
+
+        self.client.post('/api/projects', {'name': 'Mobile'}, format='json')
+        response = member.get('/api/projects')
+        self.assertEqual(len(response.data['data']['projects']), 2)
+
+    def test_query_params_are_normalized(self):
+        """Test parameter order and empty values share one entry"""
+        self.client.get('/api/projects?limit=1&q=')
+        self.client.get('/api/projects?limit=1')
+        self.client.get('/api/projects?limit=2')
+        self.assertEqual((self.cache.stats()['hits'], self.cache.stats()['misses']), (1, 2))
+
+    def test_locmem_backend_evicts_least_recently_used(self):
+        """Test the memory budget evicts the oldest entries first"""
+        backend = LocMemBackend({'MAX_BYTES': 100})
+        backend.set('a', b'x' * 40, 60)
+        backend.set('b', b'x' * 40, 60)
+        backend.get('a')
+        backend.set('c', b'x' * 40, 60)
+        backend.set('huge', b'x' * 101, 60)
+        self.assertIsNone(backend.get('b'))
+        self.assertIsNotNone(backend.get('a'))
+        self.assertIsNone(backend.get('huge'))
+        self.assertEqual(backend.stats(), {'entries': 2, 'bytes': 80, 'maxBytes': 100, 'evictions': 1})
+
+
+class TenantExportTests(RegisteredTenantTestCase):
+    """Test cases for the streamed tenant export"""
+
+    def setUp(self):
+        super().setUp()
+        self.admin = User.objects.get(email='admin@demo.com')
+        self.project = Project.objects.create(name="Website", tenant=self.tenant, created_by=self.admin)
+        self.tasks = sorted(
+            (Task.objects.create(title=f"Task {i}", project=self.project, tenant=self.tenant) for i in range(3)),
+            key=lambda task: task.id
+        )
+
+    def export(self, **params):
+        response = self.client.get(f'/api/tenants/{self.tenant.id}/export', params)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        return b''.join(response.streaming_content)
+
+    def records(self, content):
+        return [json.loads(line) for line in content.decode().splitlines()]
+
+    def test_ndjson_streams_every_entity(self):
+        """Test the default export contains users, projects, tasks and audit logs in order"""
+        records = self.records(self.export())
+        entities = [record['entity'] for record in records]
+        self.assertEqual(entities[:5], ['users', 'projects', 'tasks', 'tasks', 'tasks'])
+        self.assertIn('audit_logs', entities)
+        self.assertNotIn('password', records[0]['data'])
+        self.assertEqual([r['data']['id'] for r in records if r['entity'] == 'tasks'],
+                         [str(task.id) for task in self.tasks])
+
+    def test_resumes_after_entity_and_key(self):
+        """Test after=<entity>:<id> continues with the following rows and entities"""
+        records = self.records(self.export(after=f'tasks:{self.tasks[0].id}'))
+        self.assertEqual([r['data']['id'] for r in records if r['entity'] == 'tasks'],
+                         [str(task.id) for task in self.tasks[1:]])
+        self.assertNotIn('users', [record['entity'] for record in records])
+
+    def test_csv_and_gzip(self):
+        """Test a gzipped CSV export of one entity"""
+        content = gzip.decompress(self.export(exportFormat='csv', entities='tasks', gzip='true')).decode()
+        lines = content.splitlines()
+        self.assertTrue(lines[0].startswith('id,project_id,title'))
+        self.assertEqual(len(lines), 4)
+
+    def test_rejects_invalid_options_and_non_admins(self):
+        """Test bad options are rejected and only tenant admins may export"""
+        response = self.client.get(f'/api/tenants/{self.tenant.id}/export', {'exportFormat': 'csv'})
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        response = self.client.get(f'/api/tenants/{self.tenant.id}/export', {'after': 'tasks:nope'})
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+        member = User.objects.create_user(
+            email="user@demo.com", password="User@1234", full_name="Member", tenant=self.tenant
+        )
+        self.client.force_authenticate(member)
+        response = self.client.get(f'/api/tenants/{self.tenant.id}/export')
+        self.assertEqual(response.status_code, status.HTTP_403_FORBIDDEN)
+
+    def test_command_resumes_interrupted_export(self):
+        """Test --resume completes a truncated export file"""
+        expected = self.export(entities='users,projects,tasks')
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, 'export.ndjson')
+            # Interrupted in the middle of the second task
+            cut = expected.index(str(self.tasks[1].id).encode()) + 5
+            with open(path, 'wb') as file:
+                file.write(expected[:cut])
+            call_command(
+                'export_tenant_data', 'demo', '--entity', 'users', '--entity', 'projects',
+                '--entity', 'tasks', '--output', path, '--resume', stderr=StringIO()
+            )
+            with open(path, 'rb') as file:
+                self.assertEqual(file.read(), expected)
+
+
+class TenantImportTests(RegisteredTenantTestCase):
+    """Test cases for the bulk tenant import"""
+
+    PROJECT_ID = '6f1f2a52-7f43-4a39-a0e5-1c1f4b1c9d11'
+
+    def upload(self, records, name='import.ndjson', **fields):
+        if isinstance(records, list):
+            records = '\n'.join(json.dumps(record) for record in records)
+        fields['file'] = SimpleUploadedFile(name, records.encode())
+        return self.client.post(f'/api/tenants/{self.tenant.id}/import', fields, format='multipart')
+
+    def records(self):
+        return [
+            {'entity': 'users', 'data': {
+                'email': 'dev@demo.com', 'full_name': 'Dev', 'password': 'Dev@12345'
+            }},
+            {'entity': 'projects', 'data': {'id': self.PROJECT_ID, 'name': 'Website'}},
+            {'entity': 'tasks', 'data': {
+                'project_id': self.PROJECT_ID, 'title': 'Design', 'priority': 'high',
+                'assigned_to': 'dev@demo.com', 'due_date': '2030-01-31'
+            }},
+            {'entity': 'tasks', 'data': {
+                'project_id': self.PROJECT_ID, 'title': 'Launch', 'status': 'completed'
+            }},
+        ]
+
+    def test_imports_users_projects_and_tasks(self):
+        """Test an NDJSON import creates linked rows and updates the counters"""
+        response = self.upload(self.records())
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(response.data['data']['created'], {'users': 1, 'projects': 1, 'tasks': 2})
+
+        dev = User.objects.get(email='dev@demo.com')
+        self.assertEqual((dev.tenant_id, dev.role), (self.tenant.id, 'user'))
+        self.assertTrue(check_password('Dev@12345', dev.password))
+        project = Project.objects.get(id=self.PROJECT_ID)
+        self.assertEqual(project.created_by.email, 'admin@demo.com')
+        design = Task.objects.get(title='Design')
+        self.assertEqual((design.assigned_to_id, design.priority_rank), (dev.id, 3))
+
+        usage = self.usage()
+        self.assertEqual((usage.users, usage.projects, usage.tasks, usage.open_tasks), (2, 1, 2, 1))
+
+    def test_invalid_rows_reject_the_import(self):
+        """Test any invalid row rejects the whole import with per-line errors"""
+        records = self.records()
+        records[0]['data']['email'] = 'admin@demo.com'
+        records[3]['data']['status'] = 'done'
+        records.append({'entity': 'tasks', 'data': {'project_id': str(uuid.uuid4()), 'title': 'Lost'}})
+        response = self.upload(records)
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertEqual(
+            [(error['line'], error['entity']) for error in response.data['errors']],
+            # Line 3 assigns the rejected user
+            [(1, 'users'), (3, 'tasks'), (4, 'tasks'), (5, 'tasks')]
+        )
+        self.assertFalse(Project.objects.filter(id=self.PROJECT_ID).exists())
+        self.assertEqual(self.usage().users, 1)
+
+    def test_csv_import_and_dry_run(self):
+        """Test a CSV of tasks for an existing project, validated first with dryRun"""
+        project = Project.objects.create(
+            name="Existing", tenant=self.tenant, created_by=User.objects.get(email='admin@demo.com')
+        )
+        content = (
+            'project_id,title,priority,assigned_to,due_date\n'
+            f'{project.id},Design,low,admin@demo.com,\n'
+            f'{project.id},Build,,,2030-01-31\n'
+        )
+        response = self.upload(content, name='tasks.csv', entity='tasks', dryRun='true')
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertFalse(Task.objects.exists())
+
+        response = self.upload(content, name='tasks.csv', entity='tasks')
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(Task.objects.filter(project=project).count(), 2)
+
+    def test_quota_applies_to_the_whole_import(self):
+        """Test an import exceeding the user limit is refused"""
+        records = [
+            {'entity': 'users', 'data': {
+                'email': f'user{i}@demo.com', 'full_name': f'User {i}', 'password': 'User@1234'
+            }}
+            for i in range(5)
+        ]
+        response = self.upload(records)
+        self.assertEqual(response.status_code, status.HTTP_403_FORBIDDEN)
+        self.assertEqual(User.objects.filter(tenant=self.tenant).count(), 1)
+
+    def test_export_imports_into_another_tenant(self):
+        """Test a full NDJSON export imports unchanged into a new tenant"""
+        admin = User.objects.get(email='admin@demo.com')
+        member = User.objects.create_user(
+            email="member@demo.com", password="Member@123", full_name="Member", tenant=self.tenant, role="user"
+        )
+        project = Project.objects.create(name="Website", tenant=self.tenant, created_by=member)
+        Task.objects.create(
+            title="Design", project=project, tenant=self.tenant, assigned_to=member,
+            priority='high', due_date='2030-01-31'
+        )
+        Task.objects.create(title="Launch", project=project, tenant=self.tenant, status='completed')
+        response = self.client.get(f'/api/tenants/{self.tenant.id}/export')
+        content = b''.join(response.streaming_content)
+        self.assertIn(b'"entity": "audit_logs"', content)
+
+        def snapshot(tenant):
+            return (
+                set(User.objects.filter(tenant=tenant).values_list('id', 'email', 'full_name', 'role', 'is_active')),
+                set(Project.objects.filter(tenant=tenant).values_list('id', 'name', 'status', 'created_by_id')),
+                set(Task.objects.filter(tenant=tenant).values_list(
+                    'id', 'project_id', 'title', 'status', 'priority', 'assigned_to_id', 'due_date'
+                )),
+            )
+
+        exported = snapshot(self.tenant)
+        # Emails and ids are unique across tenants: the source goes first
+        Tenant.all_objects.filter(id=self.tenant.id).delete()
+        restored = Tenant.objects.create(name="Restored", subdomain="restored")
+        report = importer.import_tenant_data(restored, BytesIO(content))
+
+        self.assertEqual((report['errorCount'], report['created']), (0, {'users': 2, 'projects': 1, 'tasks': 2}))
+        self.assertEqual(snapshot(restored), exported)
+        # Passwords are not exported
+        self.assertFalse(User.objects.get(id=admin.id).has_usable_password())
+        self.assertEqual(Project.objects.get(id=project.id).task_count, 2)
+
+    def test_unknown_fields_reject_the_row(self):
+        """Test fields that are neither imported nor exported are reported"""
+        records = self.records()
+        records[1]['data']['owner'] = 'admin@demo.com'
+        records[1]['data']['created_at'] = '2024-01-01T00:00:00Z'
+        response = self.upload(records)
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertEqual(response.data['errors'][0]['line'], 2)
+        self.assertEqual(list(response.data['errors'][0]['errors']), ['owner'])
+
+    def test_hashes_passwords_in_process_pool(self):
+        """Test large password lists are hashed by worker processes"""
+        with mock.patch.object(importer, 'POOL_MIN_PASSWORDS', 2):
+            hashes = importer.hash_passwords(['Pass@1234', 'Word@5678'], workers=2)
+        self.assertTrue(check_password('Pass@1234', hashes[0]))
+        self.assertTrue(check_password('Word@5678', hashes[1]))
+
+    def test_command_imports_file(self):
+        """Test the import_tenant_data command"""
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, 'import.ndjson.gz')
+            with gzip.open(path, 'wt') as file:
+                file.write('\n'.join(json.dumps(record) for record in self.records()))
+            call_command('import_tenant_data', 'demo', path, stdout=StringIO())
+        self.assertEqual(Task.objects.filter(project_id=self.PROJECT_ID).count(), 2)
+
+
+@override_settings(PURGE_JOBS={'SYNC': False, 'BATCH_SIZE': 2, 'STALE_AFTER': 300})
+class PurgeJobTests(RegisteredTenantTestCase):
+    """Test cases for background tenant and project purges"""
+
+    def setUp(self):
+        super().setUp()
+        self.admin = User.objects.get(email='admin@demo.com')
+        self.project = Project.objects.create(name="Website", tenant=self.tenant, created_by=self.admin)
+        for i in range(5):
+            Task.objects.create(title=f"Task {i}", project=self.project, tenant=self.tenant)
+        rebuild_usage([self.tenant.id])
+
+    def test_project_delete_hides_project_and_purges_in_batches(self):
+        """Test a deleted project disappears at once and its tasks are purged later"""
+        response = self.client.delete(f'/api/projects/{self.project.id}')
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        job = PurgeJob.objects.get(id=response.data['data']['purgeJobId'])
+        self.assertEqual(job.status, 'pending')
+
+        response = self.client.get(f'/api/projects/{self.project.id}')
+        self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
+        self.assertFalse(Task.objects.filter(tenant=self.tenant).exists())
+        self.assertEqual(Task.all_objects.filter(project_id=self.project.id).count(), 5)
+        usage = self.usage()
+        self.assertEqual((usage.projects, usage.tasks), (0, 0))
+
+        call_command('run_purge_jobs', stdout=StringIO())
+        job.refresh_from_db()
+        self.assertEqual((job.status, job.deleted), ('completed', {'tasks': 5, 'project': 1}))
+        self.assertFalse(Project.all_objects.filter(id=self.project.id).exists())
+        self.assertEqual(Tombstone.objects.filter(entity_type='task').count(), 5)
+
+        response = self.client.get(f'/api/tenants/purge-jobs/{job.id}')
+        self.assertEqual(response.data['data']['status'], 'completed')
+
+    def test_interrupted_job_resumes_where_it_stopped(self):
+        """Test a failed or abandoned job continues from its recorded progress"""
+        self.client.delete(f'/api/projects/{self.project.id}')
+        job = PurgeJob.objects.get()
+
+        def crash(job, stage, count):
+            raise RuntimeError('worker died')
+
+        with self.assertLogs('tenants.purge', 'ERROR'):
+            job = run_job(claim_job(job.id), on_progress=crash)
+        self.assertEqual((job.status, job.deleted), ('failed', {'tasks': 2}))
+        self.assertEqual(Task.all_objects.filter(project_id=self.project.id).count(), 3)
+
+        # A job left running without a heartbeat is picked up again
+        PurgeJob.objects.filter(id=job.id).update(
+            status='running', heartbeat_at=timezone.now() - timedelta(hours=1)
+        )
+        call_command('run_purge_jobs', stdout=StringIO())
+        job.refresh_from_db()
+        self.assertEqual((job.status, job.deleted, job.attempts), ('completed', {'tasks': 5, 'project': 1}, 2))
+
+    def test_command_keeps_running_with_interval(self):
+        """Test run_purge_jobs --interval keeps looking for jobs"""
+        self.client.delete(f'/api/projects/{self.project.id}')
+        job = PurgeJob.objects.get()
+
+        class Stop(Exception):
+            pass
+
+        command = 'tenants.management.commands.run_purge_jobs'
+        with mock.patch(f'{command}.close_old_connections'), \
+                mock.patch(f'{command}.run_pending_jobs', wraps=run_pending_jobs) as run, \
+                mock.patch(f'{command}.time.sleep', side_effect=[None, Stop]) as sleep:
+            run.side_effect = [RuntimeError('database restarting'), mock.DEFAULT, mock.DEFAULT]
+            with self.assertRaises(Stop), self.assertLogs(command, 'ERROR'):
+                call_command('run_purge_jobs', '--interval', '30', stdout=StringIO())
+        sleep.assert_called_with(30)
+        self.assertEqual(run.call_count, 2)
+        job.refresh_from_db()
+        self.assertEqual(job.status, 'completed')
+
+    def test_tenant_delete_purges_everything(self):
+        """Test deleting a tenant locks its users out and removes all of its rows"""
+        token = self.client._credentials['HTTP_AUTHORIZATION']
+        root = User.objects.create_user(
+            email="root@system.com", password="Admin@123", full_name="Root", role="super_admin"
+        )
+        self.client.force_authenticate(root)
+        response = self.client.delete(f'/api/tenants/{self.tenant.id}')
+        self.assertEqual(response.status_code, status.HTTP_202_ACCEPTED)
+        self.assertEqual(self.client.get(f'/api/tenants/{self.tenant.id}').status_code, 404)
+
+        self.client.force_authenticate(None)
+        self.client.credentials(HTTP_AUTHORIZATION=token)
+        self.assertEqual(self.client.get('/api/auth/me').status_code, status.HTTP_401_UNAUTHORIZED)
+
+        call_command('run_purge_jobs', stdout=StringIO())
+        job = PurgeJob.objects.get(id=response.data['data']['id'])
+        self.assertEqual(job.status, 'completed')
+        self.assertEqual(job.deleted['tasks'], 5)
+        self.assertFalse(Tenant.all_objects.filter(id=self.tenant.id).exists())
+        self.assertFalse(User.objects.filter(email='admin@demo.com').exists())
+        self.assertFalse(AuditLog.objects.filter(tenant_id=self.tenant.id).exists())
+        self.assertTrue(AuditLog.objects.filter(action='DELETE_TENANT').exists())
+
+
+class RebuildTenantUsageCommandTests(TestCase):
+    """Test cases for the rebuild_tenant_usage management command"""
+
+    def setUp(self):
+        self.tenant = Tenant.objects.create(name="Test Company", subdomain="test")
+        self.user = User.objects.create_user(
+            email="user@test.com",
+            password="Test@123",
+            full_name="Test User",
+            tenant=self.tenant
+        )
+        project = Project.objects.create(name="Project", tenant=self.tenant, created_by=self.user)
+        Task.objects.create(title="Open", project=project, tenant=self.tenant)
+        Task.objects.create(title="Done", project=project, tenant=self.tenant, status='completed')
+
+    def test_verify_reports_drift(self):
+        """Test --verify fails when counters are stale"""
+        TenantUsage.objects.create(tenant=self.tenant)
+        with self.assertRaises(CommandError):
+            call_command('rebuild_tenant_usage', '--verify', stdout=StringIO())
+
+    def test_rebuild_corrects_counters(self):
+        """Test rebuilding recomputes counters from source tables"""
+        TenantUsage.objects.create(tenant=self.tenant, users=7)
+        call_command('rebuild_tenant_usage', stdout=StringIO())
+        usage = TenantUsage.objects.get(tenant=self.tenant)
+        self.assertEqual((usage.users, usage.projects, usage.tasks, usage.open_tasks), (1, 1, 2, 1))
+        call_command('rebuild_tenant_usage', '--verify', stdout=StringIO())
+
+    def test_list_tenants_query_count_is_flat(self):
+        """Test tenant listing does not count rows per tenant"""
+        for i in range(3):
+            Tenant.objects.create(name=f"Tenant {i}", subdomain=f"t{i}")
+        rebuild_usage()
+        admin = User.objects.create_user(
+            email="root@system.com",
+            password="Admin@123",
+            full_name="Super Admin",
+            role="super_admin"
+        )
+        client = APIClient()
+        client.force_authenticate(admin)
+        with self.assertNumQueries(1):
+            response = client.get('/api/tenants')
+        self.assertEqual(len(response.data['data']['tenants']), 4)
+
+
+class TenantPartitionTests(TestCase):
+    def test_plan_relations(self):
+        """Test the scanned relations are collected from a JSON plan"""
+        plan = [{'Plan': {'Node Type': 'Append', 'Plans': [
+            {'Node Type': 'Index Scan', 'Relation Name': 'tasks_task_h3'},
+            {'Node Type': 'Nested Loop', 'Plans': [
+                {'Node Type': 'Seq Scan', 'Relation Name': 'projects_project'},
+            ]},
+        ]}}]
+        self.assertEqual(plan_relations(plan), {'tasks_task_h3', 'projects_project'})
+
+    @skipIf(connection.vendor == 'postgresql', 'Tables are partitioned on PostgreSQL')
+    def test_verify_command_without_postgresql(self):
+        """Test the verification command only reports on SQLite"""
+        out = StringIO()
+        call_command('verify_tenant_partitions', '--convert', stdout=out)
+        self.assertIn('not partitioned', out.getvalue())
+
+
+@skipUnless(connection.vendor == 'postgresql', 'Partitioning needs PostgreSQL')
+class TenantPartitionMigrationTests(TransactionTestCase):
+    """Test the tenant partitioning migrations forwards and backwards with rows"""
+
+    def setUp(self):
+        self.tenants = [
+            Tenant.objects.create(name=f"Company {i}", subdomain=f"company{i}") for i in range(3)
+        ]
+        self.users = [
+            User.objects.create_user(
+                email=f"user@company{i}.com", password="User@1234", full_name="Demo User", tenant=tenant
+            )
+            for i, tenant in enumerate(self.tenants)
+        ]
+
+    def tearDown(self):
+        # Back to the layout of this test run (TENANT_HASH_PARTITIONS as configured)
+        migrate()
+
+    def migrate(self, app, name, partitions=4):
+        with self.settings(TENANT_HASH_PARTITIONS=partitions):
+            migrate([(app, name)])
+
+    def hash_modulus(self, table):
+        with connection.cursor() as cursor:
+            return hash_modulus(cursor, table)
+
+    def triggers(self, table):
+        with connection.cursor() as cursor:
+            cursor.execute(
+                'SELECT tgname FROM pg_trigger WHERE tgrelid = %s::regclass AND NOT tgisinternal', [table]
+            )
+            return {row[0] for row in cursor.fetchall()}
+
+    def create_tasks(self, projects):
+        """Tasks created through the model of the migration state the table is at."""
+        state = MigrationExecutor(connection).loader.project_state(('tasks', '0005_task_task_tenant_updated_idx'))
+        HistoricalTask = state.apps.get_model('tasks', 'Task')
+        HistoricalTask.objects.bulk_create([
+            HistoricalTask(
+                tenant_id=project.tenant_id, project_id=project.id,
+                title=f'Write release notes {i}', assigned_to_id=project.created_by_id,
+            )
+            for project in projects for i in range(3)
+        ])
+        return set(Task.all_objects.values_list('id', 'tenant_id'))
+
+    def create_projects(self):
+        # Before migrating tasks back, which also unapplies the projects task counts
+        return [
+            Project.all_objects.create(tenant=tenant, name='Launch', created_by=user)
+            for tenant, user in zip(self.tenants, self.users)
+        ]
+
+    def test_tasks_migrate_forwards_and_backwards_with_rows(self):
+        """Test tasks 0006 keeps every row, index, foreign key and trigger in both directions"""
+        projects = self.create_projects()
+        self.migrate('tasks', '0005_task_task_tenant_updated_idx')
+        plain = table_layout('tasks_task')
+        triggers = self.triggers('tasks_task')
+        self.assertEqual(plain[:2], ('r', 'PRIMARY KEY (id)'))
+        self.assertEqual(triggers, {'tasks_task_search_vector'})
+        rows = self.create_tasks(projects)
+
+        self.migrate('tasks', '0006_partition_by_tenant')
+        relkind, primary_key, indexes, foreign_keys = table_layout('tasks_task')
+        self.assertEqual((relkind, primary_key), ('p', 'PRIMARY KEY (id, tenant_id)'))
+        self.assertEqual((indexes, foreign_keys), plain[2:])
+        self.assertEqual(self.hash_modulus('tasks_task'), 4)
+        self.assertEqual(self.triggers('tasks_task'), triggers)
+        self.assertEqual(set(Task.all_objects.values_list('id', 'tenant_id')), rows)
+        # New rows still get their search vector
+        Task.all_objects.filter(tenant=self.tenants[0]).update(title='Plan the roadmap')
+        self.assertEqual(apply_search(Task.all_objects.all(), 'roadmap').count(), 3)
+
+        self.migrate('tasks', '0005_task_task_tenant_updated_idx')
+        self.assertEqual(table_layout('tasks_task'), plain)
+        self.assertEqual(self.triggers('tasks_task'), triggers)
+        self.assertEqual(set(Task.all_objects.values_list('id', 'tenant_id')), rows)
+        self.assertEqual(apply_search(Task.all_objects.all(), 'roadmap').count(), 3)
+
+    def test_tasks_referenced_by_foreign_keys_are_not_partitioned(self):
+        """Test 0006 refuses a task table referenced by a foreign key and leaves it unchanged"""
+        projects = self.create_projects()
+        self.migrate('tasks', '0005_task_task_tenant_updated_idx')
+        plain = table_layout('tasks_task')
+        rows = self.create_tasks(projects)
+        with connection.cursor() as cursor:
+            cursor.execute(
+                'CREATE TABLE tasks_comment (id serial PRIMARY KEY, '
+                'task_id uuid NOT NULL CONSTRAINT tasks_comment_task_fk REFERENCES tasks_task (id))'
+            )
+        try:
+            with self.assertRaisesMessage(NotSupportedError, 'tasks_comment.tasks_comment_task_fk'):
+                self.migrate('tasks', '0006_partition_by_tenant')
+            self.assertEqual(table_layout('tasks_task'), plain)
+            self.assertEqual(set(Task.all_objects.values_list('id', 'tenant_id')), rows)
+        finally:
+            with connection.cursor() as cursor:
+                cursor.execute('DROP TABLE tasks_comment')
+
+    def test_audit_logs_migrate_forwards_and_backwards_with_rows(self):
+        """Test audit_logs 0004 sub-partitions every month and is undone with the rows kept"""
+        self.migrate('audit_logs', '0003_partition_by_month')
+        monthly = table_layout('audit_logs_auditlog')
+        self.assertEqual(monthly[:2], ('p', 'PRIMARY KEY (id, created_at)'))
+        now = timezone.now()
+        for tenant, user in zip(self.tenants, self.users):
+            for created_at in (now - timedelta(days=400), now, now + timedelta(days=31 * 8)):
+                log = AuditLog.objects.create(
+                    tenant=tenant, user=user, action='UPDATE_TENANT', entity_type='tenant', entity_id=str(tenant.id)
+                )
+                AuditLog.all_objects.filter(id=log.id).update(created_at=created_at)
+        AuditLog.objects.create(action='LOGIN_FAILED', entity_type='user', entity_id='1')
+        rows = set(AuditLog.all_objects.values_list('id', 'tenant_id', 'created_at'))
+
+        self.migrate('audit_logs', '0004_partition_by_tenant')
+        relkind, primary_key, indexes, foreign_keys = table_layout('audit_logs_auditlog')
+        self.assertEqual((relkind, primary_key), ('p', None))
+        self.assertEqual(indexes, monthly[2] | {'audit_logs_auditlog_id_idx'})
+        self.assertEqual(foreign_keys, monthly[3])
+        with connection.cursor() as cursor:
+            layout = hash_partition_layout(cursor, 'audit_logs_auditlog')
+            cursor.execute(
+                'SELECT count(*) FROM pg_inherits WHERE inhparent = %s::regclass', ['audit_logs_auditlog']
+            )
+            months = cursor.fetchone()[0]
+        self.assertEqual(len(layout), months)
+        self.assertEqual({len(partitions) for partitions in layout.values()}, {4})
+        self.assertEqual(set(AuditLog.all_objects.values_list('id', 'tenant_id', 'created_at')), rows)
+
+        self.migrate('audit_logs', '0003_partition_by_month')
+        self.assertEqual(table_layout('audit_logs_auditlog'), monthly)
+        with connection.cursor() as cursor:
+            self.assertEqual(hash_partition_layout(cursor, 'audit_logs_auditlog'), {})
+        self.assertEqual(set(AuditLog.all_objects.values_list('id', 'tenant_id', 'created_at')), rows)
+
+
+class TenantScopingTests(RegisteredTenantTestCase):
+    def setUp(self):
+        super().setUp()
+        self.admin = User.objects.get(email='admin@demo.com')
+        self.project = Project.objects.create(tenant=self.tenant, name="Demo", created_by=self.admin)
+        self.other = Tenant.objects.create(name="Other", subdomain="other")
+        other_admin = User.objects.create_user(
+            email="admin@other.com", password="Admin@123", full_name="Other Admin",
+            tenant=self.other, role="tenant_admin"
+        )
+        self.other_project = Project.objects.create(tenant=self.other, name="Other", created_by=other_admin)
+
+    def test_managers_filter_on_the_tenant_context(self):
+        """Test scoped managers only see the current tenant; all_objects sees every tenant"""
+        self.assertEqual(Project.objects.count(), 2)
+        with tenant_context(self.tenant.id):
+            self.assertEqual(list(Project.objects.all()), [self.project])
+            self.assertEqual(list(User.objects.values_list('email', flat=True)), ['admin@demo.com'])
+            self.assertEqual(User.all_objects.count(), 2)
+            self.assertFalse(Project.objects.filter(id=self.other_project.id).exists())
+        self.assertIsNone(get_current_tenant_id())
+
+    def test_requests_are_scoped_to_the_token_tenant(self):
+        """Test another tenant's project is not found and the context is cleared afterwards"""
+        response = self.client.get(f'/api/projects/{self.other_project.id}')
+        self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
+        self.assertIsNone(get_current_tenant_id())
+
+    def test_project_detail_does_not_load_tenants(self):
+        """Test tenant isolation compares ids instead of fetching Tenant rows"""
+        # The first request caches the principal (user and tenant)
+        self.client.get('/api/auth/me')
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(f'/api/projects/{self.project.id}')
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertFalse(any('"tenants_tenant"' in query['sql'] for query in queries))
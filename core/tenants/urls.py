@@ -4,4 +4,7 @@ from . import views
 urlpatterns = [
     path('', views.list_tenants, name='list_tenants'),
     path('/<uuid:tenant_id>', views.tenant_detail, name='tenant_detail'),
+    path('/purge-jobs/<uuid:job_id>', views.purge_job_detail, name='purge_job_detail'),
+    path('/<uuid:tenant_id>/export', views.export_tenant_data, name='export_tenant_data'),
+    path('/<uuid:tenant_id>/import', views.import_tenant_data, name='import_tenant_data'),
 ]
@@ -0,0 +1,86 @@
+from django.db.models import Count, F, Q
+
+from .models import Tenant, TenantUsage
+
+COUNTER_FIELDS = ('users', 'projects', 'tasks', 'open_tasks')
+
+
+def task_totals(queryset):
+    """Return task and open task counts for a Task queryset as usage deltas."""
+    totals = queryset.aggregate(
+        tasks=Count('id'),
+        open_tasks=Count('id', filter=~Q(status='completed'))
+    )
+    return {field: totals[field] or 0 for field in ('tasks', 'open_tasks')}
+
+
+def compute_usage(tenant_ids=None):
+    """
+    Count users, projects, tasks and open tasks per tenant from the source
+    tables with one grouped query per entity.
+
+    Returns a dict of tenant_id -> {counter: value} including zero rows for
+    every requested tenant.
+    """
+    from accounts.models import User
+    from projects.models import Project
+    from tasks.models import Task
+
+    if tenant_ids is None:
+        tenant_ids = list(Tenant.objects.values_list('id', flat=True))
+    usage = {tenant_id: dict.fromkeys(COUNTER_FIELDS, 0) for tenant_id in tenant_ids}
+
+    sources = (
+        ('users', User.objects.all()),
+        ('projects', Project.objects.all()),
+        ('tasks', Task.objects.all()),
+        ('open_tasks', Task.objects.exclude(status='completed')),
+    )
+    for field, queryset in sources:
+        rows = (
+            queryset.filter(tenant_id__in=tenant_ids)
+            .order_by()
+            .values('tenant_id')
+            .annotate(n=Count('id'))
+            .values_list('tenant_id', 'n')
+        )
+        for tenant_id, n in rows:
+            usage[tenant_id][field] = n
+    return usage
+
+
+def rebuild_usage(tenant_ids=None):
+    """Recompute and store usage counters. Returns the computed values."""
+    usage = compute_usage(tenant_ids)
+    TenantUsage.objects.bulk_create(
+        [TenantUsage(tenant_id=tenant_id, **counters) for tenant_id, counters in usage.items()],
+        update_conflicts=True,
+        unique_fields=['tenant'],
+        update_fields=list(COUNTER_FIELDS),
+    )
+    return usage
+
+
+def adjust_usage(tenant_id, **deltas):
+    """
+    Apply counter deltas (e.g. ``users=1`` or ``tasks=-3``) for a tenant.
+
+    Call this after the write it accounts for and inside the same
+    transaction. If the tenant has no usage row yet, the counters are rebuilt
+    from the source tables, which already include the write.
+    """
+    updates = {field: F(field) + delta for field, delta in deltas.items() if delta}
+    if not updates:
+        return
+    if not TenantUsage.objects.filter(tenant_id=tenant_id).update(**updates):
+        rebuild_usage([tenant_id])
+
+
+def get_usage(tenant):
+    """Return the usage row for a tenant, creating it if it is missing."""
+    try:
+        return tenant.usage
+    except TenantUsage.DoesNotExist:
+        rebuild_usage([tenant.id])
+        tenant.usage = TenantUsage.objects.get(tenant_id=tenant.id)
+        return tenant.usage
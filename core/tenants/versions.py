@@ -0,0 +1,118 @@
+"""
+Resource version counters and conditional GET for the list endpoints.
+
+Every write to a tenant's data increases ``TenantUsage.version``; writes to a
+project or its tasks also increase ``Project.version``. Both only change
+through F() updates in the writing transaction, so a version number always
+identifies one state of the data.
+
+``conditional_get`` turns a version into a strong ETag for a GET view and
+answers ``If-None-Match`` with ``304 Not Modified`` after a single indexed
+lookup, without running the view's list queries or serializers.
+"""
+
+import hashlib
+from functools import wraps
+
+from django.db.models import F
+from rest_framework.response import Response
+
+from .models import TenantUsage
+
+
+def bump_version(tenant_id, project_id=None, all_projects=False):
+    """
+    Mark the tenant's data (and one or all of its projects) as changed.
+
+    Call inside the transaction of the write. ``all_projects`` is for writes
+    that show up in every project, e.g. a user's name on assigned tasks.
+    """
+    from projects.models import Project
+
+    TenantUsage.objects.filter(tenant_id=tenant_id).update(version=F('version') + 1)
+    if all_projects:
+        Project.objects.filter(tenant_id=tenant_id).update(version=F('version') + 1)
+    elif project_id is not None:
+        Project.objects.filter(id=project_id).update(version=F('version') + 1)
+
+
+# ----- version lookups for conditional_get -----
+
+def tenant_version(request, tenant_id=None, **kwargs):
+    """Version of the requesting user's tenant (or ``tenant_id`` from the URL)."""
+    user = request.user
+    if user.role == 'super_admin' or user.tenant_id is None:
+        return None
+    if tenant_id is not None and tenant_id != user.tenant_id:
+        return None
+    version = (
+        TenantUsage.objects.filter(tenant_id=user.tenant_id)
+        .values_list('version', flat=True)
+        .first()
+    )
+    return None if version is None else f't{version}'
+
+
+def project_version(request, project_id, **kwargs):
+    """Version of the project in the URL, if it belongs to the user's tenant."""
+    from projects.models import Project
+
+    user = request.user
+    if user.role == 'super_admin':
+        return None
+    row = Project.objects.filter(id=project_id).values_list('tenant_id', 'version').first()
+    if row is None or row[0] != user.tenant_id:
+        # Let the view answer with 404 / 403
+        return None
+    return f'p{row[1]}'
+
+
+def make_etag(request, version):
+    # The same version renders differently per user, role and query string
+    variant = f'{request.user.id}|{request.user.role}|{request.get_full_path()}'
+    digest = hashlib.sha1(variant.encode()).hexdigest()[:16]
+    return f'"{version}-{digest}"'
+
+
+def conditional_get(get_version):
+    """
+    Serve GET requests of a DRF function view conditionally.
+
+    ``get_version(request, **view_kwargs)`` returns a version token, or None
+    to serve the request normally. Apply below ``@api_view`` so that the
+    request is authenticated::
+
+        @api_view(['GET'])
+        @permission_classes([IsAuthenticated])
+        @conditional_get(tenant_version)
+        def my_view(request): ...
+    """
+    def decorator(view):
+        @wraps(view)
+        def wrapped(request, *args, **kwargs):
+            if request.method not in ('GET', 'HEAD'):
+                return view(request, *args, **kwargs)
+            version = get_version(request, **kwargs)
+            # Reused by tenants.response_cache.cached_response
+            request.resource_version = version
+            if version is None:
+                return view(request, *args, **kwargs)
+
+            etag = make_etag(request, version)
+            headers = {
+                'ETag': etag,
+                # Let browsers keep the body but revalidate on every use
+                'Cache-Control': 'private, no-cache',
+                'Vary': 'Authorization',
+            }
+            if_none_match = request.headers.get('If-None-Match', '')
+            if etag in [tag.strip() for tag in if_none_match.split(',')] or if_none_match.strip() == '*':
+                return Response(status=304, headers=headers)
+
+            response = view(request, *args, **kwargs)
+            if response.status_code == 200:
+                for header, value in headers.items():
+                    response[header] = value
+            return response
+        return wrapped
+    return decorator
@@ -2,13 +2,25 @@ from rest_framework.decorators import api_view, permission_classes
 from rest_framework.permissions import IsAuthenticated
 from rest_framework.response import Response
 from rest_framework import status
+from django.core.handlers.asgi import ASGIRequest
+from django.db import transaction
 from django.db.models import Count
-from .models import Tenant
-from .serializers import TenantSerializer, TenantDetailSerializer
-from accounts.models import User
-from projects.models import Project
-from tasks.models import Task
+from django.http import StreamingHttpResponse
+from django.utils import timezone
+from core.pagination import CursorPaginator
+from .models import PurgeJob, Tenant
+from .serializers import PurgeJobSerializer, TenantSerializer, TenantDetailSerializer
+from .quota import QuotaExceeded, quota_summary
+from .usage import get_usage
+from .response_cache import cached_response
+from .versions import bump_version, conditional_get, tenant_version
+from .export import ExportError, aiter_chunks, export_chunks, parse_export_options
+from .importer import ImportFileError, TenantImporter, read_records
+from .purge import enqueue_purge
 from audit_logs.utils import log_action, AuditActions
+from accounts.principal_cache import principal_cache
+
+tenant_paginator = CursorPaginator(['-created_at', '-id'], default_limit=10, max_limit=100)
 
 
 @api_view(['GET'])
@@ -16,7 +28,7 @@ from audit_logs.utils import log_action, AuditActions
 def list_tenants(request):
     """
     List all tenants - super_admin only.
-    Supports pagination and filtering by status and subscription_plan.
+    Supports cursor pagination and filtering by status and subscription_plan.
     """
     user = request.user
     
@@ -27,7 +39,7 @@ def list_tenants(request):
             'message': 'Access denied. Super admin only.'
         }, status=status.HTTP_403_FORBIDDEN)
     
-    queryset = Tenant.objects.all()
+    queryset = Tenant.objects.select_related('usage')
     
     # Filter by status
     tenant_status = request.query_params.get('status')
@@ -39,48 +51,42 @@ def list_tenants(request):
     if plan:
         queryset = queryset.filter(subscription_plan=plan)
     
-    # Pagination
-    page = int(request.query_params.get('page', 1))
-    limit = min(int(request.query_params.get('limit', 10)), 100)
-    offset = (page - 1) * limit
-    
-    total = queryset.count()
-    tenants = queryset.order_by('-created_at')[offset:offset + limit]
+    # Keyset pagination (?cursor=&limit=&includeTotal=)
+    page = tenant_paginator.paginate(request, queryset)
     
     # Build response with stats
     tenants_data = []
-    for tenant in tenants:
+    for tenant in page:
+        usage = get_usage(tenant)
         tenant_data = TenantSerializer(tenant).data
-        tenant_data['totalUsers'] = User.objects.filter(tenant=tenant).count()
-        tenant_data['totalProjects'] = Project.objects.filter(tenant=tenant).count()
+        tenant_data['totalUsers'] = usage.users
+        tenant_data['totalProjects'] = usage.projects
         tenants_data.append(tenant_data)
     
     return Response({
         'success': True,
         'data': {
             'tenants': tenants_data,
-            'pagination': {
-                'currentPage': page,
-                'totalPages': (total + limit - 1) // limit if total > 0 else 1,
-                'totalTenants': total,
-                'limit': limit
-            }
+            'pagination': page.metadata()
         }
     })
 
 
-@api_view(['GET', 'PUT'])
+@api_view(['GET', 'PUT', 'DELETE'])
 @permission_classes([IsAuthenticated])
+@conditional_get(tenant_version)
+@cached_response(tenant_version)
 def tenant_detail(request, tenant_id):
     """
     GET: Get tenant details with stats
     PUT: Update tenant (tenant_admin can update name only, super_admin can update all)
+    DELETE: Delete tenant and all its data in the background (super_admin only)
     """
     user = request.user
     
     # Get the tenant
     try:
-        tenant = Tenant.objects.get(id=tenant_id)
+        tenant = Tenant.objects.select_related('usage').get(id=tenant_id)
     except Tenant.DoesNotExist:
         return Response({
             'success': False,
@@ -94,19 +100,47 @@ def tenant_detail(request, tenant_id):
             'message': 'Access denied'
         }, status=status.HTTP_403_FORBIDDEN)
     
+    if request.method == 'DELETE':
+        if user.role != 'super_admin':
+            return Response({
+                'success': False,
+                'message': 'Access denied. Super admin only.'
+            }, status=status.HTTP_403_FORBIDDEN)
+
+        # Hide the tenant (and lock its users out) now; its data is removed
+        # in batches by a purge job
+        with transaction.atomic():
+            tenant.deleted_at = timezone.now()
+            tenant.save(update_fields=['deleted_at'])
+            log_action(
+                request=request,
+                action=AuditActions.DELETE_TENANT,
+                entity_type='tenant',
+                entity_id=tenant.id,
+                tenant=None
+            )
+            job = enqueue_purge('tenant', tenant.id, tenant.id)
+        principal_cache.invalidate_tenant(tenant.id)
+
+        return Response({
+            'success': True,
+            'message': 'Tenant deletion started',
+            'data': PurgeJobSerializer(job).data
+        }, status=status.HTTP_202_ACCEPTED)
+
     if request.method == 'GET':
-        # Calculate stats
-        total_users = User.objects.filter(tenant=tenant).count()
-        total_projects = Project.objects.filter(tenant=tenant).count()
-        total_tasks = Task.objects.filter(tenant=tenant).count()
+        # Stats come from the denormalized usage counters
+        usage = get_usage(tenant)
         
         serializer = TenantDetailSerializer(tenant)
         data = serializer.data
         data['stats'] = {
-            'totalUsers': total_users,
-            'totalProjects': total_projects,
-            'totalTasks': total_tasks
+            'totalUsers': usage.users,
+            'totalProjects': usage.projects,
+            'totalTasks': usage.tasks,
+            'openTasks': usage.open_tasks
         }
+        data['quota'] = quota_summary(tenant, usage)
         
         return Response({
             'success': True,
@@ -161,6 +195,11 @@ def tenant_detail(request, tenant_id):
                 'message': 'Access denied'
             }, status=status.HTTP_403_FORBIDDEN)
         
+        # Cached principals embed the tenant row; drop them so limits and
+        # status changes are visible on the next request.
+        principal_cache.invalidate_tenant(tenant.id)
+        bump_version(tenant.id)
+
         # Log the action
         log_action(
             request=request,
@@ -177,3 +216,174 @@ def tenant_detail(request, tenant_id):
             'data': serializer.data
         })
 
+
+@api_view(['GET'])
+@permission_classes([IsAuthenticated])
+def export_tenant_data(request, tenant_id):
+    """
+    Stream the tenant's users, projects, tasks and audit logs - tenant_admin
+    of the tenant or super_admin.
+
+    Query params: exportFormat (ndjson|csv; ``format`` is taken by DRF's
+    content negotiation), entities (comma separated), after ("<entity>:<id>"
+    to resume) and gzip (true|false).
+    """
+    user = request.user
+
+    if user.role != 'super_admin' and (user.role != 'tenant_admin' or str(user.tenant_id) != str(tenant_id)):
+        return Response({
+            'success': False,
+            'message': 'Access denied'
+        }, status=status.HTTP_403_FORBIDDEN)
+
+    try:
+        tenant = Tenant.objects.get(id=tenant_id)
+    except Tenant.DoesNotExist:
+        return Response({
+            'success': False,
+            'message': 'Tenant not found'
+        }, status=status.HTTP_404_NOT_FOUND)
+
+    try:
+        export_format, entities, after = parse_export_options(
+            request.query_params.get('exportFormat', 'ndjson'),
+            request.query_params.get('entities'),
+            request.query_params.get('after'),
+        )
+    except ExportError as exc:
+        return Response({
+            'success': False,
+            'message': str(exc)
+        }, status=status.HTTP_400_BAD_REQUEST)
+    compress = request.query_params.get('gzip', '').lower() in ('1', 'true')
+
+    log_action(
+        request=request,
+        action=AuditActions.EXPORT_TENANT_DATA,
+        entity_type='tenant',
+        entity_id=tenant.id,
+        tenant=tenant
+    )
+
+    chunks = export_chunks(tenant.id, export_format, entities, after, compress)
+    if isinstance(request._request, ASGIRequest):
+        chunks = aiter_chunks(chunks)
+
+    name = entities[0] if len(entities) == 1 else 'export'
+    filename = f'{tenant.subdomain}-{name}.{export_format}'
+    content_type = 'text/csv' if export_format == 'csv' else 'application/x-ndjson'
+    if compress:
+        filename += '.gz'
+        content_type = 'application/gzip'
+    response = StreamingHttpResponse(chunks, content_type=content_type)
+    response['Content-Disposition'] = f'attachment; filename="{filename}"'
+    response['Cache-Control'] = 'no-store'
+    return response
+
+
+@api_view(['POST'])
+@permission_classes([IsAuthenticated])
+def import_tenant_data(request, tenant_id):
+    """
+    Bulk import users, projects and tasks from an uploaded NDJSON or CSV
+    file - tenant_admin of the tenant or super_admin.
+
+    Multipart fields: file, fileFormat (ndjson|csv), entity (CSV only) and
+    dryRun (true|false). If any row is invalid nothing is imported and the
+    errors are returned per line.
+    """
+    user = request.user
+
+    if user.role != 'super_admin' and (user.role != 'tenant_admin' or str(user.tenant_id) != str(tenant_id)):
+        return Response({
+            'success': False,
+            'message': 'Access denied'
+        }, status=status.HTTP_403_FORBIDDEN)
+
+    try:
+        tenant = Tenant.objects.get(id=tenant_id)
+    except Tenant.DoesNotExist:
+        return Response({
+            'success': False,
+            'message': 'Tenant not found'
+        }, status=status.HTTP_404_NOT_FOUND)
+
+    upload = request.FILES.get('file')
+    if upload is None:
+        return Response({
+            'success': False,
+            'message': 'file is required'
+        }, status=status.HTTP_400_BAD_REQUEST)
+    dry_run = str(request.data.get('dryRun', '')).lower() in ('1', 'true')
+
+    file_format = request.data.get('fileFormat') or (
+        'csv' if upload.name.endswith(('.csv', '.csv.gz')) else 'ndjson'
+    )
+
+    # Projects without created_by are owned by the importing admin
+    importer = TenantImporter(tenant, default_creator=user.id if user.tenant_id == tenant.id else None)
+    try:
+        importer.load(read_records(upload.file, file_format, request.data.get('entity')))
+        report = importer.run(dry_run=dry_run)
+    except ImportFileError as exc:
+        return Response({
+            'success': False,
+            'message': str(exc)
+        }, status=status.HTTP_400_BAD_REQUEST)
+    except QuotaExceeded as exc:
+        return Response({
+            'success': False,
+            'message': 'User limit reached' if exc.resource == 'users' else 'Project limit reached'
+        }, status=status.HTTP_403_FORBIDDEN)
+
+    if report['errorCount']:
+        return Response({
+            'success': False,
+            'message': 'Import rejected',
+            'errors': report['errors'],
+            'errorCount': report['errorCount']
+        }, status=status.HTTP_400_BAD_REQUEST)
+
+    if not dry_run:
+        log_action(
+            request=request,
+            action=AuditActions.IMPORT_TENANT_DATA,
+            entity_type='tenant',
+            entity_id=tenant.id,
+            tenant=tenant
+        )
+
+    return Response({
+        'success': True,
+        'message': 'Import validated' if dry_run else 'Import completed',
+        'data': report
+    }, status=status.HTTP_200_OK if dry_run else status.HTTP_201_CREATED)
+
+
+@api_view(['GET'])
+@permission_classes([IsAuthenticated])
+def purge_job_detail(request, job_id):
+    """
+    Progress of a tenant or project purge - super_admin, or tenant_admin
+    for jobs of their tenant.
+    """
+    user = request.user
+
+    try:
+        job = PurgeJob.objects.get(id=job_id)
+    except PurgeJob.DoesNotExist:
+        return Response({
+            'success': False,
+            'message': 'Purge job not found'
+        }, status=status.HTTP_404_NOT_FOUND)
+
+    if user.role != 'super_admin' and (user.role != 'tenant_admin' or user.tenant_id != job.tenant_id):
+        return Response({
+            'success': False,
+            'message': 'Access denied'
+        }, status=status.HTTP_403_FORBIDDEN)
+
+    return Response({
+        'success': True,
+        'data': PurgeJobSerializer(job).data
+    })
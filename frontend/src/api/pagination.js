@@ -0,0 +1,46 @@
+import api from "./axios";
+
+// Largest page the list endpoints accept (core.pagination max_limit)
+const PAGE_SIZE = 500;
+
+// List endpoints return one page at a time. Follow `nextCursor` until the
+// last page so that callers still get every row.
+export async function fetchAllPages(url, { params = {}, getItems, getPagination }) {
+  const rows = [];
+  let cursor = null;
+  do {
+    const res = await api.get(url, {
+      params: { ...params, limit: PAGE_SIZE, ...(cursor ? { cursor } : {}) },
+    });
+    rows.push(...(getItems(res.data) || []));
+    cursor = getPagination(res.data)?.nextCursor || null;
+  } while (cursor);
+  return rows;
+}
+
+// GET /tenants/{id}/users/list: users in `data`, pagination beside it
+export function fetchAllTenantUsers(tenantId, params = {}) {
+  return fetchAllPages(`/tenants/${tenantId}/users/list`, {
+    params,
+    getItems: (body) => body.data,
+    getPagination: (body) => body.pagination,
+  });
+}
+
+// GET /projects/{id}?include=tasks: the project with one page of its tasks
+// in `tasks`. Request the following pages the same way until
+// `tasksPagination.nextCursor` is null.
+export async function fetchProjectWithAllTasks(projectId) {
+  let project = null;
+  const tasks = [];
+  let cursor = null;
+  do {
+    const res = await api.get(`/projects/${projectId}`, {
+      params: { include: "tasks", limit: PAGE_SIZE, ...(cursor ? { cursor } : {}) },
+    });
+    project = project || res.data.data;
+    tasks.push(...(res.data.data.tasks || []));
+    cursor = res.data.data.tasksPagination?.nextCursor || null;
+  } while (cursor);
+  return { ...project, tasks };
+}
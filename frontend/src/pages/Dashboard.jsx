@@ -17,26 +17,18 @@ function Dashboard() {
 
   const fetchDashboardData = async () => {
     try {
-      const [projectsRes, tasksRes] = await Promise.all([
-        api.get("/projects"),
-        api.get("/tasks"), // Backend auto-filters by logged-in user
-      ]);
+      // One request: counts, recent projects and upcoming tasks
+      const res = await api.get("/dashboard/summary");
+      const summary = res.data?.data;
 
-      const projectsData = projectsRes.data?.data?.projects || [];
-      const tasksData = tasksRes.data?.data || [];
-
-      setProjects(projectsData.slice(0, 5));
-      setTasks(tasksData);
+      setProjects(summary?.recentProjects || []);
+      setTasks(summary?.upcomingTasks || []);
 
       setStats({
-        totalProjects: projectsData.length,
-        totalTasks: tasksData.length,
-        completedTasks: tasksData.filter(
-          (t) => t.status === "completed"
-        ).length,
-        pendingTasks: tasksData.filter(
-          (t) => t.status !== "completed"
-        ).length,
+        totalProjects: summary?.projects?.total || 0,
+        totalTasks: summary?.tasks?.total || 0,
+        completedTasks: summary?.tasks?.byStatus?.completed || 0,
+        pendingTasks: summary?.tasks?.open || 0,
       });
     } catch (err) {
       console.error("Dashboard load failed", err);
@@ -1,6 +1,6 @@
 import { useEffect, useState } from "react";
 import { useParams } from "react-router-dom";
-import api from "../../api/axios";
+import { fetchProjectWithAllTasks } from "../../api/pagination";
 import { useAuth } from "../../context/AuthContext";
 import CreateTaskModal from "../../tasks/CreateTaskModal";
 import EditTaskModal from "../../tasks/EditTaskModal";
@@ -22,13 +22,11 @@ function ProjectDetails() {
   // 🔁 Move fetch logic outside useEffect so it can be reused
   const fetchProjectData = async () => {
     try {
-      const [projectRes, tasksRes] = await Promise.all([
-        api.get(`/projects/${projectId}`),
-        api.get(`/projects/${projectId}/tasks`),
-      ]);
+      // Project and its tasks, one request per page of tasks
+      const data = await fetchProjectWithAllTasks(projectId);
 
-      setProject(projectRes.data.data);
-      setTasks(tasksRes.data.data.tasks || []);
+      setProject(data);
+      setTasks(data.tasks);
     } catch (err) {
       console.error("Failed to load project details", err);
     } finally {
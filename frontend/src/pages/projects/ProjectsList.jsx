@@ -1,6 +1,7 @@
 import { useEffect, useState } from "react";
 import { Link } from "react-router-dom";
 import api from "../../api/axios";
+import { fetchAllPages } from "../../api/pagination";
 import { useAuth } from "../../context/AuthContext";
 import CreateProjectModal from "./CreateProjectModal";
 import EditProjectModal from "./EditProjectModal";
@@ -20,8 +21,11 @@ function ProjectsList() {
 
   const fetchProjects = async () => {
     try {
-      const res = await api.get("/projects");
-      setProjects(res.data.data.projects || []);
+      const rows = await fetchAllPages("/projects", {
+        getItems: (body) => body.data.projects,
+        getPagination: (body) => body.data.pagination,
+      });
+      setProjects(rows);
     } catch (err) {
       console.error("Failed to load projects", err);
     } finally {
@@ -1,5 +1,6 @@
 import { useEffect, useState } from "react";
 import api from "../../api/axios";
+import { fetchAllTenantUsers } from "../../api/pagination";
 import { useAuth } from "../../context/AuthContext";
 import CreateUserModal from "./CreateUserModal";
 import EditUserModal from "./EditUserModal";
@@ -21,14 +22,11 @@ function UsersList() {
     if (!user?.tenantId) return;
     
     try {
-      let url = `/tenants/${user.tenantId}/users/list`;
-      const params = new URLSearchParams();
-      if (search) params.append("search", search);
-      if (roleFilter) params.append("role", roleFilter);
-      if (params.toString()) url += `?${params.toString()}`;
-
-      const res = await api.get(url);
-      setUsers(res.data.data.users || []);
+      const params = {};
+      if (search) params.search = search;
+      if (roleFilter) params.role = roleFilter;
+
+      setUsers(await fetchAllTenantUsers(user.tenantId, params));
     } catch (err) {
       console.error("Failed to load users", err);
     } finally {
@@ -1,5 +1,6 @@
 import { useEffect, useState } from "react";
 import api from "../api/axios";
+import { fetchAllTenantUsers } from "../api/pagination";
 import { useAuth } from "../context/AuthContext";
 
 function EditTaskModal({ task, onClose, onSuccess }) {
@@ -18,8 +19,7 @@ function EditTaskModal({ task, onClose, onSuccess }) {
     const fetchUsers = async () => {
       if (!user?.tenantId) return;
       try {
-        const res = await api.get(`/tenants/${user.tenantId}/users/list`);
-        setUsers(res.data.data.users || []);
+        setUsers(await fetchAllTenantUsers(user.tenantId));
       } catch (err) {
         console.error("Failed to load users", err);
       }